@@ -0,0 +1,249 @@
+"""
+Check EmailEngine against a local SMTP stand-in server: single email sent
+at once, digest merging, connection reuse, reconnect after the server
+drops the connection, and number of retries when sending keeps failing.
+
+Every step waits until the server received the messages expected and
+the engine queue is idle, instead of sleeping for a fixed time.
+
+Usage: python check_smtp.py
+"""
+
+import smtplib
+import socket
+from email.message import EmailMessage
+from email.parser import Parser
+from email.policy import default
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Any, Callable, List, Set
+
+from vnpy.event import EventEngine
+from vnpy.trader.engine import EmailEngine
+from vnpy.trader.setting import SETTINGS
+
+
+HOST = "127.0.0.1"
+
+
+class SmtpHandler(StreamRequestHandler):
+    """
+    Minimal SMTP conversation without authentication.
+    """
+
+    server: "SmtpServer"
+
+    def handle(self) -> None:
+        """"""
+        self.server.add_connection(self.connection)
+        self.reply("220 localhost stand-in")
+
+        while True:
+            line: bytes = self.rfile.readline()
+            if not line:
+                break
+
+            command: str = line.decode().strip().upper()
+
+            if command.startswith("EHLO") or command.startswith("HELO"):
+                self.reply("250 localhost")
+            elif command.startswith("DATA"):
+                self.server.data_count += 1
+
+                # Drop connection to simulate failure of server
+                if self.server.fail_count:
+                    self.server.fail_count -= 1
+                    break
+
+                self.reply("354 end data with <CR><LF>.<CR><LF>")
+                self.server.messages.append(self.read_data())
+                self.reply("250 queued")
+            elif command.startswith("QUIT"):
+                self.reply("221 bye")
+                break
+            else:
+                self.reply("250 ok")
+
+        self.server.remove_connection(self.connection)
+
+    def read_data(self) -> EmailMessage:
+        """"""
+        lines: List[bytes] = []
+        while True:
+            line: bytes = self.rfile.readline()
+            if not line or line == b".\r\n":
+                break
+            lines.append(line)
+        return Parser(policy=default).parsestr(b"".join(lines).decode())
+
+    def reply(self, text: str) -> None:
+        """"""
+        self.wfile.write(f"{text}\r\n".encode())
+
+
+class SmtpServer(ThreadingTCPServer):
+    """"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        """"""
+        super().__init__((HOST, 0), SmtpHandler)
+
+        self.messages: List[EmailMessage] = []
+        self.connection_count: int = 0
+        self.data_count: int = 0
+        self.fail_count: int = 0
+
+        self.connections: Set[socket.socket] = set()
+        self.lock: Lock = Lock()
+
+    def add_connection(self, connection: socket.socket) -> None:
+        """"""
+        with self.lock:
+            self.connection_count += 1
+            self.connections.add(connection)
+
+    def remove_connection(self, connection: socket.socket) -> None:
+        """"""
+        with self.lock:
+            self.connections.discard(connection)
+
+    def drop_connections(self) -> None:
+        """
+        Close all connections from server side.
+        """
+        with self.lock:
+            for connection in self.connections:
+                connection.shutdown(socket.SHUT_RDWR)
+
+
+class LogMainEngine:
+    """
+    Collects logs written by EmailEngine in place of MainEngine.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.logs: List[str] = []
+
+    def write_log(self, msg: str, source: str = "") -> None:
+        """"""
+        self.logs.append(msg)
+
+
+class LocalEmailEngine(EmailEngine):
+    """
+    Connects to stand-in server with plain SMTP and no login.
+    """
+
+    merge_interval: float = 1
+
+    def connect(self) -> None:
+        """"""
+        self.smtp = smtplib.SMTP(SETTINGS["email.server"], SETTINGS["email.port"])
+
+
+def wait_for(condition: Callable[[], Any], timeout: float = 5) -> bool:
+    """"""
+    for _ in range(int(timeout / 0.05)):
+        if condition():
+            return True
+        sleep(0.05)
+    return False
+
+
+def run() -> None:
+    """"""
+    server: SmtpServer = SmtpServer()
+    server_thread: Thread = Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    SETTINGS["email.server"] = HOST
+    SETTINGS["email.port"] = server.server_address[1]
+    SETTINGS["email.sender"] = "sender@localhost"
+    SETTINGS["email.receiver"] = "default@localhost"
+
+    main_engine: LogMainEngine = LogMainEngine()
+    engine: LocalEmailEngine = LocalEmailEngine(main_engine, EventEngine())
+
+    try:
+        check(server, main_engine, engine)
+    finally:
+        engine.close()
+        server.shutdown()
+
+
+def wait_idle(engine: LocalEmailEngine) -> bool:
+    """
+    Wait until all emails queued are delivered or failed.
+    """
+    return wait_for(lambda: not engine.queue.unfinished_tasks)
+
+
+def check(server: SmtpServer, main_engine: LogMainEngine, engine: LocalEmailEngine) -> None:
+    """"""
+    # Single email is sent at once, without waiting for merge interval
+    start: float = monotonic()
+    engine.send_email("single", "single content")
+    assert wait_for(lambda: len(server.messages) == 1), server.messages
+    cost: float = monotonic() - start
+    assert cost < engine.merge_interval / 2, cost
+    assert server.messages[0]["Subject"] == "single", server.messages[0]["Subject"]
+    assert wait_idle(engine)
+    print(f"single: ok, sent in {cost:.3f}s")
+
+    # Emails following within merge interval become one digest per receiver
+    for i in range(3):
+        engine.send_email(f"alert {i}", f"content {i}")
+    engine.send_email("other", "other content", "other@localhost")
+
+    assert wait_for(lambda: len(server.messages) == 3), server.messages
+    assert wait_idle(engine)
+    digest: EmailMessage = next(m for m in server.messages[1:] if m["To"] == "default@localhost")
+    assert digest["Subject"] == "[3封合并] alert 0", digest["Subject"]
+    content: str = digest.get_content()
+    assert all(f"content {i}" in content for i in range(3)), content
+    assert server.connection_count == 1, server.connection_count
+    print("merge: ok, 4 emails sent as 2 messages over 1 connection")
+
+    # Connection is reused for next email
+    engine.send_email("reuse", "reuse content")
+    assert wait_for(lambda: len(server.messages) == 4)
+    assert wait_idle(engine)
+    assert server.messages[-1]["Subject"] == "reuse", server.messages[-1]["Subject"]
+    assert server.connection_count == 1, server.connection_count
+    print("reuse: ok")
+
+    # Connection dropped by server is replaced when sending next email
+    server.drop_connections()
+    assert wait_for(lambda: not server.connections)
+    engine.send_email("after drop", "after drop content")
+    assert wait_for(lambda: len(server.messages) == 5)
+    assert wait_idle(engine)
+    assert server.messages[-1]["Subject"] == "after drop", server.messages[-1]["Subject"]
+    assert server.connection_count == 2, server.connection_count
+    assert not main_engine.logs, main_engine.logs
+    print("reconnect: ok")
+
+    # Keeps failing: sent retry_count times with new connection, then logged
+    data_count: int = server.data_count
+    server.fail_count = 10
+    engine.send_email("failing", "failing content")
+    assert wait_idle(engine)
+    assert server.data_count - data_count == engine.retry_count, server.data_count - data_count
+    assert len(main_engine.logs) == 1 and "failing" in main_engine.logs[0], main_engine.logs
+    print(f"retry: ok, {engine.retry_count} attempts before failure logged")
+
+    # Server recovered
+    server.fail_count = 0
+    engine.send_email("recovered", "recovered content")
+    assert wait_for(lambda: len(server.messages) == 6)
+    assert server.messages[-1]["Subject"] == "recovered", server.messages[-1]["Subject"]
+    print("recover: ok")
+
+
+if __name__ == "__main__":
+    run()
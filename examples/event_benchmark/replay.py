@@ -0,0 +1,38 @@
+"""
+Replay an event journal recorded by EventJournal and report throughput
+and per event type latency.
+
+Usage: python replay.py <journal_path> [speed]
+"""
+
+import sys
+
+from vnpy.event import EventEngine, EventReplayer
+
+
+def run_replay(path: str, speed: float) -> None:
+    """"""
+    event_engine: EventEngine = EventEngine(batch_size=256)
+    event_engine.start()
+
+    replayer: EventReplayer = EventReplayer(event_engine, path, speed)
+    report: dict = replayer.run()
+
+    event_engine.stop()
+
+    print(
+        f"events {report['processed_count']}/{report['put_count']}, "
+        f"cost {report['cost']:.3f}s, throughput {report['throughput']:,.0f} events/s"
+    )
+
+    latencies: list = sorted(report["latencies"].items(), key=lambda item: item[1]["count"], reverse=True)
+    for type, d in latencies[:20]:
+        print(
+            f"{type:<40} count {d['count']:>8} average {d['average']:>10.1f}us "
+            f"p99<{d['p99']:.0f}us max {d['max']:.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    speed: float = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    run_replay(sys.argv[1], speed)
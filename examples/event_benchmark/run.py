@@ -0,0 +1,65 @@
+"""
+Benchmark dispatch throughput of EventEngine with a synthetic tick producer.
+"""
+
+from threading import Thread
+from time import perf_counter, sleep
+from typing import List
+
+from vnpy.event import Event, EventEngine
+
+
+EVENT_TICK = "eTick."
+
+SYMBOL_COUNT = 500
+EVENT_COUNT = 500_000
+
+
+def produce_ticks(event_engine: EventEngine, symbols: List[str], count: int) -> None:
+    """
+    Push tick events of all symbols in round robin.
+    """
+    for i in range(count):
+        vt_symbol: str = symbols[i % len(symbols)]
+        event_engine.put(Event(EVENT_TICK, vt_symbol))
+        event_engine.put(Event(EVENT_TICK + vt_symbol, vt_symbol))
+
+
+def run_benchmark(batch_size: int) -> None:
+    """
+    Measure time used to dispatch all ticks produced.
+    """
+    symbols: List[str] = [f"symbol{i}.EXCHANGE" for i in range(SYMBOL_COUNT)]
+
+    event_engine: EventEngine = EventEngine(batch_size=batch_size)
+    event_engine.register(EVENT_TICK, lambda event: None)
+    for vt_symbol in symbols:
+        event_engine.register(EVENT_TICK + vt_symbol, lambda event: None)
+
+    total: int = EVENT_COUNT * 2
+
+    start: float = perf_counter()
+    event_engine.start()
+
+    producer: Thread = Thread(target=produce_ticks, args=(event_engine, symbols, EVENT_COUNT))
+    producer.start()
+    producer.join()
+
+    while event_engine.get_statistics()["event_count"] < total:
+        sleep(0.001)
+
+    cost: float = perf_counter() - start
+    event_engine.stop()
+
+    statistics: dict = event_engine.get_statistics()
+    average: float = statistics["event_count"] / statistics["batch_count"]
+    print(
+        f"batch_size {batch_size:>5}: {total / cost:>12,.0f} events/s, "
+        f"batches {statistics['batch_count']}, "
+        f"average batch {average:.1f}, max batch {statistics['max_batch']}"
+    )
+
+
+if __name__ == "__main__":
+    for batch_size in [1, 16, 256, 4096]:
+        run_benchmark(batch_size)
@@ -0,0 +1,98 @@
+"""
+Check timers of EventEngine: sub-second timers run at their own
+interval, zero interval is raised to MIN_INTERVAL instead of being due
+forever, and removed timers stop running.
+"""
+
+from statistics import median
+from threading import Thread
+from time import monotonic, sleep
+from typing import List
+
+from vnpy.event import EventEngine
+from vnpy.event.timer import MIN_INTERVAL, TimerEntry, TimerService
+
+
+def check_timer_service() -> None:
+    """"""
+    service: TimerService = TimerService()
+    timer_id: int = service.add_timer(lambda: None, 0, True, 100.0)
+
+    # Popping must finish even for interval 0
+    result: List[List[TimerEntry]] = []
+    thread: Thread = Thread(target=lambda: result.append(service.pop_due(101.0)), daemon=True)
+    thread.start()
+    thread.join(1)
+    assert not thread.is_alive(), "pop_due never returned for interval 0"
+
+    entries: List[TimerEntry] = result[0]
+    assert [e.timer_id for e in entries] == [timer_id]
+    assert entries[0].interval == MIN_INTERVAL
+    assert service.get_next_due() == 101.0 + MIN_INTERVAL
+
+    # Not due again before next interval
+    entries[0].pending = False
+    assert service.pop_due(101.0 + MIN_INTERVAL / 2) == []
+    assert len(service.pop_due(101.0 + MIN_INTERVAL)) == 1
+
+    # Sub-second interval is kept
+    short_id: int = service.add_timer(lambda: None, 0.2, True, 200.0)
+    assert service._timers[short_id].interval == 0.2
+
+    service.remove_timer(timer_id)
+    service.remove_timer(short_id)
+    assert service.get_next_due() == float("inf")
+    print("TimerService: ok")
+
+
+def check_event_engine() -> None:
+    """"""
+    event_engine: EventEngine = EventEngine()
+    event_engine.start()
+
+    zero_count: List[int] = [0]
+    once_count: List[int] = [0]
+    short_times: List[float] = []
+
+    def on_zero() -> None:
+        zero_count[0] += 1
+
+    def on_once() -> None:
+        once_count[0] += 1
+
+    def on_short() -> None:
+        short_times.append(monotonic())
+
+    start: float = monotonic()
+    zero_id: int = event_engine.add_timer(on_zero, 0)
+    short_id: int = event_engine.add_timer(on_short, 0.2)
+    event_engine.add_timer(on_once, 0, repeat=False)
+    sleep(2.1)
+
+    # Engine still accepts timers after a zero interval one
+    event_engine.remove_timer(zero_id)
+    event_engine.remove_timer(short_id)
+    removed_count: int = zero_count[0]
+    short_count: int = len(short_times)
+    sleep(0.5)
+
+    event_engine.stop()
+
+    # 0.2s timer runs about every 0.2s, not on every 1s timer tick
+    gaps: List[float] = [b - a for a, b in zip([start] + short_times, short_times)]
+    assert 9 <= short_count <= 11, short_times
+    assert 0.15 <= median(gaps) <= 0.25, gaps
+    assert len(short_times) == short_count
+
+    assert 2.1 / MIN_INTERVAL / 4 <= removed_count <= 2.1 / MIN_INTERVAL + 1, removed_count
+    assert zero_count[0] == removed_count
+    assert once_count[0] == 1
+    print(
+        f"EventEngine: ok, 0.2s timer ran {short_count} times with median gap "
+        f"{median(gaps):.3f}s, zero interval timer ran {removed_count} times in 2.1s"
+    )
+
+
+if __name__ == "__main__":
+    check_timer_service()
+    check_event_engine()
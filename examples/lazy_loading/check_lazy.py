@@ -0,0 +1,208 @@
+"""
+Check lazy apps and gateways of MainEngine: they are listed with their
+exchanges and app info before created, created only once when requested
+from several threads at the same time, and app engine is created by the
+first event it needs, which it also receives.
+"""
+
+from threading import Barrier, Thread
+from time import sleep
+from typing import Any, Callable, List, Tuple
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.app import BaseApp
+from vnpy.trader.engine import BaseEngine, MainEngine
+from vnpy.trader.gateway import BaseGateway
+from Pandora.trader.object import Exchange
+
+
+THREAD_COUNT = 8
+
+EVENT_DEMO = "eDemo"
+
+created: List[str] = []
+
+
+class SlowGateway(BaseGateway):
+    """"""
+
+    default_name: str = "SLOW"
+    exchanges: List[Exchange] = [Exchange.SHFE]
+
+    def __init__(self, event_engine: EventEngine, gateway_name: str) -> None:
+        """"""
+        super().__init__(event_engine, gateway_name)
+
+        created.append(gateway_name)
+        sleep(0.2)
+
+    def connect(self, setting: dict) -> None:
+        """"""
+        pass
+
+    def close(self) -> None:
+        """"""
+        pass
+
+    def subscribe(self, req: Any) -> None:
+        """"""
+        pass
+
+    def send_order(self, req: Any) -> str:
+        """"""
+        return ""
+
+    def cancel_order(self, req: Any) -> None:
+        """"""
+        pass
+
+    def query_account(self) -> None:
+        """"""
+        pass
+
+    def query_position(self) -> None:
+        """"""
+        pass
+
+
+class SlowEngine(BaseEngine):
+    """"""
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """"""
+        super().__init__(main_engine, event_engine, "slow")
+
+        created.append(self.engine_name)
+        sleep(0.2)
+
+
+class SlowApp(BaseApp):
+    """"""
+
+    app_name: str = "slow"
+    app_module: str = __module__
+    display_name: str = "慢速应用"
+    engine_class: SlowEngine = SlowEngine
+    widget_name: str = "SlowWidget"
+
+
+class EventDemoEngine(BaseEngine):
+    """"""
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """"""
+        super().__init__(main_engine, event_engine, "event_demo")
+
+        self.received: List[Any] = []
+        event_engine.register(EVENT_DEMO, self.process_demo_event)
+
+    def process_demo_event(self, event: Event) -> None:
+        """"""
+        self.received.append(event.data)
+
+
+class EventDemoApp(BaseApp):
+    """"""
+
+    app_name: str = "event_demo"
+    app_module: str = __module__
+    display_name: str = "事件应用"
+    engine_class: EventDemoEngine = EventDemoEngine
+    widget_name: str = "EventDemoWidget"
+
+
+def check_event_creation(monitor: bool) -> None:
+    """
+    Lazy app engine created by event, with or without event monitor.
+    """
+    event_engine: EventEngine = EventEngine()
+    if monitor:
+        event_engine.enable_monitor()
+
+    main_engine: MainEngine = MainEngine(event_engine)
+
+    try:
+        # Handlers before and after the lazy one must receive every event
+        before: List[Any] = []
+        after: List[Any] = []
+
+        event_engine.register(EVENT_DEMO, lambda event: before.append(event.data))
+        main_engine.add_app(EventDemoApp, lazy=True, event_types=[EVENT_DEMO])
+        event_engine.register(EVENT_DEMO, lambda event: after.append(event.data))
+
+        assert "event_demo" not in main_engine.engines
+
+        for i in range(3):
+            event_engine.put(Event(EVENT_DEMO, i))
+
+        assert wait_for(lambda: len(after) == 3), after
+        engine: EventDemoEngine = main_engine.engines["event_demo"]
+        assert engine.received == [0, 1, 2], engine.received
+        assert before == [0, 1, 2] and after == [0, 1, 2], (before, after)
+        assert not main_engine.lazy_apps and not main_engine.lazy_handlers
+        assert len(event_engine._handlers[EVENT_DEMO]) == 3
+
+        print(f"event creation: ok, monitor {monitor}")
+    finally:
+        main_engine.close()
+
+
+def wait_for(condition: Callable[[], Any], timeout: float = 5) -> bool:
+    """"""
+    for _ in range(int(timeout / 0.05)):
+        if condition():
+            return True
+        sleep(0.05)
+    return False
+
+
+def run() -> None:
+    """"""
+    check_event_creation(False)
+    check_event_creation(True)
+
+    main_engine: MainEngine = MainEngine()
+
+    try:
+        main_engine.add_gateway(SlowGateway, lazy=True)
+        main_engine.add_gateway("missing.module.Gateway", "STR", lazy=True, exchanges=[Exchange.DCE])
+        main_engine.add_app(SlowApp, lazy=True)
+        main_engine.add_app("missing.module.App", lazy=True, app_name="str")
+
+        # Listed before created
+        assert Exchange.SHFE in main_engine.get_all_exchanges()
+        assert Exchange.DCE in main_engine.get_all_exchanges()
+        assert set(main_engine.get_all_gateway_names()) == {"SLOW", "STR"}
+
+        apps: dict = {app.app_name: app for app in main_engine.get_all_apps()}
+        assert apps["slow"].display_name == "慢速应用"
+        assert apps["str"].app_module == "missing.module"
+        assert not created
+
+        # Created once by concurrent requests
+        barrier: Barrier = Barrier(THREAD_COUNT)
+        results: List[Tuple[BaseGateway, BaseEngine]] = []
+
+        def request() -> None:
+            barrier.wait()
+            results.append((main_engine.get_gateway("SLOW"), main_engine.get_engine("slow")))
+
+        threads: List[Thread] = [Thread(target=request) for _ in range(THREAD_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert created == ["SLOW", "slow"], created
+        assert len({id(gateway) for gateway, _ in results}) == 1
+        assert len({id(engine) for _, engine in results}) == 1
+        assert all(gateway and engine for gateway, engine in results)
+        assert isinstance(main_engine.get_all_apps()[0], SlowApp)
+
+        print("lazy loading: ok")
+    finally:
+        main_engine.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,188 @@
+"""
+Benchmark converting CTP depth market data into TickData, the original
+field by field code against DepthNormalizer.
+
+Usage: python normalize.py
+"""
+
+import gc
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import List
+
+from Pandora.constant import Exchange
+from Pandora.trader.object import TickData
+
+from vnpy.trader.marketdata import DepthNormalizer
+
+
+TICK_COUNT = 100_000
+REPEAT = 5
+MAX_FLOAT = sys.float_info.max
+
+
+def adjust_price(price: float) -> float:
+    """Same as the one in ctp gateway"""
+    if price == MAX_FLOAT:
+        price = 0
+
+    return round(price, 5)
+
+
+def generate_data(depth: bool) -> List[dict]:
+    """"""
+    data_list: List[dict] = []
+
+    for _ in range(TICK_COUNT):
+        price: float = 3800.0 + random.randint(-100, 100)
+
+        data: dict = {
+            "InstrumentID": "rb2401",
+            "LastPrice": price,
+            "UpperLimitPrice": 4100.0,
+            "LowerLimitPrice": 3500.0,
+            "OpenPrice": 3790.0,
+            "HighestPrice": 3900.0,
+            "LowestPrice": 3700.0,
+            "PreClosePrice": 3795.0,
+            "Volume": random.randint(1, 100000),
+            "Turnover": price * 10 * 1000,
+            "OpenInterest": 1500000.0,
+            "BidPrice1": price - 1,
+            "AskPrice1": price + 1,
+            "BidVolume1": random.randint(1, 500),
+            "AskVolume1": random.randint(1, 500),
+        }
+
+        for n in range(2, 6):
+            data[f"BidPrice{n}"] = price - n if depth else MAX_FLOAT
+            data[f"AskPrice{n}"] = price + n if depth else MAX_FLOAT
+            data[f"BidVolume{n}"] = random.randint(1, 500) if depth else 0
+            data[f"AskVolume{n}"] = random.randint(1, 500) if depth else 0
+
+        data_list.append(data)
+
+    return data_list
+
+
+def run_original(data_list: List[dict], dt: datetime) -> List[TickData]:
+    """Same as the original callback"""
+    ticks: List[TickData] = []
+
+    for data in data_list:
+        last_price = adjust_price(data["LastPrice"])
+        turnover = round(data["Turnover"], 2)
+        volume = data["Volume"]
+
+        if last_price == 0 or turnover == 0 or volume == 0:
+            continue
+
+        tick: TickData = TickData(
+            symbol=data["InstrumentID"],
+            exchange=Exchange.SHFE,
+            datetime=dt,
+            name="",
+            volume=volume,
+            turnover=turnover,
+            open_interest=data["OpenInterest"],
+            last_price=last_price,
+            limit_up=adjust_price(data["UpperLimitPrice"]),
+            limit_down=adjust_price(data["LowerLimitPrice"]),
+            open_price=adjust_price(data["OpenPrice"]),
+            high_price=adjust_price(data["HighestPrice"]),
+            low_price=adjust_price(data["LowestPrice"]),
+            pre_close=adjust_price(data["PreClosePrice"]),
+            bid_price_1=adjust_price(data["BidPrice1"]),
+            ask_price_1=adjust_price(data["AskPrice1"]),
+            bid_volume_1=data["BidVolume1"],
+            ask_volume_1=data["AskVolume1"],
+            gateway_name="CTP",
+            localtime=dt
+        )
+
+        if data["BidVolume2"] or data["AskVolume2"]:
+            tick.bid_price_2 = adjust_price(data["BidPrice2"])
+            tick.bid_price_3 = adjust_price(data["BidPrice3"])
+            tick.bid_price_4 = adjust_price(data["BidPrice4"])
+            tick.bid_price_5 = adjust_price(data["BidPrice5"])
+
+            tick.ask_price_2 = adjust_price(data["AskPrice2"])
+            tick.ask_price_3 = adjust_price(data["AskPrice3"])
+            tick.ask_price_4 = adjust_price(data["AskPrice4"])
+            tick.ask_price_5 = adjust_price(data["AskPrice5"])
+
+            tick.bid_volume_2 = data["BidVolume2"]
+            tick.bid_volume_3 = data["BidVolume3"]
+            tick.bid_volume_4 = data["BidVolume4"]
+            tick.bid_volume_5 = data["BidVolume5"]
+
+            tick.ask_volume_2 = data["AskVolume2"]
+            tick.ask_volume_3 = data["AskVolume3"]
+            tick.ask_volume_4 = data["AskVolume4"]
+            tick.ask_volume_5 = data["AskVolume5"]
+
+        ticks.append(tick)
+
+    return ticks
+
+
+def run_normalizer(data_list: List[dict], dt: datetime) -> List[TickData]:
+    """"""
+    normalizer: DepthNormalizer = DepthNormalizer(
+        adjust=True,
+        required=("last_price", "volume"),
+        depth_keys=("BidVolume2", "AskVolume2")
+    )
+
+    ticks: List[TickData] = []
+
+    for data in data_list:
+        fields: dict = normalizer.normalize(data)
+        if not fields:
+            continue
+
+        turnover = round(data["Turnover"], 2)
+        if turnover == 0:
+            continue
+
+        tick: TickData = TickData(
+            symbol=data["InstrumentID"],
+            exchange=Exchange.SHFE,
+            datetime=dt,
+            name="",
+            turnover=turnover,
+            gateway_name="CTP",
+            localtime=dt,
+            **fields
+        )
+        ticks.append(tick)
+
+    return ticks
+
+
+if __name__ == "__main__":
+    # Ticks created are kept in list, avoid gc pauses adding noise
+    gc.disable()
+
+    for depth in [False, True]:
+        data_list: List[dict] = generate_data(depth)
+        dt: datetime = datetime.now()
+
+        results: dict = {}
+        for name, func in [("original", run_original), ("DepthNormalizer", run_normalizer)]:
+            costs: List[float] = []
+
+            for _ in range(REPEAT):
+                start: float = perf_counter()
+                results[name] = func(data_list, dt)
+                costs.append(perf_counter() - start)
+
+            cost: float = min(costs)
+            print(
+                f"depth {str(depth):<5} {name:<16} {len(data_list)} ticks, "
+                f"{cost:.3f}s, {cost / len(data_list) * 1_000_000_000:.0f}ns/tick"
+            )
+
+        assert results["original"] == results["DepthNormalizer"]
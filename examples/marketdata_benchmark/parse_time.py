@@ -0,0 +1,95 @@
+"""
+Benchmark tick timestamp parsing of CTP market data callback, strptime
+on the whole timestamp string against TickTimeParser.
+
+Usage: python parse_time.py [csv_path]
+
+The csv file is a recorded day of depth market data, with at least the
+ActionDay, UpdateTime and UpdateMillisec columns. Without it, a full day
+of 500ms snapshots for 10 symbols is generated.
+"""
+
+import csv
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import List, Tuple
+
+from vnpy.trader.marketdata import TickTimeParser
+
+
+SYMBOL_COUNT = 10
+
+
+def load_records(path: str) -> List[Tuple[str, str, int]]:
+    """"""
+    records: List[Tuple[str, str, int]] = []
+
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            records.append((row["ActionDay"], row["UpdateTime"], int(row["UpdateMillisec"])))
+
+    return records
+
+
+def generate_records() -> List[Tuple[str, str, int]]:
+    """"""
+    records: List[Tuple[str, str, int]] = []
+
+    dt: datetime = datetime(2023, 9, 1, 9, 0, 0)
+    end: datetime = datetime(2023, 9, 1, 15, 0, 0)
+    step: timedelta = timedelta(milliseconds=500)
+
+    while dt < end:
+        date_str: str = dt.strftime("%Y%m%d")
+        time_str: str = dt.strftime("%H:%M:%S")
+        millisecond: int = dt.microsecond // 1000
+
+        for _ in range(SYMBOL_COUNT):
+            records.append((date_str, time_str, millisecond))
+
+        dt += step
+
+    return records
+
+
+def run_strptime(records: List[Tuple[str, str, int]]) -> List[datetime]:
+    """Same as the original callback"""
+    return [
+        datetime.strptime(f"{date_str} {time_str}.{millisecond}", "%Y%m%d %H:%M:%S.%f")
+        for date_str, time_str, millisecond in records
+    ]
+
+
+def run_parser(records: List[Tuple[str, str, int]]) -> List[datetime]:
+    """"""
+    parser: TickTimeParser = TickTimeParser()
+
+    return [
+        parser.parse(date_str, time_str, millisecond * 1000)
+        for date_str, time_str, millisecond in records
+    ]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        records: list = load_records(sys.argv[1])
+    else:
+        records = generate_records()
+
+    results: dict = {}
+    for name, func in [("strptime", run_strptime), ("TickTimeParser", run_parser)]:
+        start: float = perf_counter()
+        results[name] = func(records)
+        cost: float = perf_counter() - start
+
+        print(f"{name:<16} {len(records)} ticks, {cost:.3f}s, {cost / len(records) * 1_000_000_000:.0f}ns/tick")
+
+    # strptime reads "50" as 500ms, so only compare where milliseconds
+    # have 3 digits or are 0
+    mismatch: int = 0
+    for record, a, b in zip(records, results["strptime"], results["TickTimeParser"]):
+        if (record[2] >= 100 or not record[2]) and a != b:
+            mismatch += 1
+
+    print(f"mismatch {mismatch}")
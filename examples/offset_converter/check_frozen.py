@@ -0,0 +1,179 @@
+"""
+Replay random order, trade and cancel updates into PositionHolding, and
+check that frozen volume tracked incrementally always matches a full
+recalculation from active orders.
+
+Usage: python check_frozen.py [steps] [seed]
+"""
+
+import random
+import sys
+from copy import copy
+from typing import Dict, List
+
+from vnpy.trader.converter import PositionHolding
+from Pandora.constant import Direction, Exchange, Offset, Product, Status
+from Pandora.trader.object import ContractData, OrderData, OrderRequest, PositionData, TradeData
+
+
+GATEWAY_NAME = "CHECK"
+
+FROZEN_NAMES: List[str] = [
+    "long_pos_frozen",
+    "long_yd_frozen",
+    "long_td_frozen",
+    "short_pos_frozen",
+    "short_yd_frozen",
+    "short_td_frozen",
+]
+
+
+class Checker:
+    """"""
+
+    def __init__(self, exchange: Exchange, seed: int) -> None:
+        """"""
+        self.random: random.Random = random.Random(seed)
+
+        contract: ContractData = ContractData(
+            symbol="check",
+            exchange=exchange,
+            name="check",
+            product=Product.FUTURES,
+            size=10,
+            pricetick=1,
+            gateway_name=GATEWAY_NAME
+        )
+        self.holding: PositionHolding = PositionHolding(contract)
+
+        for direction in [Direction.LONG, Direction.SHORT]:
+            self.holding.update_position(PositionData(
+                symbol=contract.symbol,
+                exchange=exchange,
+                direction=direction,
+                volume=20,
+                yd_volume=10,
+                gateway_name=GATEWAY_NAME
+            ))
+
+        self.orders: Dict[str, OrderData] = {}
+        self.order_count: int = 0
+        self.trade_count: int = 0
+
+    def step(self) -> str:
+        """
+        Apply a random action and return its name.
+        """
+        active: List[OrderData] = [order for order in self.orders.values() if order.is_active()]
+
+        action: str = self.random.choice(["send", "send", "trade", "trade", "cancel", "reject", "repeat"])
+        if action != "send" and not active:
+            action = "send"
+
+        if action == "send":
+            self.send_order()
+            return action
+
+        order: OrderData = self.random.choice(active)
+
+        if action == "trade":
+            self.trade_order(order)
+        elif action == "cancel":
+            self.update_order(order, Status.CANCELLED)
+        elif action == "reject":
+            self.update_order(order, Status.REJECTED)
+        else:
+            # Same update pushed again by gateway
+            self.holding.update_order(copy(order))
+
+        return action
+
+    def send_order(self) -> None:
+        """"""
+        self.order_count += 1
+
+        req: OrderRequest = OrderRequest(
+            symbol="check",
+            exchange=self.holding.exchange,
+            direction=self.random.choice([Direction.LONG, Direction.SHORT]),
+            type=None,
+            volume=self.random.randint(1, 5),
+            price=100,
+            offset=self.random.choice([Offset.OPEN, Offset.CLOSE, Offset.CLOSETODAY, Offset.CLOSEYESTERDAY])
+        )
+        vt_orderid: str = f"{GATEWAY_NAME}.{self.order_count}"
+        self.holding.update_order_request(req, vt_orderid)
+
+        order: OrderData = req.create_order_data(str(self.order_count), GATEWAY_NAME)
+        self.orders[order.vt_orderid] = order
+        self.update_order(order, Status.NOTTRADED)
+
+    def trade_order(self, order: OrderData) -> None:
+        """"""
+        volume: float = self.random.randint(1, int(order.volume - order.traded))
+
+        self.trade_count += 1
+        trade: TradeData = TradeData(
+            symbol=order.symbol,
+            exchange=order.exchange,
+            orderid=order.orderid,
+            tradeid=str(self.trade_count),
+            direction=order.direction,
+            offset=order.offset,
+            price=order.price,
+            volume=volume,
+            gateway_name=GATEWAY_NAME
+        )
+        self.holding.update_trade(trade)
+
+        order.traded += volume
+        if order.traded < order.volume:
+            self.update_order(order, Status.PARTTRADED)
+        else:
+            self.update_order(order, Status.ALLTRADED)
+
+    def update_order(self, order: OrderData, status: Status) -> None:
+        """"""
+        order.status = status
+        self.holding.update_order(copy(order))
+
+    def check(self) -> None:
+        """
+        Compare incremental frozen volume with a full recalculation.
+        """
+        holding: PositionHolding = self.holding
+        assert holding.check_frozen(), "frozen volume by offset is inconsistent"
+
+        recalculated: PositionHolding = copy(holding)
+        recalculated.calculate_frozen()
+
+        for name in FROZEN_NAMES:
+            value: float = getattr(holding, name)
+            expected: float = getattr(recalculated, name)
+            assert abs(value - expected) < 1e-6, f"{name}: {value} != {expected}"
+
+
+def run(steps: int, seed: int) -> None:
+    """"""
+    for exchange in [Exchange.SHFE, Exchange.DCE]:
+        checker: Checker = Checker(exchange, seed)
+        actions: Dict[str, int] = {}
+
+        for i in range(steps):
+            action: str = checker.step()
+            actions[action] = actions.get(action, 0) + 1
+
+            try:
+                checker.check()
+            except AssertionError as e:
+                print(f"{exchange.value}: step {i} ({action}) failed: {e}")
+                raise
+
+        print(f"{exchange.value}: {steps} steps ok, {actions}")
+
+
+if __name__ == "__main__":
+    steps: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seed: int = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    run(steps, seed)
@@ -0,0 +1,113 @@
+"""
+Benchmark memory usage and lookup speed of LocalOrderManager with a
+synthetic flow of orders which are all finished after a few updates.
+"""
+
+import tracemalloc
+from time import perf_counter
+
+from vnpy.event import EventEngine
+from vnpy.trader.gateway import BaseGateway, LocalOrderManager
+from Pandora.trader.object import OrderData, CancelRequest
+from Pandora.constant import Exchange, Direction, Offset, Status
+
+
+ORDER_COUNT = 2_000_000
+ACTIVE_COUNT = 1_000
+
+
+class BenchmarkGateway(BaseGateway):
+    """
+    Gateway which drops all data pushed.
+    """
+
+    default_name: str = "BENCHMARK"
+
+    def on_order(self, order: OrderData) -> None:
+        """"""
+        pass
+
+    def connect(self, setting: dict) -> None:
+        """"""
+        pass
+
+    def close(self) -> None:
+        """"""
+        pass
+
+    def subscribe(self, req) -> None:
+        """"""
+        pass
+
+    def send_order(self, req) -> str:
+        """"""
+        return ""
+
+    def cancel_order(self, req: CancelRequest) -> None:
+        """"""
+        pass
+
+    def query_account(self) -> None:
+        """"""
+        pass
+
+    def query_position(self) -> None:
+        """"""
+        pass
+
+
+def run_benchmark(max_finished: int) -> None:
+    """"""
+    gateway: BenchmarkGateway = BenchmarkGateway(EventEngine(), "BENCHMARK")
+    manager: LocalOrderManager = LocalOrderManager(gateway, max_finished=max_finished)
+
+    tracemalloc.start()
+    start: float = perf_counter()
+
+    lookup_count: int = 0
+    lookup_cost: float = 0
+
+    for i in range(ORDER_COUNT):
+        local_orderid: str = manager.new_local_orderid()
+        manager.update_orderid_map(local_orderid, f"sys{i}")
+
+        order: OrderData = OrderData(
+            symbol="rb2401",
+            exchange=Exchange.SHFE,
+            orderid=local_orderid,
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=3800,
+            volume=1,
+            status=Status.NOTTRADED,
+            gateway_name=gateway.gateway_name
+        )
+        manager.on_order(order)
+
+        # Lookup an order still active, then finish the oldest active one
+        if i >= ACTIVE_COUNT:
+            sys_orderid: str = f"sys{i - ACTIVE_COUNT}"
+
+            lookup_start: float = perf_counter()
+            active_order: OrderData = manager.get_order_with_sys_orderid(sys_orderid)
+            lookup_cost += perf_counter() - lookup_start
+            lookup_count += 1
+
+            active_order.status = Status.ALLTRADED
+            manager.on_order(active_order)
+
+    cost: float = perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"max_finished {max_finished:>10}: total {cost:.1f}s, "
+        f"lookup {lookup_cost / lookup_count * 1_000_000:.2f}us, "
+        f"memory {current / 1024 / 1024:.1f}MB (peak {peak / 1024 / 1024:.1f}MB), "
+        f"{manager.get_statistics()}"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(ORDER_COUNT)      # Nothing evicted, same as before
+    run_benchmark(10_000)
@@ -0,0 +1,103 @@
+"""
+Drive MainEngine with ticks replayed by ReplayGateway from an event
+journal, and send a marketable order every N ticks to exercise the
+order path.
+
+Usage: python run.py <journal_path> [speed]
+"""
+
+import sys
+from time import perf_counter, sleep
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_TICK, EVENT_TRADE
+from Pandora.constant import Direction, Offset, OrderType
+from Pandora.trader.object import OrderRequest, SubscribeRequest, TickData
+
+
+ORDER_INTERVAL = 100
+
+
+class Counter:
+    """"""
+
+    def __init__(self, main_engine: MainEngine) -> None:
+        """"""
+        self.main_engine: MainEngine = main_engine
+
+        self.tick_count: int = 0
+        self.order_count: int = 0
+        self.trade_count: int = 0
+
+    def process_tick_event(self, event: Event) -> None:
+        """"""
+        tick: TickData = event.data
+        self.tick_count += 1
+
+        if self.tick_count % ORDER_INTERVAL:
+            return
+
+        req: OrderRequest = OrderRequest(
+            symbol=tick.symbol,
+            exchange=tick.exchange,
+            direction=Direction.LONG,
+            type=OrderType.LIMIT,
+            volume=1,
+            price=tick.ask_price_1,
+            offset=Offset.OPEN
+        )
+        self.main_engine.send_order(req, tick.gateway_name)
+        self.order_count += 1
+
+    def process_trade_event(self, event: Event) -> None:
+        """"""
+        self.trade_count += 1
+
+
+def run(path: str, speed: float) -> None:
+    """"""
+    event_engine: EventEngine = EventEngine(batch_size=64)
+    main_engine: MainEngine = MainEngine(event_engine)
+    gateway = main_engine.add_gateway("vnpy.app.vnpy_replay.ReplayGateway", "REPLAY")
+
+    counter: Counter = Counter(main_engine)
+    event_engine.register(EVENT_TICK, counter.process_tick_event)
+    event_engine.register(EVENT_TRADE, counter.process_trade_event)
+
+    setting: dict = {
+        "数据来源": "文件",
+        "文件路径": path,
+        "合约代码": "",
+        "产品类型": "期货",
+        "开始日期": "",
+        "结束日期": "",
+        "回放速度": speed,
+        "初始资金": 1_000_000.0,
+        "开始方式": "手动"
+    }
+
+    start: float = perf_counter()
+    main_engine.connect(setting, "REPLAY")
+
+    # Subscribe all contracts in journal before replay starts
+    for contract in gateway.contracts.values():
+        main_engine.subscribe(SubscribeRequest(contract.symbol, contract.exchange), "REPLAY")
+    gateway.start_replay()
+
+    while gateway.thread and gateway.thread.is_alive():
+        sleep(0.1)
+    sleep(1)
+
+    cost: float = perf_counter() - start
+    print(
+        f"ticks {counter.tick_count}, orders {counter.order_count}, trades {counter.trade_count}, "
+        f"cost {cost:.3f}s, {counter.tick_count / cost:,.0f} ticks/s"
+    )
+
+    main_engine.close()
+
+
+if __name__ == "__main__":
+    speed: float = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    run(sys.argv[1], speed)
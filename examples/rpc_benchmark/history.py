@@ -0,0 +1,168 @@
+"""
+Benchmark transferring one year of 1-minute bars of a product family
+from RpcServer to RpcClient: list of BarData returned by remote call,
+against columns loaded by load_history.
+
+Usage: python history.py [contract count]
+"""
+
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, List
+
+from vnpy.rpc import RpcClient, RpcServer
+from vnpy.rpc.history import HistoryData, to_history
+from vnpy.rpc.serializer import SERIALIZERS, Serializer
+from Pandora.constant import Exchange, Interval
+from Pandora.trader.object import BarData
+from Pandora.trader.utility import ZoneInfo
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+REP_ADDRESS = "tcp://127.0.0.1:22015"
+PUB_ADDRESS = "tcp://127.0.0.1:24103"
+
+TRADING_DAYS = 245
+TIMEOUT = 600_000
+
+
+class BenchmarkServer(RpcServer):
+    """"""
+
+    def __init__(self, bars: List[BarData]) -> None:
+        """"""
+        super().__init__()
+
+        self.bars: List[BarData] = bars
+        self.register(self.load_bar_data)
+
+    def load_bar_data(self, product: str) -> List[BarData]:
+        """"""
+        return self.bars
+
+
+class BenchmarkClient(RpcClient):
+    """"""
+
+    def callback(self, topic: str, data: Any) -> None:
+        """"""
+        pass
+
+
+def generate_minutes() -> List[datetime]:
+    """
+    Minutes of a year of trading days, with night session.
+    """
+    sessions: list = [
+        ((21, 0), 120),
+        ((9, 0), 75),
+        ((10, 30), 60),
+        ((13, 30), 90),
+    ]
+
+    minutes: List[datetime] = []
+    day: datetime = datetime(2022, 1, 4, tzinfo=CHINA_TZ)
+
+    while len(minutes) < TRADING_DAYS * 345:
+        if day.weekday() < 5:
+            for (hour, minute), length in sessions:
+                start: datetime = day.replace(hour=hour, minute=minute)
+                minutes.extend(start + timedelta(minutes=i) for i in range(length))
+        day += timedelta(days=1)
+
+    return minutes
+
+
+def generate_bars(contract_count: int) -> List[BarData]:
+    """"""
+    minutes: List[datetime] = generate_minutes()
+    bars: List[BarData] = []
+
+    for n in range(contract_count):
+        symbol: str = f"rb{2301 + n:04d}"
+        price: float = 4000 + n * 10
+
+        for i, dt in enumerate(minutes):
+            price += (i * 7919 % 11) - 5
+            bars.append(BarData(
+                symbol=symbol,
+                exchange=Exchange.SHFE,
+                datetime=dt,
+                interval=Interval.MINUTE,
+                volume=100 + i % 500,
+                turnover=(100 + i % 500) * price * 10,
+                open_interest=1e6 + i,
+                open_price=price,
+                high_price=price + 3,
+                low_price=price - 3,
+                close_price=price + 1,
+                gateway_name="DB"
+            ))
+
+    return bars
+
+
+def get_size(serializer: Serializer, data: Any) -> int:
+    """"""
+    return sum(memoryview(frame).nbytes for frame in serializer.dumps(data))
+
+
+def run(contract_count: int) -> None:
+    """"""
+    bars: List[BarData] = generate_bars(contract_count)
+    print(f"contracts: {contract_count}, bars: {len(bars):,}")
+
+    server: BenchmarkServer = BenchmarkServer(bars)
+    server.start(REP_ADDRESS, PUB_ADDRESS)
+
+    print("serializer  path     size(MB)  transfer(s)  objects(s)  total(s)")
+
+    clients: List[BenchmarkClient] = []
+
+    for name, serializer in SERIALIZERS.items():
+        client: BenchmarkClient = BenchmarkClient([name])
+        client.start(REP_ADDRESS, PUB_ADDRESS)
+        clients.append(client)
+
+        # List of objects in one reply
+        start: float = perf_counter()
+        result: List[BarData] = client.load_bar_data("rb", timeout=TIMEOUT)
+        total_time: float = perf_counter() - start
+        assert result == bars
+
+        size: float = get_size(serializer, [True, bars]) / 1e6
+        print(f"{name:10s}  objects  {size:8.1f}  {total_time:11.2f}  {0:10.2f}  {total_time:8.2f}")
+
+        # Columns in chunks, objects rebuilt at last
+        start = perf_counter()
+        history: HistoryData = client.load_history("load_bar_data", "rb", timeout=TIMEOUT)
+        transfer_time: float = perf_counter() - start
+
+        start = perf_counter()
+        result = history.to_objects()
+        objects_time: float = perf_counter() - start
+        assert result == bars
+
+        size = get_size(serializer, [True, to_history(bars)]) / 1e6
+        print(
+            f"{name:10s}  columns  {size:8.1f}  {transfer_time:11.2f}"
+            f"  {objects_time:10.2f}  {transfer_time + objects_time:8.2f}"
+        )
+
+    # Client thread exits after next heartbeat received
+    for client in clients:
+        client.stop()
+
+    for client in clients:
+        client.join()
+
+    server.stop()
+    server.join()
+
+
+if __name__ == "__main__":
+    contract_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+
+    run(contract_count)
@@ -0,0 +1,177 @@
+"""
+Benchmark serializers of RpcServer and RpcClient: encoding cost of a tick
+event, and throughput of publishing the tick stream to a client over
+local ipc and tcp sockets.
+
+Usage: python serializer.py [count]
+"""
+
+import sys
+from datetime import datetime, timedelta
+from threading import Event as ThreadEvent
+from time import perf_counter, sleep
+from typing import Any, List
+
+import zmq
+
+from vnpy.event import Event
+from vnpy.rpc import RpcClient, RpcServer
+from vnpy.rpc.serializer import SERIALIZERS, Serializer
+from vnpy.trader.event import EVENT_TICK
+from Pandora.constant import Exchange
+from Pandora.trader.object import TickData
+from Pandora.trader.utility import ZoneInfo
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+ADDRESSES = {
+    "ipc": ("ipc:///tmp/vnpy_rpc_benchmark_rep", "ipc:///tmp/vnpy_rpc_benchmark_pub"),
+    "tcp": ("tcp://127.0.0.1:22014", "tcp://127.0.0.1:24102"),
+}
+
+
+class BenchmarkClient(RpcClient):
+    """"""
+
+    def __init__(self, serializer: str) -> None:
+        """"""
+        super().__init__([serializer])
+
+        self.target: int = 0
+        self.count: int = 0
+        self.finished: ThreadEvent = ThreadEvent()
+
+        # Keep every message for benchmark instead of dropping at high water mark
+        self._socket_sub.setsockopt(zmq.RCVHWM, 0)
+
+    def callback(self, topic: str, data: Any) -> None:
+        """"""
+        self.count += 1
+        if self.count >= self.target:
+            self.finished.set()
+
+    def reset(self, target: int) -> None:
+        """"""
+        self.count = 0
+        self.target = target
+        self.finished.clear()
+
+
+def generate_events(count: int) -> List[Event]:
+    """"""
+    events: List[Event] = []
+    dt: datetime = datetime(2023, 9, 1, 9, 0, 0, tzinfo=CHINA_TZ)
+
+    for i in range(count):
+        price: float = 3700 + i % 50
+        tick: TickData = TickData(
+            symbol="rb2401",
+            exchange=Exchange.SHFE,
+            datetime=dt + timedelta(milliseconds=500 * i),
+            name="螺纹钢2401",
+            volume=1000 + i,
+            turnover=3.7e7 + i,
+            open_interest=2e6,
+            last_price=price,
+            limit_up=4000,
+            limit_down=3400,
+            open_price=3690,
+            high_price=3760,
+            low_price=3680,
+            pre_close=3695,
+            bid_price_1=price - 1,
+            ask_price_1=price,
+            bid_volume_1=10,
+            ask_volume_1=20,
+            localtime=datetime.now(),
+            gateway_name="CTP"
+        )
+        events.append(Event(EVENT_TICK, tick))
+
+    return events
+
+
+def benchmark_encoding(events: List[Event]) -> None:
+    """"""
+    print("serializer  bytes  dumps(us)  loads(us)")
+
+    for name, serializer in SERIALIZERS.items():
+        frames_list: list = []
+
+        start: float = perf_counter()
+        for event in events:
+            frames_list.append(serializer.dumps(event))
+        dumps_time: float = perf_counter() - start
+
+        start = perf_counter()
+        for frames in frames_list:
+            serializer.loads(frames)
+        loads_time: float = perf_counter() - start
+
+        size: int = sum(len(frame) for frame in frames_list[0])
+        count: int = len(events)
+        print(f"{name:10s}  {size:5d}  {dumps_time / count * 1e6:9.2f}  {loads_time / count * 1e6:9.2f}")
+
+
+def benchmark_publish(events: List[Event], transport: str, name: str) -> None:
+    """"""
+    rep_address, pub_address = ADDRESSES[transport]
+
+    server: RpcServer = RpcServer()
+    server._socket_pub.setsockopt(zmq.SNDHWM, 0)
+    server.start(rep_address, pub_address)
+
+    client: BenchmarkClient = BenchmarkClient(name)
+    client.subscribe_topic("")
+    client.start(rep_address, pub_address)
+
+    # Wait for subscription to reach server
+    client.reset(1)
+    while not client.finished.wait(0.1):
+        server.publish("", events[0])
+    sleep(0.5)
+
+    serializer: Serializer = SERIALIZERS[name]
+    count: int = len(events)
+
+    client.reset(count)
+
+    start: float = perf_counter()
+    for event in events:
+        server.publish("", event)
+    publish_time: float = perf_counter() - start
+
+    client.finished.wait(60)
+    total_time: float = perf_counter() - start
+
+    print(
+        f"{transport:9s}  {serializer.name:10s}  {count / publish_time:12,.0f}"
+        f"  {client.count / total_time:13,.0f}  {client.count:8d}"
+    )
+
+    client.stop()
+    server.publish("", events[0])
+    client.join()
+
+    server.stop()
+    server.join()
+
+
+def run(count: int) -> None:
+    """"""
+    events: List[Event] = generate_events(count)
+
+    benchmark_encoding(events)
+    print()
+
+    print("transport  serializer  publish(/s)  received(/s)  received")
+    for transport in ADDRESSES:
+        for name in SERIALIZERS:
+            benchmark_publish(events, transport, name)
+
+
+if __name__ == "__main__":
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    run(count)
@@ -0,0 +1,126 @@
+"""
+Measure time from CTP login to receiving the full market, subscribing
+all futures contracts one request at a time or with subscribe_batch.
+
+Usage: python run.py [single|batch] [timeout]
+
+Connection setting is loaded from connect_ctp.json in the trader folder.
+Run it in trading period, once for each mode, since the front only pushes
+a tick after subscription when the market is active.
+"""
+
+import sys
+from threading import Event as ThreadEvent
+from time import perf_counter
+from typing import Dict, List, Set
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_LOG, EVENT_TICK
+from Pandora.constant import Product
+from Pandora.trader.object import ContractData, LogData, SubscribeRequest, TickData
+from Pandora.trader.utility import load_json
+
+
+GATEWAY_NAME = "CTP"
+
+
+class Timeline:
+    """"""
+
+    def __init__(self) -> None:
+        """"""
+        self.times: Dict[str, float] = {"connect": perf_counter()}
+
+        self.pending: Set[str] = set()
+        self.total: int = 0
+
+        self.contract_inited: ThreadEvent = ThreadEvent()
+        self.market_received: ThreadEvent = ThreadEvent()
+
+    def process_log_event(self, event: Event) -> None:
+        """"""
+        log: LogData = event.data
+
+        if log.msg == "行情服务器登录成功":
+            self.times.setdefault("login", perf_counter())
+        elif log.msg == "合约信息查询成功":
+            self.times.setdefault("contract", perf_counter())
+            self.contract_inited.set()
+
+    def process_tick_event(self, event: Event) -> None:
+        """"""
+        tick: TickData = event.data
+        if tick.symbol not in self.pending:
+            return
+
+        self.pending.remove(tick.symbol)
+        if not self.pending:
+            self.times["market"] = perf_counter()
+            self.market_received.set()
+
+    def start(self, symbols: List[str]) -> None:
+        """"""
+        self.pending = set(symbols)
+        self.total = len(symbols)
+
+
+def run(mode: str, timeout: float) -> None:
+    """"""
+    event_engine: EventEngine = EventEngine()
+    main_engine: MainEngine = MainEngine(event_engine)
+    main_engine.add_gateway("vnpy.app.vnpy_ctp.CtpGateway", GATEWAY_NAME)
+
+    setting: dict = load_json(f"connect_{GATEWAY_NAME.lower()}.json")
+
+    timeline: Timeline = Timeline()
+    event_engine.register(EVENT_LOG, timeline.process_log_event)
+    event_engine.register(EVENT_TICK, timeline.process_tick_event)
+
+    main_engine.connect(setting, GATEWAY_NAME)
+
+    if not timeline.contract_inited.wait(timeout):
+        print("合约信息查询超时")
+        main_engine.close()
+        return
+
+    contracts: List[ContractData] = [
+        c for c in main_engine.get_all_contracts()
+        if c.product == Product.FUTURES and c.gateway_name == GATEWAY_NAME
+    ]
+    reqs: List[SubscribeRequest] = [
+        SubscribeRequest(symbol=c.symbol, exchange=c.exchange) for c in contracts
+    ]
+    timeline.start([req.symbol for req in reqs])
+
+    timeline.times["subscribe"] = perf_counter()
+    if mode == "batch":
+        main_engine.subscribe_batch(reqs, GATEWAY_NAME)
+    else:
+        for req in reqs:
+            main_engine.subscribe(req, GATEWAY_NAME)
+    timeline.times["subscribed"] = perf_counter()
+
+    timeline.market_received.wait(timeout)
+    main_engine.close()
+
+    times: Dict[str, float] = timeline.times
+    received: int = timeline.total - len(timeline.pending)
+
+    print(f"mode: {mode}, contracts: {timeline.total}, received: {received}")
+    print(f"connect to login:         {times.get('login', 0) - times['connect']:.3f}s")
+    print(f"login to contracts:       {times['contract'] - times.get('login', times['connect']):.3f}s")
+    print(f"subscribe calls:          {(times['subscribed'] - times['subscribe']) * 1000:.1f}ms")
+
+    if "market" in times:
+        print(f"subscribe to full market: {times['market'] - times['subscribe']:.3f}s")
+        print(f"login to full market:     {times['market'] - times.get('login', times['connect']):.3f}s")
+    else:
+        print(f"full market not received in {timeout}s, missing: {sorted(timeline.pending)[:10]}")
+
+
+if __name__ == "__main__":
+    mode: str = sys.argv[1] if len(sys.argv) > 1 else "batch"
+    timeout: float = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    run(mode, timeout)
@@ -10,11 +10,6 @@ from vnpy.trader.database import get_database
 from vnpy.trader.setting import SETTINGS
 from vnpy.trader.engine import MainEngine
 
-from vnpy.app.vnpy_ctp import CtpGateway
-from vnpy.app.vnpy_datarecorder import DataRecorderApp
-from vnpy.app.vnpy_datarecorder.engine import EVENT_RECORDER_LOG
-from vnpy.app.vnpy_mcmanager.engine import MainContractManager
-
 SETTINGS["log.active"] = True
 SETTINGS["log.level"] = INFO
 SETTINGS["log.console"] = True
@@ -60,12 +55,17 @@ def run_child():
     """
     SETTINGS["log.file"] = True
 
+    # Gateway and app modules are only imported in child process, and
+    # import time is recorded by main engine
     event_engine = EventEngine()
     main_engine = MainEngine(event_engine)
-    gateway = main_engine.add_gateway(CtpGateway)
-    recorder = main_engine.add_app(DataRecorderApp)
+    gateway = main_engine.add_gateway("vnpy.app.vnpy_ctp.CtpGateway", "CTP")
+    recorder = main_engine.add_app("vnpy.app.vnpy_datarecorder.DataRecorderApp")
     main_engine.write_log("主引擎创建成功")
 
+    from vnpy.app.vnpy_datarecorder.engine import EVENT_RECORDER_LOG
+    from vnpy.app.vnpy_mcmanager.engine import MainContractManager
+
     log_engine = main_engine.get_engine("log")
     event_engine.register(EVENT_RECORDER_LOG, log_engine.process_log_event)
     main_engine.write_log("注册日志事件监听")
@@ -73,6 +73,7 @@ def run_child():
     # ctp_setting = load_json(f"connect_{gateway.gateway_name.lower()}.json")
 
     mc_manager = main_engine.add_engine(MainContractManager)
+    main_engine.report_load_times()
 
     main_engine.connect(CTP_SETTING, "CTP")
     main_engine.write_log("连接CTP接口")
@@ -83,10 +84,9 @@ def run_child():
         contracts = main_engine.get_all_contracts()
 
         if len(contracts) > len(mc_manager.get_main_contracts()):
-            for i in contracts:
-                if i.product == Product.FUTURES:
-                    recorder.add_tick_recording(i.vt_symbol)
-                    recorder.add_bar_recording(i.vt_symbol)
+            vt_symbols = [i.vt_symbol for i in contracts if i.product == Product.FUTURES]
+            recorder.add_tick_recordings(vt_symbols)
+            recorder.add_bar_recordings(vt_symbols)
 
             break
 
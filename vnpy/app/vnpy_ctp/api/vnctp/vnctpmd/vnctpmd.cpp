@@ -682,6 +682,24 @@ int MdApi::subscribeMarketData(string instrumentID)
 	return i;
 };
 
+int MdApi::subscribeMarketDataList(const list &instrumentIDs)
+{
+	vector<string> symbols;
+	for (const auto &item : instrumentIDs)
+	{
+		symbols.push_back(item.cast<string>());
+	}
+
+	vector<char*> myreq;
+	for (string &symbol : symbols)
+	{
+		myreq.push_back((char*)symbol.c_str());
+	}
+
+	int i = this->api->SubscribeMarketData(myreq.data(), (int)myreq.size());
+	return i;
+};
+
 int MdApi::unSubscribeMarketData(string instrumentID)
 {
 	char* buffer = (char*)instrumentID.c_str();
@@ -930,6 +948,7 @@ PYBIND11_MODULE(vnctpmd, m)
 		.def("registerNameServer", &MdApi::registerNameServer)
 		.def("registerFensUserInfo", &MdApi::registerFensUserInfo)
 		.def("subscribeMarketData", &MdApi::subscribeMarketData)
+		.def("subscribeMarketDataList", &MdApi::subscribeMarketDataList)
 		.def("unSubscribeMarketData", &MdApi::unSubscribeMarketData)
 		.def("subscribeForQuoteRsp", &MdApi::subscribeForQuoteRsp)
 		.def("unSubscribeForQuoteRsp", &MdApi::unSubscribeForQuoteRsp)
@@ -13,7 +13,7 @@ from Pandora.trader.object import (
     BarData,
     ContractData
 )
-from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT, EVENT_TIMER
+from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
 from Pandora.trader.utility import load_json, save_json, BarGenerator
 from vnpy.trader.database import BaseDatabase, get_database
 from vnpy.app.vnpy_spreadtrading.base import EVENT_SPREAD_DATA, SpreadData
@@ -46,8 +46,8 @@ class RecorderEngine(BaseEngine):
         self.bar_generators: Dict[str, BarGenerator] = {}
         self.sub_bar_generators: Dict[str, List[BarGenerator]] = {}
 
-        self.timer_count: int = 0
         self.timer_interval: int = 10
+        self.timer_id: int = 0
 
         self.ticks: List[TickData] = []
         self.bars: List[BarData] = []
@@ -121,61 +121,92 @@ class RecorderEngine(BaseEngine):
 
     def add_bar_recording(self, vt_symbol: str) -> None:
         """"""
-        if vt_symbol in self.bar_recordings:
-            self.write_log(f"已在K线记录列表中：{vt_symbol}")
-            return
-
-        if Exchange.LOCAL.value not in vt_symbol:
-            contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
-            if not contract:
-                self.write_log(f"找不到合约：{vt_symbol}")
-                return
+        self.add_bar_recordings([vt_symbol])
 
-            self.bar_recordings[vt_symbol] = {
-                "symbol": contract.symbol,
-                "exchange": contract.exchange.value,
-                "product": contract.product,
-                "gateway_name": contract.gateway_name
-            }
+    def add_tick_recording(self, vt_symbol: str) -> None:
+        """"""
+        self.add_tick_recordings([vt_symbol])
+
+    def add_bar_recordings(self, vt_symbols: List[str]) -> None:
+        """
+        Add bar recording of a list of symbols, with setting saved and
+        contracts subscribed only once.
+        """
+        added: List[str] = []
+        contracts: List[ContractData] = []
+
+        for vt_symbol in vt_symbols:
+            if vt_symbol in self.bar_recordings:
+                self.write_log(f"已在K线记录列表中：{vt_symbol}")
+                continue
 
-            self.subscribe(contract)
-        else:
-            self.bar_recordings[vt_symbol] = {}
+            if Exchange.LOCAL.value not in vt_symbol:
+                contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
+                if not contract:
+                    self.write_log(f"找不到合约：{vt_symbol}")
+                    continue
+
+                self.bar_recordings[vt_symbol] = {
+                    "symbol": contract.symbol,
+                    "exchange": contract.exchange.value,
+                    "product": contract.product,
+                    "gateway_name": contract.gateway_name
+                }
+
+                contracts.append(contract)
+            else:
+                self.bar_recordings[vt_symbol] = {}
+
+            added.append(vt_symbol)
+            self.write_log(f"添加K线记录成功：{vt_symbol}")
+
+        if added:
+            self.update_recordings(contracts)
+
+    def add_tick_recordings(self, vt_symbols: List[str]) -> None:
+        """
+        Add tick recording of a list of symbols, with setting saved and
+        contracts subscribed only once.
+        """
+        added: List[str] = []
+        contracts: List[ContractData] = []
+
+        for vt_symbol in vt_symbols:
+            if vt_symbol in self.tick_recordings:
+                self.write_log(f"已在Tick记录列表中：{vt_symbol}")
+                continue
 
-        self.save_setting()
-        self.put_event()
+            # For normal contract
+            if Exchange.LOCAL.value not in vt_symbol:
+                contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
+                if not contract:
+                    self.write_log(f"找不到合约：{vt_symbol}")
+                    continue
 
-        self.write_log(f"添加K线记录成功：{vt_symbol}")
+                self.tick_recordings[vt_symbol] = {
+                    "symbol": contract.symbol,
+                    "exchange": contract.exchange.value,
+                    "gateway_name": contract.gateway_name
+                }
 
-    def add_tick_recording(self, vt_symbol: str) -> None:
-        """"""
-        if vt_symbol in self.tick_recordings:
-            self.write_log(f"已在Tick记录列表中：{vt_symbol}")
-            return
+                contracts.append(contract)
+            # No need to subscribe for spread data
+            else:
+                self.tick_recordings[vt_symbol] = {}
 
-        # For normal contract
-        if Exchange.LOCAL.value not in vt_symbol:
-            contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
-            if not contract:
-                self.write_log(f"找不到合约：{vt_symbol}")
-                return
+            added.append(vt_symbol)
+            self.write_log(f"添加Tick记录成功：{vt_symbol}")
 
-            self.tick_recordings[vt_symbol] = {
-                "symbol": contract.symbol,
-                "exchange": contract.exchange.value,
-                "gateway_name": contract.gateway_name
-            }
+        if added:
+            self.update_recordings(contracts)
 
-            self.subscribe(contract)
-        # No need to subscribe for spread data
-        else:
-            self.tick_recordings[vt_symbol] = {}
+    def update_recordings(self, contracts: List[ContractData]) -> None:
+        """"""
+        self.subscribe_batch(contracts)
 
         self.save_setting()
         self.put_event()
 
-        self.write_log(f"添加Tick记录成功：{vt_symbol}")
-
     def remove_bar_recording(self, vt_symbol: str) -> None:
         """"""
         if vt_symbol not in self.bar_recordings:
@@ -202,7 +233,7 @@ class RecorderEngine(BaseEngine):
 
     def register_event(self) -> None:
         """"""
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+        self.timer_id = self.event_engine.add_timer(self.flush, self.timer_interval)
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_SPREAD_DATA, self.process_spread_event)
@@ -216,13 +247,19 @@ class RecorderEngine(BaseEngine):
             bg: BarGenerator = self.get_bar_generator(tick.vt_symbol)
             bg.update_tick(copy(tick))
 
-    def process_timer_event(self, event: Event) -> None:
-        """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_interval:
-            return
-        self.timer_count = 0
+    def set_timer_interval(self, timer_interval: int) -> None:
+        """
+        Change interval of flushing data into database.
+        """
+        self.timer_interval = timer_interval
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(self.flush, self.timer_interval)
+
+    def flush(self) -> None:
+        """
+        Put data recorded since last flush into database writing queue.
+        """
         if self.bars:
             self.queue.put(("bar", self.bars.copy()))
             self.bars.clear()
@@ -324,3 +361,17 @@ class RecorderEngine(BaseEngine):
             exchange=contract.exchange
         )
         self.main_engine.subscribe(req, contract.gateway_name)
+
+    def subscribe_batch(self, contracts: List[ContractData]) -> None:
+        """"""
+        gateway_reqs: Dict[str, List[SubscribeRequest]] = {}
+
+        for contract in contracts:
+            req: SubscribeRequest = SubscribeRequest(
+                symbol=contract.symbol,
+                exchange=contract.exchange
+            )
+            gateway_reqs.setdefault(contract.gateway_name, []).append(req)
+
+        for gateway_name, reqs in gateway_reqs.items():
+            self.main_engine.subscribe_batch(reqs, gateway_name)
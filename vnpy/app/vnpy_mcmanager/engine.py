@@ -1,5 +1,7 @@
+from collections import defaultdict
 from copy import copy
 from datetime import timedelta, time, datetime
+from typing import Dict, List
 
 from Pandora.constant import SymbolSuffix
 from Pandora.helper import TDays
@@ -38,6 +40,9 @@ class MainContractManager(BaseEngine):
         self._subscribe = self.main_engine.subscribe
         self.main_engine.subscribe = self.subscribe
 
+        self._subscribe_batch = self.main_engine.subscribe_batch
+        self.main_engine.subscribe_batch = self.subscribe_batch
+
         self.load_main_contracts()
         self.map_contracts()
         self.register_event()
@@ -144,6 +149,23 @@ class MainContractManager(BaseEngine):
 
         self._subscribe(req, gateway_name)
 
+    def subscribe_batch(self, reqs: List[SubscribeRequest], gateway_name: str) -> None:
+        # 主连合约映射到对应接口的真实合约后，按接口分组批量订阅
+        gateway_reqs: Dict[str, List[SubscribeRequest]] = defaultdict(list)
+
+        for req in reqs:
+            if req.symbol in self.mc_symbol_map:
+                mc_symbol = req.symbol
+                req.symbol = self.mc_symbol_map[mc_symbol]
+                gateway_reqs[self.mc_symbol_gateway[mc_symbol]].append(req)
+
+                req.__post_init__()
+            else:
+                gateway_reqs[gateway_name].append(req)
+
+        for name, batch in gateway_reqs.items():
+            self._subscribe_batch(batch, name)
+
     def get_main_contracts(self):
         return self.main_contracts
 
@@ -63,8 +63,8 @@ class OptionEngine(BaseEngine):
         self.instruments: Dict[str, InstrumentData] = {}
         self.active_portfolios: Dict[str, PortfolioData] = {}
 
-        self.timer_count: int = 0
         self.timer_trigger: int = 60
+        self.timer_id: int = 0
 
         self.hedge_engine: OptionHedgeEngine = OptionHedgeEngine(self)
         self.algo_engine: OptionAlgoEngine = OptionAlgoEngine(self)
@@ -77,6 +77,8 @@ class OptionEngine(BaseEngine):
 
     def close(self) -> None:
         """"""
+        self.risk_engine.close()
+
         self.save_setting()
         self.save_data()
 
@@ -155,7 +157,8 @@ class OptionEngine(BaseEngine):
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+        self.timer_id = self.event_engine.add_timer(self.calculate_atm_price, self.timer_trigger)
 
     def process_tick_event(self, event: Event) -> None:
         """"""
@@ -196,13 +199,8 @@ class OptionEngine(BaseEngine):
             portfolio: PortfolioData = self.get_portfolio(portfolio_name)
             portfolio.add_option(contract)
 
-    def process_timer_event(self, event: Event) -> None:
+    def calculate_atm_price(self) -> None:
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_trigger:
-            return
-        self.timer_count = 0
-
         for portfolio in self.active_portfolios.values():
             portfolio.calculate_atm_price()
 
@@ -344,6 +342,9 @@ class OptionEngine(BaseEngine):
         """"""
         self.timer_trigger = timer_trigger
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(self.calculate_atm_price, self.timer_trigger)
+
 
 class OptionHedgeEngine:
     """"""
@@ -364,14 +365,13 @@ class OptionHedgeEngine:
 
         self.active: bool = False
         self.active_orderids: Set[str] = set()
-        self.timer_count: int = 0
+        self.timer_id: int = 0
 
         self.register_event()
 
     def register_event(self) -> None:
         """"""
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
 
     def process_order_event(self, event: Event) -> None:
         """"""
@@ -383,18 +383,6 @@ class OptionHedgeEngine:
         if not order.is_active():
             self.active_orderids.remove(order.vt_orderid)
 
-    def process_timer_event(self, event: Event) -> None:
-        """"""
-        if not self.active:
-            return
-
-        self.timer_count += 1
-        if self.timer_count < self.timer_trigger:
-            return
-        self.timer_count = 0
-
-        self.run()
-
     def start(
         self,
         portfolio_name: str,
@@ -416,6 +404,7 @@ class OptionHedgeEngine:
         self.hedge_payup = hedge_payup
 
         self.active = True
+        self.timer_id = self.event_engine.add_timer(self.run, self.timer_trigger)
 
     def stop(self) -> None:
         """"""
@@ -423,7 +412,7 @@ class OptionHedgeEngine:
             return
 
         self.active = False
-        self.timer_count = 0
+        self.event_engine.remove_timer(self.timer_id)
 
     def run(self) -> None:
         """"""
@@ -720,8 +709,8 @@ class OptionRiskEngine:
         self.cancel_orderids: set[str] = set()
 
         # 定时运行参数
-        self.timer_count: int = 0
         self.timer_trigger: int = 10
+        self.timer_id: int = 0
 
         self.register_event()
 
@@ -729,7 +718,12 @@ class OptionRiskEngine:
         """"""
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+        self.timer_id = self.event_engine.add_timer(self.calculate_net_pos, self.timer_trigger)
+
+    def close(self) -> None:
+        """"""
+        self.event_engine.remove_timer(self.timer_id)
 
     def process_order_event(self, event: Event) -> None:
         """"""
@@ -745,13 +739,8 @@ class OptionRiskEngine:
 
         self.trade_volume += trade.volume
 
-    def process_timer_event(self, event: Event) -> None:
+    def calculate_net_pos(self) -> None:
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_trigger:
-            return
-        self.timer_count = 0
-
         self.net_pos = 0
         for instrument in self.instruments.values():
             self.net_pos += instrument.net_pos
@@ -18,8 +18,7 @@ from vnpy.trader.event import (
     EVENT_TICK,
     EVENT_POSITION,
     EVENT_CONTRACT,
-    EVENT_LOG,
-    EVENT_TIMER
+    EVENT_LOG
 )
 from Pandora.constant import (
     Status,
@@ -50,7 +49,7 @@ class PaperEngine(BaseEngine):
         self.order_count: int = 100000
         self.quote_count: int = 100000
         self.trade_count: int = 0
-        self.timer_count: int = 0
+        self.timer_id: int = 0
 
         self.active_orders: Dict[str, Dict[str, OrderData]] = {}
         self.active_quotes: Dict[str, QuoteData] = {}
@@ -77,7 +76,7 @@ class PaperEngine(BaseEngine):
         """"""
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+        self.timer_id = self.event_engine.add_timer(self.update_positions, self.timer_interval)
 
     def process_contract_event(self, event: Event) -> None:
         """"""
@@ -113,13 +112,10 @@ class PaperEngine(BaseEngine):
             if not quote.is_active():
                 self.active_quotes.pop(tick.vt_symbol)
 
-    def process_timer_event(self, event: Event) -> None:
-        """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_interval:
-            return
-        self.timer_count = 0
-
+    def update_positions(self) -> None:
+        """
+        Calculate pnl and push all positions.
+        """
         for position in self.positions.values():
             contract: Optional[ContractData] = self.main_engine.get_contract(position.vt_symbol)
             if contract:
@@ -579,6 +575,9 @@ class PaperEngine(BaseEngine):
         self.timer_interval = timer_interval
         self.save_setting()
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(self.update_positions, self.timer_interval)
+
     def set_instant_trade(self, instant_trade: bool) -> None:
         """"""
         self.instant_trade = bool(instant_trade)
@@ -6,6 +6,7 @@ from pathlib import Path
 from types import ModuleType
 from typing import Dict, List, Set, Tuple, Type, Any, Callable, Optional
 from datetime import datetime, timedelta
+from time import perf_counter
 from concurrent.futures import ThreadPoolExecutor
 
 from Pandora.helper import TDays
@@ -143,6 +144,8 @@ class StrategyEngine(BaseEngine):
         net: bool,
     ) -> list:
         """发送委托"""
+        start: float = perf_counter()
+
         contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
         if not contract:
             self.write_log(f"委托失败，找不到合约：{vt_symbol}", strategy)
@@ -172,8 +175,9 @@ class StrategyEngine(BaseEngine):
         vt_orderids: list = []
 
         for req in req_list:
-            vt_orderid: str = self.main_engine.send_order(
-                req, contract.gateway_name)
+            with self.main_engine.trace_strategy(start):
+                vt_orderid: str = self.main_engine.send_order(
+                    req, contract.gateway_name)
 
             if not vt_orderid:
                 continue
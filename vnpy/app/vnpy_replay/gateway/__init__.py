@@ -0,0 +1 @@
+from .replay_gateway import ReplayGateway
@@ -0,0 +1,373 @@
+from copy import copy
+from datetime import datetime
+from heapq import merge
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from vnpy.event import EventEngine
+from vnpy.event.journal import read_journal
+from Pandora.constant import (
+    Direction,
+    Offset,
+    Exchange,
+    OrderType,
+    Product,
+    Status
+)
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.database import BaseDatabase, get_database
+from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
+from Pandora.trader.object import (
+    TickData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    ContractData,
+    OrderRequest,
+    CancelRequest,
+    SubscribeRequest,
+)
+from Pandora.trader.utility import extract_vt_symbol
+
+
+# 数据来源
+SOURCE_DATABASE = "数据库"
+SOURCE_FILE = "文件"
+
+# 回放开始方式
+START_SUBSCRIBE = "首次订阅"
+START_MANUAL = "手动"
+
+
+class ReplayGateway(BaseGateway):
+    """
+    VeighNa用于本地回放历史Tick行情并模拟委托成交的交易接口，
+    可以在没有柜台连接的情况下测试完整的行情和交易链路。
+    """
+
+    default_name: str = "REPLAY"
+
+    default_setting: Dict[str, Any] = {
+        "数据来源": [SOURCE_DATABASE, SOURCE_FILE],
+        "文件路径": "",
+        "合约代码": "",
+        "产品类型": [
+            Product.FUTURES.value,
+            Product.OPTION.value,
+            Product.ETF.value,
+            Product.INDEX.value
+        ],
+        "开始日期": "",
+        "结束日期": "",
+        "回放速度": 1.0,
+        "初始资金": 1_000_000.0,
+        "开始方式": [START_SUBSCRIBE, START_MANUAL]
+    }
+
+    exchanges: List[Exchange] = list(Exchange)
+
+    def __init__(self, event_engine: EventEngine, gateway_name: str) -> None:
+        """构造函数"""
+        super().__init__(event_engine, gateway_name)
+
+        self.speed: float = 1.0
+        self.balance: float = 0
+        self.start_mode: str = START_SUBSCRIBE
+
+        self.contracts: Dict[str, ContractData] = {}
+        self.ticks: List[TickData] = []
+        self.subscribed: Set[str] = set()
+
+        self.last_ticks: Dict[str, TickData] = {}
+        self.active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.positions: Dict[Tuple[str, Direction], PositionData] = {}
+        self.order_count: int = 0
+        self.trade_count: int = 0
+        self.lock: Lock = Lock()
+
+        self.active: bool = False
+        self.stop_event: Event = Event()
+        self.thread: Optional[Thread] = None
+
+    def connect(self, setting: dict) -> None:
+        """连接交易接口"""
+        if self.active:
+            return
+
+        self.speed = float(setting["回放速度"])
+        self.balance = float(setting["初始资金"])
+        self.start_mode = setting.get("开始方式", START_SUBSCRIBE)
+
+        if setting["数据来源"] == SOURCE_FILE:
+            self.load_file(setting["文件路径"])
+        else:
+            vt_symbols: List[str] = [s.strip() for s in setting["合约代码"].split(",") if s.strip()]
+            start: datetime = datetime.strptime(setting["开始日期"], "%Y%m%d")
+            end: datetime = datetime.strptime(setting["结束日期"], "%Y%m%d").replace(hour=23, minute=59, second=59)
+            product: Product = Product(setting["产品类型"])
+            self.load_database(vt_symbols, product, start, end)
+
+        for contract in self.contracts.values():
+            self.on_contract(contract)
+        self.write_log(f"合约信息加载成功，共{len(self.contracts)}个")
+
+        self.write_log(f"Tick数据加载成功，共{len(self.ticks)}条，回放速度{self.speed}倍")
+
+        self.query_account()
+
+        self.active = True
+        self.stop_event.clear()
+
+        if self.start_mode == START_SUBSCRIBE:
+            self.write_log("首次订阅行情后开始回放")
+
+            # 连接前已经订阅过行情
+            if self.subscribed:
+                self.start_replay()
+        else:
+            self.write_log("调用start_replay后开始回放")
+
+    def start_replay(self) -> None:
+        """
+        开始回放线程，回放时钟从此开始计算，之前需完成行情订阅，
+        未订阅合约的Tick会被跳过
+        """
+        with self.lock:
+            if not self.active or self.thread:
+                return
+
+            self.thread = Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def load_database(
+        self,
+        vt_symbols: List[str],
+        product: Product,
+        start: datetime,
+        end: datetime
+    ) -> None:
+        """从数据库加载合约和Tick数据，合约信息按产品类型分表保存"""
+        database: BaseDatabase = get_database()
+
+        tick_lists: List[List[TickData]] = []
+
+        for vt_symbol in vt_symbols:
+            symbol, exchange = extract_vt_symbol(vt_symbol)
+
+            ticks: List[TickData] = database.load_tick_data(symbol, exchange, start, end)
+            tick_lists.append(ticks)
+
+            for contract in database.load_contract_data(symbol=symbol, product=product, start=start, end=end):
+                if contract.vt_symbol == vt_symbol:
+                    contract.gateway_name = self.gateway_name
+                    self.contracts[vt_symbol] = contract
+
+            if vt_symbol not in self.contracts:
+                self.write_log(f"数据库中找不到{product.value}合约信息{vt_symbol}")
+
+        self.ticks = list(merge(*tick_lists, key=lambda tick: tick.datetime))
+
+    def load_file(self, path: str) -> None:
+        """从事件日志文件（EventJournal）加载合约和Tick数据"""
+        self.ticks = []
+
+        for _, event in read_journal(path):
+            if event.type == EVENT_TICK:
+                self.ticks.append(event.data)
+            elif event.type == EVENT_CONTRACT:
+                contract: ContractData = event.data
+                contract.gateway_name = self.gateway_name
+                self.contracts[contract.vt_symbol] = contract
+
+    def run(self) -> None:
+        """回放线程"""
+        start: float = perf_counter()
+        first_dt: Optional[datetime] = None
+
+        for tick in self.ticks:
+            if self.stop_event.is_set():
+                return
+
+            if tick.vt_symbol not in self.subscribed:
+                continue
+
+            if self.speed:
+                if not first_dt:
+                    first_dt = tick.datetime
+
+                delay: float = start + (tick.datetime - first_dt).total_seconds() / self.speed - perf_counter()
+                if delay > 0 and self.stop_event.wait(delay):
+                    return
+
+            tick = copy(tick)
+            tick.gateway_name = self.gateway_name
+            self.process_tick(tick)
+
+        self.write_log("Tick数据回放结束")
+
+    def process_tick(self, tick: TickData) -> None:
+        """撮合活动委托后推送行情"""
+        with self.lock:
+            self.last_ticks[tick.vt_symbol] = tick
+
+            active_orders: Optional[dict] = self.active_orders.get(tick.vt_symbol, None)
+            if active_orders:
+                for orderid, order in list(active_orders.items()):
+                    self.cross_order(order, tick)
+
+                    if not order.is_active():
+                        active_orders.pop(orderid)
+
+        self.on_tick(tick)
+
+    def subscribe(self, req: SubscribeRequest) -> None:
+        """订阅行情"""
+        self.subscribed.add(req.vt_symbol)
+
+        if self.start_mode == START_SUBSCRIBE:
+            self.start_replay()
+
+    def send_order(self, req: OrderRequest) -> str:
+        """委托下单"""
+        with self.lock:
+            self.order_count += 1
+            orderid: str = str(self.order_count)
+
+            order: OrderData = req.create_order_data(orderid, self.gateway_name)
+            self.on_order(copy(order))
+
+            # 模拟交易所委托确认
+            if req.vt_symbol not in self.contracts:
+                order.status = Status.REJECTED
+                self.on_order(copy(order))
+                self.write_log(f"委托被拒单，找不到该合约{req.vt_symbol}")
+                return order.vt_orderid
+
+            tick: Optional[TickData] = self.last_ticks.get(order.vt_symbol, None)
+            if tick:
+                order.datetime = tick.datetime
+
+            order.status = Status.NOTTRADED
+            self.on_order(copy(order))
+
+            # 使用最新行情立即撮合，FAK和FOK未成交部分撤销
+            if tick:
+                self.cross_order(order, tick)
+
+            if order.is_active():
+                if order.type in {OrderType.FAK, OrderType.FOK}:
+                    order.status = Status.CANCELLED
+                    self.on_order(copy(order))
+                else:
+                    active_orders: dict = self.active_orders.setdefault(order.vt_symbol, {})
+                    active_orders[orderid] = order
+
+        return order.vt_orderid
+
+    def cancel_order(self, req: CancelRequest) -> None:
+        """委托撤单"""
+        with self.lock:
+            active_orders: dict = self.active_orders.get(req.vt_symbol, {})
+            order: Optional[OrderData] = active_orders.pop(req.orderid, None)
+
+            if order:
+                order.status = Status.CANCELLED
+                self.on_order(copy(order))
+
+    def cross_order(self, order: OrderData, tick: TickData) -> None:
+        """使用行情撮合委托，全部成交"""
+        trade_price: float = 0
+
+        if order.direction == Direction.LONG:
+            if order.type == OrderType.MARKET or order.price >= tick.ask_price_1:
+                trade_price = tick.ask_price_1
+        else:
+            if order.type == OrderType.MARKET or order.price <= tick.bid_price_1:
+                trade_price = tick.bid_price_1
+
+        if not trade_price:
+            return
+
+        order.status = Status.ALLTRADED
+        order.traded = order.volume
+        self.on_order(copy(order))
+
+        self.trade_count += 1
+        trade: TradeData = TradeData(
+            symbol=order.symbol,
+            exchange=order.exchange,
+            orderid=order.orderid,
+            tradeid=str(self.trade_count),
+            direction=order.direction,
+            offset=order.offset,
+            price=trade_price,
+            volume=order.volume,
+            datetime=tick.datetime,
+            gateway_name=self.gateway_name
+        )
+        self.on_trade(trade)
+
+        self.update_position(trade)
+
+    def update_position(self, trade: TradeData) -> None:
+        """根据成交更新持仓"""
+        if trade.offset == Offset.OPEN:
+            position: PositionData = self.get_position(trade.vt_symbol, trade.direction)
+
+            cost: float = position.price * position.volume + trade.price * trade.volume
+            position.volume += trade.volume
+            position.price = cost / position.volume
+        else:
+            if trade.direction == Direction.LONG:
+                position = self.get_position(trade.vt_symbol, Direction.SHORT)
+            else:
+                position = self.get_position(trade.vt_symbol, Direction.LONG)
+
+            position.volume = max(position.volume - trade.volume, 0)
+            if not position.volume:
+                position.price = 0
+
+        self.on_position(copy(position))
+
+    def get_position(self, vt_symbol: str, direction: Direction) -> PositionData:
+        """获取持仓，不存在则创建"""
+        key: Tuple[str, Direction] = (vt_symbol, direction)
+
+        position: Optional[PositionData] = self.positions.get(key, None)
+        if not position:
+            symbol, exchange = extract_vt_symbol(vt_symbol)
+            position = PositionData(
+                symbol=symbol,
+                exchange=exchange,
+                direction=direction,
+                gateway_name=self.gateway_name
+            )
+            self.positions[key] = position
+
+        return position
+
+    def query_account(self) -> None:
+        """查询资金"""
+        account: AccountData = AccountData(
+            accountid=self.gateway_name,
+            balance=self.balance,
+            gateway_name=self.gateway_name
+        )
+        self.on_account(account)
+
+    def query_position(self) -> None:
+        """查询持仓"""
+        with self.lock:
+            for position in self.positions.values():
+                self.on_position(copy(position))
+
+    def close(self) -> None:
+        """关闭接口"""
+        self.active = False
+        self.stop_event.set()
+
+        if self.thread:
+            self.thread.join()
+            self.thread = None
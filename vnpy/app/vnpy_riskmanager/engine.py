@@ -4,7 +4,7 @@ from typing import Callable, Dict, Optional
 from vnpy.event import Event, EventEngine
 from Pandora.trader.object import OrderData, OrderRequest, LogData, TradeData
 from vnpy.trader.engine import BaseEngine, MainEngine
-from vnpy.trader.event import EVENT_TRADE, EVENT_ORDER, EVENT_LOG, EVENT_TIMER
+from vnpy.trader.event import EVENT_TRADE, EVENT_ORDER, EVENT_LOG
 from Pandora.constant import Direction, Status
 from Pandora.trader.utility import load_json, save_json
 
@@ -27,7 +27,7 @@ class RiskEngine(BaseEngine):
         self.order_flow_limit: int = 50
 
         self.order_flow_clear: int = 1
-        self.order_flow_timer: int = 0
+        self.order_flow_timer_id: int = 0
 
         self.order_size_limit: int = 100
 
@@ -64,12 +64,18 @@ class RiskEngine(BaseEngine):
         """"""
         self.active = setting["active"]
         self.order_flow_limit = setting["order_flow_limit"]
-        self.order_flow_clear = setting["order_flow_clear"]
         self.order_size_limit = setting["order_size_limit"]
         self.trade_limit = setting["trade_limit"]
         self.active_order_limit = setting["active_order_limit"]
         self.order_cancel_limit = setting["order_cancel_limit"]
 
+        # Restart timer only if clear interval changed after started
+        if setting["order_flow_clear"] != self.order_flow_clear:
+            self.order_flow_clear = setting["order_flow_clear"]
+
+            if self.order_flow_timer_id:
+                self.start_order_flow_timer()
+
         if self.active:
             self.write_log("交易风控功能启动")
         else:
@@ -104,9 +110,10 @@ class RiskEngine(BaseEngine):
     def register_event(self) -> None:
         """"""
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
 
+        self.start_order_flow_timer()
+
     def process_order_event(self, event: Event) -> None:
         """"""
         order: OrderData = event.data
@@ -123,13 +130,20 @@ class RiskEngine(BaseEngine):
         trade: TradeData = event.data
         self.trade_count += trade.volume
 
-    def process_timer_event(self, event: Event) -> None:
-        """"""
-        self.order_flow_timer += 1
+    def start_order_flow_timer(self) -> None:
+        """
+        (Re)start timer for clearing order flow count.
+        """
+        if self.order_flow_timer_id:
+            self.event_engine.remove_timer(self.order_flow_timer_id)
 
-        if self.order_flow_timer >= self.order_flow_clear:
-            self.order_flow_count = 0
-            self.order_flow_timer = 0
+        self.order_flow_timer_id = self.event_engine.add_timer(
+            self.clear_order_flow, self.order_flow_clear
+        )
+
+    def clear_order_flow(self) -> None:
+        """"""
+        self.order_flow_count = 0
 
     def write_log(self, msg: str) -> None:
         """"""
@@ -594,6 +594,24 @@ int MdApi::subscribeMarketData(string instrumentID)
 	return i;
 };
 
+int MdApi::subscribeMarketDataList(const list &instrumentIDs)
+{
+	vector<string> symbols;
+	for (const auto &item : instrumentIDs)
+	{
+		symbols.push_back(item.cast<string>());
+	}
+
+	vector<char*> myreq;
+	for (string &symbol : symbols)
+	{
+		myreq.push_back((char*)symbol.c_str());
+	}
+
+	int i = this->api->SubscribeMarketData(myreq.data(), (int)myreq.size());
+	return i;
+};
+
 int MdApi::unSubscribeMarketData(string instrumentID)
 {
 	char* buffer = (char*)instrumentID.c_str();
@@ -817,6 +835,7 @@ PYBIND11_MODULE(vnsoptmd, m)
 		.def("getTradingDay", &MdApi::getTradingDay)
 		.def("registerFront", &MdApi::registerFront)
 		.def("subscribeMarketData", &MdApi::subscribeMarketData)
+		.def("subscribeMarketDataList", &MdApi::subscribeMarketDataList)
 		.def("unSubscribeMarketData", &MdApi::unSubscribeMarketData)
 		.def("subscribeForQuoteRsp", &MdApi::subscribeForQuoteRsp)
 		.def("reqUserLogin", &MdApi::reqUserLogin)
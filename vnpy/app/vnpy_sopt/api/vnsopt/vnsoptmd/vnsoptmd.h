@@ -179,6 +179,8 @@ public:
 
 	int subscribeMarketData(string instrumentID);
 
+	int subscribeMarketDataList(const list &instrumentIDs);
+
 	int unSubscribeMarketData(string instrumentID);
 
 	int subscribeForQuoteRsp(string instrumentID);
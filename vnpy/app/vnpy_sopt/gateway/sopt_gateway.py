@@ -14,6 +14,8 @@ from Pandora.constant import (
     OptionType
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.cache import ContractCache
+from vnpy.trader.marketdata import TickTimeParser, DepthNormalizer
 from Pandora.trader.object import (
     TickData,
     OrderData,
@@ -123,6 +125,7 @@ OPTIONTYPE_SOPT2VT: Dict[str, OptionType] = {
 
 # 其他常量
 CHINA_TZ = ZoneInfo("Asia/Shanghai")       # 中国时区
+SUBSCRIBE_BATCH_SIZE = 500                 # 批量订阅每次提交的合约数量
 
 # 合约数据全局缓存字典
 symbol_contract_map: Dict[str, ContractData] = {}
@@ -178,6 +181,10 @@ class SoptGateway(BaseGateway):
         """订阅行情"""
         self.md_api.subscribe(req)
 
+    def subscribe_batch(self, reqs: List[SubscribeRequest]) -> None:
+        """批量订阅行情"""
+        self.md_api.subscribe_batch(reqs)
+
     def send_order(self, req: OrderRequest) -> str:
         """委托下单"""
         return self.td_api.send_order(req)
@@ -240,10 +247,16 @@ class SoptMdApi(MdApi):
         self.login_status: bool = False
         self.subscribed: set = set()
 
+        # 旧版本编译的API模块不支持按合约数组订阅
+        self.batch_supported: bool = hasattr(MdApi, "subscribeMarketDataList")
+
         self.userid: str = ""
         self.password: str = ""
         self.brokerid: str = ""
 
+        self.time_parser: TickTimeParser = TickTimeParser(CHINA_TZ)
+        self.normalizer: DepthNormalizer = DepthNormalizer(adjust=False)
+
     def onFrontConnected(self) -> None:
         """服务器连接成功回报"""
         self.gateway.write_log("行情服务器连接成功")
@@ -260,8 +273,7 @@ class SoptMdApi(MdApi):
             self.login_status = True
             self.gateway.write_log("行情服务器登录成功")
 
-            for symbol in self.subscribed:
-                self.subscribeMarketData(symbol)
+            self.subscribe_symbols(list(self.subscribed))
         else:
             self.gateway.write_error("行情服务器登录失败", error)
 
@@ -287,52 +299,20 @@ class SoptMdApi(MdApi):
         if not contract:
             return
 
-        timestamp: str = f"{data['TradingDay']} {data['UpdateTime']}.{int(data['UpdateMillisec']/100)}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)
+        # 毫秒只保留到百毫秒精度
+        microsecond: int = int(data["UpdateMillisec"] / 100) * 100_000
+        dt: datetime = self.time_parser.parse(data["TradingDay"], data["UpdateTime"], microsecond)
 
         tick: TickData = TickData(
             symbol=symbol,
             exchange=contract.exchange,
             datetime=dt,
             name=contract.name,
-            volume=data["Volume"],
             turnover=data["Turnover"],
-            open_interest=data["OpenInterest"],
-            last_price=data["LastPrice"],
-            limit_up=data["UpperLimitPrice"],
-            limit_down=data["LowerLimitPrice"],
-            open_price=data["OpenPrice"],
-            high_price=data["HighestPrice"],
-            low_price=data["LowestPrice"],
-            pre_close=data["PreClosePrice"],
-            bid_price_1=data["BidPrice1"],
-            ask_price_1=data["AskPrice1"],
-            bid_volume_1=data["BidVolume1"],
-            ask_volume_1=data["AskVolume1"],
-            gateway_name=self.gateway_name
+            gateway_name=self.gateway_name,
+            **self.normalizer.normalize(data)
         )
 
-        tick.bid_price_2 = data["BidPrice2"]
-        tick.bid_price_3 = data["BidPrice3"]
-        tick.bid_price_4 = data["BidPrice4"]
-        tick.bid_price_5 = data["BidPrice5"]
-
-        tick.ask_price_2 = data["AskPrice2"]
-        tick.ask_price_3 = data["AskPrice3"]
-        tick.ask_price_4 = data["AskPrice4"]
-        tick.ask_price_5 = data["AskPrice5"]
-
-        tick.bid_volume_2 = data["BidVolume2"]
-        tick.bid_volume_3 = data["BidVolume3"]
-        tick.bid_volume_4 = data["BidVolume4"]
-        tick.bid_volume_5 = data["BidVolume5"]
-
-        tick.ask_volume_2 = data["AskVolume2"]
-        tick.ask_volume_3 = data["AskVolume3"]
-        tick.ask_volume_4 = data["AskVolume4"]
-        tick.ask_volume_5 = data["AskVolume5"]
-
         self.gateway.on_tick(tick)
 
     def connect(self, address: str, userid: str, password: str, brokerid: int) -> None:
@@ -368,6 +348,27 @@ class SoptMdApi(MdApi):
             self.subscribeMarketData(req.symbol)
         self.subscribed.add(req.symbol)
 
+    def subscribe_batch(self, reqs: List[SubscribeRequest]) -> None:
+        """批量订阅行情，已订阅的合约不再重复提交"""
+        symbols: List[str] = []
+        for req in reqs:
+            if req.symbol not in self.subscribed:
+                self.subscribed.add(req.symbol)
+                symbols.append(req.symbol)
+
+        if self.login_status:
+            self.subscribe_symbols(symbols)
+
+    def subscribe_symbols(self, symbols: List[str]) -> None:
+        """按合约数组分批提交订阅请求"""
+        if not self.batch_supported:
+            for symbol in symbols:
+                self.subscribeMarketData(symbol)
+            return
+
+        for i in range(0, len(symbols), SUBSCRIBE_BATCH_SIZE):
+            self.subscribeMarketDataList(symbols[i:i + SUBSCRIBE_BATCH_SIZE])
+
     def close(self) -> None:
         """关闭连接"""
         if self.connect_status:
@@ -407,6 +408,8 @@ class SoptTdApi(TdApi):
         self.positions: Dict[str, PositionData] = {}
         self.sysid_orderid_map: Dict[str, str] = {}
 
+        self.contract_cache: ContractCache = ContractCache(self.gateway_name)
+
     def onFrontConnected(self) -> None:
         """服务器连接成功回报"""
         self.gateway.write_log("交易服务器连接成功")
@@ -438,6 +441,9 @@ class SoptTdApi(TdApi):
             self.login_status = True
             self.gateway.write_log("交易服务器登录成功")
 
+            # 先推送缓存的合约信息，再查询合约核对
+            self.load_contract_cache(data["TradingDay"])
+
             # Confirm settlement
             req: dict = {
                 "BrokerID": self.brokerid,
@@ -594,21 +600,48 @@ class SoptTdApi(TdApi):
                     contract.option_strike, data["InstrumentCode"]
                 )
 
-            self.gateway.on_contract(contract)
+            # 只推送缓存中没有或者有变化的合约
+            if self.contract_cache.update(contract):
+                self.gateway.on_contract(contract)
 
             symbol_contract_map[contract.symbol] = contract
 
         if last:
-            self.contract_inited = True
+            cached: bool = bool(self.contract_cache.cached)
+
+            added, changed, removed = self.contract_cache.save()
             self.gateway.write_log("合约信息查询成功")
 
-            for data in self.order_data:
-                self.onRtnOrder(data)
-            self.order_data.clear()
+            if cached:
+                self.gateway.write_log(f"合约信息缓存核对完成，新增{added}个，变化{changed}个，移除{removed}个")
+
+            self.init_contract()
+
+    def load_contract_cache(self, trading_day: str) -> None:
+        """加载交易日的合约信息缓存"""
+        contracts: List[ContractData] = self.contract_cache.load(trading_day)
+        if not contracts:
+            return
+
+        for contract in contracts:
+            symbol_contract_map[contract.symbol] = contract
+            self.gateway.on_contract(contract)
+
+        self.gateway.write_log(f"合约信息缓存加载成功，共{len(contracts)}个")
+
+        self.init_contract()
+
+    def init_contract(self) -> None:
+        """合约信息就绪后，处理缓存的委托和成交推送"""
+        self.contract_inited = True
+
+        for data in self.order_data:
+            self.onRtnOrder(data)
+        self.order_data.clear()
 
-            for data in self.trade_data:
-                self.onRtnTrade(data)
-            self.trade_data.clear()
+        for data in self.trade_data:
+            self.onRtnTrade(data)
+        self.trade_data.clear()
 
     def onRtnOrder(self, data: dict) -> None:
         """委托更新推送"""
@@ -7,6 +7,7 @@ from collections import defaultdict
 from copy import copy
 from pathlib import Path
 from datetime import datetime, timedelta
+from time import perf_counter
 
 from vnpy.event import EventEngine, Event
 from vnpy.trader.engine import BaseEngine, MainEngine
@@ -571,6 +572,8 @@ class SpreadAlgoEngine:
         fak: bool
     ) -> List[str]:
         """"""
+        start: float = perf_counter()
+
         # 创建原始委托请求
         contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
 
@@ -605,8 +608,9 @@ class SpreadAlgoEngine:
         vt_orderids: list = []
 
         for req in req_list:
-            vt_orderid: str = self.main_engine.send_order(
-                req, contract.gateway_name)
+            with self.main_engine.trace_strategy(start):
+                vt_orderid: str = self.main_engine.send_order(
+                    req, contract.gateway_name)
 
             # Check if sending order successful
             if not vt_orderid:
@@ -1010,6 +1014,8 @@ class SpreadStrategyEngine:
         offset: Offset,
         lock: bool
     ) -> List[str]:
+        start: float = perf_counter()
+
         contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
 
         original_req: OrderRequest = OrderRequest(
@@ -1034,8 +1040,9 @@ class SpreadStrategyEngine:
         vt_orderids: list = []
 
         for req in req_list:
-            vt_orderid: str = self.main_engine.send_order(
-                req, contract.gateway_name)
+            with self.main_engine.trace_strategy(start):
+                vt_orderid: str = self.main_engine.send_order(
+                    req, contract.gateway_name)
 
             # Check if sending order successful
             if not vt_orderid:
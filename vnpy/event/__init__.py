@@ -1 +1,12 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    PriorityEventEngine,
+    ConflatingEventEngine,
+    ShardedEventEngine,
+    EVENT_TIMER,
+    EVENT_MONITOR,
+    EVENT_SCHEDULE
+)
+from .monitor import EventMonitor, LatencyHistogram, format_summary
+from .journal import EventJournal, EventReplayer, read_journal
@@ -2,13 +2,19 @@
 Event-driven framework of VeighNa framework.
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import chain
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from threading import Condition, Lock, Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .monitor import EventMonitor
+from .timer import TimerEntry, TimerService
 
 EVENT_TIMER = "eTimer"
+EVENT_MONITOR = "eEventMonitor"
+EVENT_SCHEDULE = "eSchedule"
 
 
 class Event:
@@ -34,15 +40,22 @@ class EventEngine:
     to those handlers registered.
 
     It also generates timer event by every interval seconds,
-    which can be used for timing purpose.
+    which can be used for timing purpose. Callbacks which only need
+    to run every several seconds (or less than a second) should be
+    added with add_timer instead, so they are called only when due.
     """
 
-    def __init__(self, interval: int = 1) -> None:
+    def __init__(self, interval: int = 1, batch_size: int = 1) -> None:
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        When batch_size is larger than 1, every wakeup of the event
+        thread drains up to batch_size pending events from the queue
+        in one pass and processes them in order.
         """
         self._interval: int = interval
+        self._batch_size: int = max(batch_size, 1)
         self._queue: Queue = Queue()
         self._active: bool = False
         self._thread: Thread = Thread(target=self._run)
@@ -50,16 +63,69 @@ class EventEngine:
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
 
+        # Counters for benchmarking dispatch throughput
+        self._event_count: int = 0
+        self._batch_count: int = 0
+        self._max_batch: int = 0
+
+        # Opt-in latency and queue depth instrumentation
+        self._monitor: Optional[EventMonitor] = None
+
+        # Scheduled callbacks, run on event thread when due, timer
+        # thread wakes up at the earliest due time of them
+        self._timer_service: TimerService = TimerService()
+        self._timer_condition: Condition = Condition()
+        self.register(EVENT_SCHEDULE, self._process_schedule_event)
+
     def _run(self) -> None:
         """
-        Get event from queue and then process it.
+        Get events from queue and then process them.
         """
         while self._active:
-            try:
-                event: Event = self._queue.get(block=True, timeout=1)
+            events: List[Event] = self._get_events()
+            if not events:
+                continue
+
+            self._batch_count += 1
+            self._event_count += len(events)
+            if len(events) > self._max_batch:
+                self._max_batch = len(events)
+
+            for event in events:
                 self._process(event)
-            except Empty:
-                pass
+
+            if self._monitor:
+                self._check_monitor()
+
+    def _get_events(self) -> List[Event]:
+        """
+        Get events to be processed from event queue.
+        """
+        return self._drain_queue(self._queue)
+
+    def _drain_queue(self, queue: Queue) -> List[Event]:
+        """
+        Wait for the next event, then drain pending events behind it
+        up to batch size while holding the queue lock only once.
+        """
+        try:
+            event: Event = queue.get(block=True, timeout=1)
+        except Empty:
+            return []
+
+        if self._batch_size == 1:
+            return [event]
+
+        events: List[Event] = [event]
+
+        with queue.mutex:
+            count: int = min(len(queue.queue), self._batch_size - 1)
+            if count:
+                popleft: Callable = queue.queue.popleft
+                events.extend([popleft() for _ in range(count)])
+                queue.not_full.notify(count)
+
+        return events
 
     def _process(self, event: Event) -> None:
         """
@@ -75,14 +141,105 @@ class EventEngine:
         if self._general_handlers:
             [handler(event) for handler in self._general_handlers]
 
+    def _process_monitored(self, event: Event) -> None:
+        """
+        Same as _process, but also record event age and time used
+        by every handler.
+        """
+        monitor: EventMonitor = self._monitor
+        start: float = perf_counter()
+
+        put_time: float = getattr(event, "put_time", 0)
+        if put_time:
+            monitor.record_age(event.type, start - put_time)
+
+        # Lists are iterated directly as in _process, so that handlers
+        # registered during dispatch also receive this event
+        handlers: Iterable = chain(self._handlers.get(event.type, ()), self._general_handlers)
+
+        for handler in handlers:
+            handler(event)
+
+            end: float = perf_counter()
+            monitor.record_handler(event.type, handler, end - start)
+            start = end
+
+    def _check_monitor(self) -> None:
+        """
+        Record queue depth and publish summary if it is due.
+        """
+        monitor: EventMonitor = self._monitor
+        monitor.record_depth(self.get_queue_size())
+
+        if monitor.is_summary_due():
+            event: Event = Event(EVENT_MONITOR, monitor.get_summary())
+            self.put(event)
+
     def _run_timer(self) -> None:
         """
-        Sleep by interval second(s) and then generate a timer event.
+        Generate a timer event every interval second(s), and a schedule
+        event for every timer added when it is due.
         """
+        timer_due: float = monotonic() + self._interval
+
         while self._active:
-            sleep(self._interval)
-            event: Event = Event(EVENT_TIMER)
-            self.put(event)
+            with self._timer_condition:
+                now: float = monotonic()
+                due: float = min(timer_due, self._timer_service.get_next_due())
+
+                if due > now:
+                    self._timer_condition.wait(due - now)
+                    continue
+
+                entries: List[TimerEntry] = self._timer_service.pop_due(now)
+
+            if now >= timer_due:
+                timer_due += self._interval
+                if timer_due <= now:
+                    timer_due = now + self._interval
+
+                event: Event = Event(EVENT_TIMER)
+                self.put(event)
+
+            for entry in entries:
+                event: Event = Event(EVENT_SCHEDULE, entry)
+                self.put(event)
+
+    def _process_schedule_event(self, event: Event) -> None:
+        """
+        Run callback of a due timer.
+        """
+        entry: TimerEntry = event.data
+        entry.pending = False
+
+        if not entry.active:
+            return
+
+        if not entry.repeat:
+            self.remove_timer(entry.timer_id)
+
+        entry.callback()
+
+    def add_timer(self, callback: Callable[[], None], interval: float, repeat: bool = True) -> int:
+        """
+        Add a callback to be run on event thread after interval seconds,
+        and then every interval seconds if repeat. Interval can be shorter
+        than the timer event interval, and zero or negative interval is
+        raised to MIN_INTERVAL. Return timer id which can be used to
+        remove the timer.
+        """
+        with self._timer_condition:
+            timer_id: int = self._timer_service.add_timer(callback, interval, repeat, monotonic())
+            self._timer_condition.notify()
+
+        return timer_id
+
+    def remove_timer(self, timer_id: int) -> None:
+        """
+        Remove a timer added before.
+        """
+        with self._timer_condition:
+            self._timer_service.remove_timer(timer_id)
 
     def start(self) -> None:
         """
@@ -97,19 +254,76 @@ class EventEngine:
         Stop event engine.
         """
         self._active = False
+
+        with self._timer_condition:
+            self._timer_condition.notify()
+
         self._timer.join()
         self._thread.join()
 
     def put(self, event: Event) -> None:
+        """
+        Put an event object into event queue.
+        """
+        if self._monitor:
+            event.put_time = perf_counter()
+
+        self._put(event)
+
+    def _put(self, event: Event) -> None:
         """
         Put an event object into event queue.
         """
         self._queue.put(event)
 
+    def enable_monitor(self, interval: int = 60) -> None:
+        """
+        Start recording latency of every handler, age of every event
+        and queue depth. Summary is published as EVENT_MONITOR event
+        every interval seconds.
+        """
+        self._monitor = EventMonitor(interval)
+        self._process = self._process_monitored
+
+    def disable_monitor(self) -> None:
+        """
+        Stop recording latency and queue depth.
+        """
+        self._monitor = None
+        self.__dict__.pop("_process", None)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get dispatch counters of event engine.
+        """
+        return {
+            "event_count": self._event_count,
+            "batch_count": self._batch_count,
+            "max_batch": self._max_batch,
+            "queue_size": self.get_queue_size(),
+        }
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return self._queue.qsize()
+
+    def reset_statistics(self) -> None:
+        """
+        Reset dispatch counters of event engine.
+        """
+        self._event_count = 0
+        self._batch_count = 0
+        self._max_batch = 0
+
     def register(self, type: str, handler: HandlerType) -> None:
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
+
+        Handler registered while an event of the type is being dispatched
+        also receives that event.
         """
         handler_list: list = self._handlers[type]
         if handler not in handler_list:
@@ -118,11 +332,15 @@ class EventEngine:
     def unregister(self, type: str, handler: HandlerType) -> None:
         """
         Unregister an existing handler function from event engine.
+
+        Handler list is replaced instead of modified, so that handlers
+        after it are not skipped if unregistered during dispatch.
         """
         handler_list: list = self._handlers[type]
 
         if handler in handler_list:
-            handler_list.remove(handler)
+            handler_list = [h for h in handler_list if h != handler]
+            self._handlers[type] = handler_list
 
         if not handler_list:
             self._handlers.pop(type)
@@ -141,3 +359,323 @@ class EventEngine:
         """
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
+
+
+class PriorityEventEngine(EventEngine):
+    """
+    Event engine with priority lanes.
+
+    Every event is put into the lane of its priority, which is found
+    by matching the prefix of event type. Events in lane with smaller
+    priority number are always processed first, while events within
+    the same lane keep FIFO order.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        batch_size: int = 1,
+        priorities: Dict[str, int] = None,
+        default_priority: int = 1
+    ) -> None:
+        """
+        Priorities is a dict of event type prefix and priority number,
+        event types not matched go into the lane of default priority.
+        """
+        super().__init__(interval, batch_size)
+
+        self._priorities: Dict[str, int] = priorities or {}
+        self._default_priority: int = default_priority
+        self._type_lanes: Dict[str, deque] = {}
+
+        lane_count: int = max([default_priority, *self._priorities.values()]) + 1
+        self._lanes: List[deque] = [deque() for _ in range(lane_count)]
+        self._condition: Condition = Condition()
+
+    def _get_lane(self, type: str) -> deque:
+        """
+        Find the lane of an event type, result is cached for later use.
+        """
+        lane: deque = self._type_lanes.get(type, None)
+        if lane is not None:
+            return lane
+
+        priority: int = self._default_priority
+        prefix_length: int = 0
+
+        # Use the longest prefix matched
+        for prefix, n in self._priorities.items():
+            if type.startswith(prefix) and len(prefix) > prefix_length:
+                priority = n
+                prefix_length = len(prefix)
+
+        lane = self._lanes[priority]
+        self._type_lanes[type] = lane
+        return lane
+
+    def _get_events(self) -> List[Event]:
+        """
+        Wait for events, then drain up to batch size events from the
+        non-empty lane with highest priority.
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.get_queue_size, timeout=1):
+                return []
+
+            for lane in self._lanes:
+                if lane:
+                    count: int = min(len(lane), self._batch_size)
+                    return [lane.popleft() for _ in range(count)]
+
+        return []
+
+    def _put(self, event: Event) -> None:
+        """
+        Put an event object into the lane of its priority.
+        """
+        lane: deque = self._get_lane(event.type)
+
+        with self._condition:
+            lane.append(event)
+            self._condition.notify()
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in all lanes.
+        """
+        return sum([len(lane) for lane in self._lanes])
+
+
+class ConflatedSlot:
+    """
+    Placeholder in event queue for a conflatable event, which can be
+    replaced by newer event with the same key before being processed.
+    """
+
+    __slots__ = ("key", "event")
+
+    def __init__(self, key: Tuple[str, str], event: Event) -> None:
+        """"""
+        self.key: Tuple[str, str] = key
+        self.event: Event = event
+
+
+class ConflatingEventEngine(EventEngine):
+    """
+    Event engine which conflates pending market data events.
+
+    Events with type matching conflate prefixes and data with vt_symbol
+    are keyed by type and vt_symbol. Once the queue size reaches the
+    threshold, a new event replaces the pending one with the same key
+    instead of being appended, so only the latest value is processed.
+    Other events are never dropped.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        batch_size: int = 1,
+        conflate_prefixes: Sequence[str] = ("eTick.",),
+        threshold: int = 0
+    ) -> None:
+        """
+        Threshold is the queue size from which conflation starts, 0
+        means always conflate.
+        """
+        super().__init__(interval, batch_size)
+
+        self._conflate_prefixes: Tuple[str] = tuple(conflate_prefixes)
+        self._threshold: int = threshold
+
+        self._conflatable: Dict[str, bool] = {}
+        self._pending: Dict[Tuple[str, str], ConflatedSlot] = {}
+        self._lock: Lock = Lock()
+
+        self._conflated_count: int = 0
+
+    def _get_events(self) -> List[Event]:
+        """
+        Replace slots by the latest events they hold.
+        """
+        events: list = super()._get_events()
+
+        with self._lock:
+            for i, event in enumerate(events):
+                if type(event) is ConflatedSlot:
+                    if self._pending.get(event.key, None) is event:
+                        self._pending.pop(event.key)
+                    events[i] = event.event
+
+        return events
+
+    def _put(self, event: Event) -> None:
+        """
+        Put an event object into event queue, conflate it with pending
+        event of the same key if engine is saturated.
+        """
+        conflatable: bool = self._conflatable.get(event.type, None)
+        if conflatable is None:
+            conflatable = event.type.startswith(self._conflate_prefixes)
+            self._conflatable[event.type] = conflatable
+
+        if not conflatable:
+            self._queue.put(event)
+            return
+
+        vt_symbol: str = getattr(event.data, "vt_symbol", "")
+        if not vt_symbol:
+            self._queue.put(event)
+            return
+
+        key: Tuple[str, str] = (event.type, vt_symbol)
+
+        with self._lock:
+            slot: ConflatedSlot = self._pending.get(key, None)
+
+            if slot and self._queue.qsize() >= self._threshold:
+                slot.event = event
+                self._conflated_count += 1
+                return
+
+            slot = ConflatedSlot(key, event)
+            self._pending[key] = slot
+
+        self._queue.put(slot)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get dispatch and conflation counters of event engine.
+        """
+        statistics: Dict[str, int] = super().get_statistics()
+        statistics["conflated_count"] = self._conflated_count
+        statistics["pending_symbols"] = len(self._pending)
+        return statistics
+
+    def reset_statistics(self) -> None:
+        """
+        Reset dispatch and conflation counters of event engine.
+        """
+        super().reset_statistics()
+        self._conflated_count = 0
+
+
+class ShardedEventEngine(EventEngine):
+    """
+    Event engine which dispatches symbol scoped events on a pool of
+    worker threads.
+
+    Events with type matching shard prefixes are hashed by vt_symbol
+    onto workers, so events of the same symbol are always processed
+    in order by the same worker while unrelated symbols run in
+    parallel. All other events, including timer, are processed on the
+    global lane in the original event thread.
+
+    Handlers of sharded event types must be safe to run concurrently
+    for different symbols.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        batch_size: int = 1,
+        worker_count: int = 4,
+        shard_prefixes: Sequence[str] = ("eTick.",)
+    ) -> None:
+        """"""
+        super().__init__(interval, batch_size)
+
+        self._shard_prefixes: Tuple[str] = tuple(shard_prefixes)
+        self._shardable: Dict[str, bool] = {}
+
+        self._worker_count: int = max(worker_count, 1)
+        self._worker_queues: List[Queue] = []
+        self._workers: List[Thread] = []
+        self._worker_event_counts: List[int] = []
+
+        for i in range(self._worker_count):
+            self._worker_queues.append(Queue())
+            self._workers.append(Thread(target=self._run_worker, args=(i,)))
+            self._worker_event_counts.append(0)
+
+    def _run_worker(self, index: int) -> None:
+        """
+        Get events from queue of the worker and then process them.
+        """
+        queue: Queue = self._worker_queues[index]
+
+        while self._active:
+            events: List[Event] = self._drain_queue(queue)
+            if not events:
+                continue
+
+            self._worker_event_counts[index] += len(events)
+
+            for event in events:
+                self._process(event)
+
+    def _put(self, event: Event) -> None:
+        """
+        Put symbol scoped event into queue of its worker, other event
+        into queue of the global lane.
+        """
+        shardable: bool = self._shardable.get(event.type, None)
+        if shardable is None:
+            shardable = event.type.startswith(self._shard_prefixes)
+            self._shardable[event.type] = shardable
+
+        if shardable:
+            vt_symbol: str = getattr(event.data, "vt_symbol", "")
+            if vt_symbol:
+                index: int = hash(vt_symbol) % self._worker_count
+                self._worker_queues[index].put(event)
+                return
+
+        self._queue.put(event)
+
+    def start(self) -> None:
+        """
+        Start event engine and all workers.
+        """
+        super().start()
+
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self) -> None:
+        """
+        Stop event engine and all workers.
+        """
+        super().stop()
+
+        for worker in self._workers:
+            worker.join()
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in global lane and all workers.
+        """
+        size: int = self._queue.qsize()
+        for queue in self._worker_queues:
+            size += queue.qsize()
+        return size
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get dispatch counters of event engine, event count of workers
+        is included.
+        """
+        statistics: Dict[str, int] = super().get_statistics()
+        statistics["global_event_count"] = self._event_count
+        statistics["event_count"] = self._event_count + sum(self._worker_event_counts)
+
+        for i, count in enumerate(self._worker_event_counts):
+            statistics[f"worker{i}_event_count"] = count
+
+        return statistics
+
+    def reset_statistics(self) -> None:
+        """
+        Reset dispatch counters of event engine and all workers.
+        """
+        super().reset_statistics()
+        self._worker_event_counts = [0] * self._worker_count
@@ -0,0 +1,216 @@
+"""
+Binary journal of event stream and replay harness for benchmarking.
+
+Every record in journal file consists of a fixed size header (payload
+length, timestamp and type length), followed by utf-8 encoded event
+type and pickled event data.
+"""
+
+import pickle
+from pathlib import Path
+from struct import Struct
+from threading import Lock
+from time import perf_counter, sleep, time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from .engine import Event, EventEngine, EVENT_TIMER, EVENT_MONITOR, EVENT_SCHEDULE
+from .monitor import LatencyHistogram
+
+
+JOURNAL_MAGIC: bytes = b"VNEJ0001"
+HEADER: Struct = Struct("<IdH")
+
+
+class EventJournal:
+    """
+    Appends events processed by event engine into a journal file.
+
+    Events may be processed by several threads (ShardedEventEngine), so
+    every record is written in one call while holding the lock.
+    """
+
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        path: str,
+        exclude_types: Sequence[str] = (EVENT_TIMER, EVENT_MONITOR, EVENT_SCHEDULE)
+    ) -> None:
+        """"""
+        self.event_engine: EventEngine = event_engine
+        self.path: Path = Path(path)
+        self.exclude_types: Set[str] = set(exclude_types)
+
+        self.file: Optional[BinaryIO] = None
+        self.lock: Lock = Lock()
+
+        self.count: int = 0
+        self.skipped_count: int = 0         # Events whose data cannot be pickled
+
+    def start(self) -> None:
+        """
+        Open journal file and start recording.
+        """
+        if self.file:
+            return
+
+        new_file: bool = not self.path.exists() or not self.path.stat().st_size
+
+        self.file = open(self.path, "ab", buffering=1 << 20)
+        if new_file:
+            self.file.write(JOURNAL_MAGIC)
+
+        self.event_engine.register_general(self.process_event)
+
+    def stop(self) -> None:
+        """
+        Stop recording and close journal file.
+        """
+        if not self.file:
+            return
+
+        self.event_engine.unregister_general(self.process_event)
+
+        with self.lock:
+            self.file.close()
+            self.file = None
+
+    def process_event(self, event: Event) -> None:
+        """
+        Append an event into journal file.
+        """
+        if event.type in self.exclude_types or not self.file:
+            return
+
+        # Failure of journal should not stop other handlers
+        try:
+            payload: bytes = pickle.dumps(event.data, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            with self.lock:
+                self.skipped_count += 1
+            return
+
+        type_data: bytes = event.type.encode("utf-8")
+        record: bytes = b"".join([
+            HEADER.pack(len(payload), time(), len(type_data)),
+            type_data,
+            payload
+        ])
+
+        with self.lock:
+            if not self.file:
+                return
+
+            self.file.write(record)
+            self.count += 1
+
+
+def read_journal(path: str) -> Iterator[Tuple[float, Event]]:
+    """
+    Read timestamp and event of every record in a journal file.
+    """
+    with open(path, "rb") as f:
+        magic: bytes = f.read(len(JOURNAL_MAGIC))
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not a valid event journal file")
+
+        while True:
+            header: bytes = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                break
+
+            payload_length, timestamp, type_length = HEADER.unpack(header)
+            type_data: bytes = f.read(type_length)
+            payload: bytes = f.read(payload_length)
+
+            # Stop at the last record if it is not completely written
+            if len(payload) < payload_length:
+                break
+
+            data: Any = pickle.loads(payload)
+            yield timestamp, Event(type_data.decode("utf-8"), data)
+
+
+class EventReplayer:
+    """
+    Feeds events in journal file back into event engine, and measures
+    throughput and latency from put until all handlers are finished.
+    """
+
+    def __init__(self, event_engine: EventEngine, path: str, speed: float = 0) -> None:
+        """
+        Speed is the multiplier of recorded pace, 0 means replaying as
+        fast as possible.
+        """
+        self.event_engine: EventEngine = event_engine
+        self.path: str = path
+        self.speed: float = speed
+
+        self.put_count: int = 0
+        self.processed_count: int = 0
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.lock: Lock = Lock()
+
+    def process_event(self, event: Event) -> None:
+        """
+        Record latency of replayed event after all handlers finished.
+        """
+        replay_time: float = getattr(event, "replay_time", 0)
+        if not replay_time:
+            return
+
+        latency: float = perf_counter() - replay_time
+
+        with self.lock:
+            histogram: LatencyHistogram = self.histograms.get(event.type, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self.histograms[event.type] = histogram
+            histogram.add(latency)
+
+            self.processed_count += 1
+
+    def run(self, timeout: float = 60) -> Dict[str, Any]:
+        """
+        Replay all events in journal file, wait until they are processed
+        and return report of throughput and latency.
+        """
+        self.put_count = 0
+        self.processed_count = 0
+        self.histograms.clear()
+
+        self.event_engine.register_general(self.process_event)
+
+        start: float = perf_counter()
+        first_timestamp: float = 0
+
+        for timestamp, event in read_journal(self.path):
+            if self.speed:
+                if not first_timestamp:
+                    first_timestamp = timestamp
+
+                delay: float = start + (timestamp - first_timestamp) / self.speed - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+
+            event.replay_time = perf_counter()
+            self.event_engine.put(event)
+            self.put_count += 1
+
+        end: float = perf_counter() + timeout
+        while self.processed_count < self.put_count and perf_counter() < end:
+            sleep(0.001)
+
+        cost: float = perf_counter() - start
+
+        self.event_engine.unregister_general(self.process_event)
+
+        return {
+            "put_count": self.put_count,
+            "processed_count": self.processed_count,
+            "cost": cost,
+            "throughput": self.processed_count / cost if cost else 0,
+            "latencies": {
+                type: histogram.get_summary()
+                for type, histogram in self.histograms.items()
+            },
+        }
@@ -0,0 +1,244 @@
+"""
+Latency and queue depth instrumentation of event engine.
+"""
+
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Latency is bucketed by power of 2 microseconds, the last bucket
+# collects everything longer than about 1 second.
+BUCKET_COUNT: int = 21
+
+
+class LatencyHistogram:
+    """
+    Histogram of latency with log2 microsecond buckets.
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """"""
+        self.buckets: List[int] = [0] * BUCKET_COUNT
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def add(self, latency: float) -> None:
+        """
+        Add a latency sample in seconds.
+        """
+        index: int = int(latency * 1_000_000).bit_length()
+        if index >= BUCKET_COUNT:
+            index = BUCKET_COUNT - 1
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get upper bound of the bucket which contains the percentile,
+        in microseconds.
+        """
+        if not self.count:
+            return 0
+
+        target: float = self.count * percent / 100
+        accumulated: int = 0
+
+        for index, n in enumerate(self.buckets):
+            accumulated += n
+            if accumulated >= target:
+                return float(1 << index)
+
+        return float(1 << (BUCKET_COUNT - 1))
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        Get summary of the histogram, latency in microseconds.
+        """
+        if not self.count:
+            average: float = 0
+        else:
+            average = self.total / self.count * 1_000_000
+
+        return {
+            "count": self.count,
+            "average": average,
+            "max": self.max * 1_000_000,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+        }
+
+
+class EventMonitor:
+    """
+    Collects handler latency, event age and queue depth of event engine,
+    and generates summary every interval seconds.
+
+    Records may come from several worker threads (ShardedEventEngine),
+    so statistics are only accessed while holding the lock.
+    """
+
+    def __init__(self, interval: int = 60) -> None:
+        """"""
+        self.interval: int = interval
+        self.summary_at: float = perf_counter() + interval
+
+        self.handler_histograms: Dict[Tuple[str, Callable], LatencyHistogram] = {}
+        self.age_histograms: Dict[str, LatencyHistogram] = {}
+
+        self.depth_max: int = 0
+        self.depth_total: int = 0
+        self.depth_count: int = 0
+
+        self.lock: Lock = Lock()
+
+    def record_handler(self, type: str, handler: Callable, latency: float) -> None:
+        """
+        Record time used by a handler to process an event.
+        """
+        key: Tuple[str, Callable] = (type, handler)
+
+        with self.lock:
+            histogram: LatencyHistogram = self.handler_histograms.get(key, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self.handler_histograms[key] = histogram
+
+            histogram.add(latency)
+
+    def record_age(self, type: str, age: float) -> None:
+        """
+        Record time from an event put into queue until dispatched.
+        """
+        with self.lock:
+            histogram: LatencyHistogram = self.age_histograms.get(type, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self.age_histograms[type] = histogram
+
+            histogram.add(age)
+
+    def record_depth(self, depth: int) -> None:
+        """
+        Record queue depth sampled after processing a batch.
+        """
+        with self.lock:
+            self.depth_total += depth
+            self.depth_count += 1
+            if depth > self.depth_max:
+                self.depth_max = depth
+
+    def is_summary_due(self) -> bool:
+        """
+        Check whether it is time to generate summary.
+        """
+        return perf_counter() >= self.summary_at
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Generate summary of statistics since last summary, then reset
+        all statistics.
+        """
+        with self.lock:
+            handler_histograms: dict = self.handler_histograms
+            age_histograms: dict = self.age_histograms
+            depth_max: int = self.depth_max
+            depth_total: int = self.depth_total
+            depth_count: int = self.depth_count
+
+            self.clear()
+
+        handlers: List[dict] = []
+        for (type, handler), histogram in handler_histograms.items():
+            d: dict = histogram.get_summary()
+            d["type"] = type
+            d["handler"] = get_handler_name(handler)
+            handlers.append(d)
+
+        handlers.sort(key=lambda d: d["count"] * d["average"], reverse=True)
+
+        ages: List[dict] = []
+        for type, histogram in age_histograms.items():
+            d: dict = histogram.get_summary()
+            d["type"] = type
+            ages.append(d)
+
+        ages.sort(key=lambda d: d["max"], reverse=True)
+
+        if depth_count:
+            depth_average: float = depth_total / depth_count
+        else:
+            depth_average = 0
+
+        summary: Dict[str, Any] = {
+            "interval": self.interval,
+            "handlers": handlers,
+            "ages": ages,
+            "depth_max": depth_max,
+            "depth_average": depth_average,
+        }
+
+        return summary
+
+    def reset(self) -> None:
+        """
+        Reset all statistics.
+        """
+        with self.lock:
+            self.clear()
+
+    def clear(self) -> None:
+        """
+        Start new statistics, called while holding the lock. Histograms
+        are replaced instead of cleared, so the old ones can be
+        summarized outside the lock.
+        """
+        self.summary_at = perf_counter() + self.interval
+
+        self.handler_histograms = {}
+        self.age_histograms = {}
+
+        self.depth_max = 0
+        self.depth_total = 0
+        self.depth_count = 0
+
+
+def get_handler_name(handler: Callable) -> str:
+    """
+    Get readable name of a handler function.
+    """
+    name: str = getattr(handler, "__qualname__", "")
+    if not name:
+        name = repr(handler)
+    return name
+
+
+def format_summary(summary: Dict[str, Any], count: int = 10) -> str:
+    """
+    Format summary into log text with the slowest handlers and events.
+    """
+    lines: List[str] = [
+        f"事件引擎统计（{summary['interval']}秒）："
+        f"队列深度最大{summary['depth_max']}，平均{summary['depth_average']:.1f}"
+    ]
+
+    for d in summary["handlers"][:count]:
+        lines.append(
+            f"处理函数 {d['handler']} [{d['type']}] 次数{d['count']} "
+            f"平均{d['average']:.1f}us P99<{d['p99']:.0f}us 最大{d['max']:.0f}us"
+        )
+
+    for d in summary["ages"][:count]:
+        lines.append(
+            f"事件等待 [{d['type']}] 次数{d['count']} "
+            f"平均{d['average']:.1f}us P99<{d['p99']:.0f}us 最大{d['max']:.0f}us"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,128 @@
+"""
+Scheduled callback timers used by event engine.
+"""
+
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Tuple
+
+
+# Zero or negative interval is raised to this, otherwise a repeating
+# timer would always be due
+MIN_INTERVAL = 0.01
+
+class TimerEntry:
+    """
+    Callback scheduled to run after or every interval seconds.
+    """
+
+    __slots__ = ("timer_id", "callback", "interval", "repeat", "due", "active", "pending")
+
+    def __init__(
+        self,
+        timer_id: int,
+        callback: Callable[[], None],
+        interval: float,
+        repeat: bool,
+        due: float
+    ) -> None:
+        """"""
+        self.timer_id: int = timer_id
+        self.callback: Callable[[], None] = callback
+        self.interval: float = interval
+        self.repeat: bool = repeat
+        self.due: float = due
+
+        self.active: bool = True        # False after removed
+        self.pending: bool = False      # True if waiting in event queue
+
+
+class TimerService:
+    """
+    Keeps a heap of timers ordered by due time.
+
+    This class is not thread-safe, event engine calls it while holding
+    its timer condition.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self._heap: List[Tuple[float, int, TimerEntry]] = []
+        self._timers: Dict[int, TimerEntry] = {}
+        self._timer_count: int = 0
+
+    def add_timer(
+        self,
+        callback: Callable[[], None],
+        interval: float,
+        repeat: bool,
+        now: float
+    ) -> int:
+        """
+        Add a new timer and return its id. Interval is at least
+        MIN_INTERVAL seconds.
+        """
+        interval = max(interval, MIN_INTERVAL)
+
+        self._timer_count += 1
+        timer_id: int = self._timer_count
+
+        entry: TimerEntry = TimerEntry(timer_id, callback, interval, repeat, now + interval)
+        self._timers[timer_id] = entry
+        heappush(self._heap, (entry.due, timer_id, entry))
+
+        return timer_id
+
+    def remove_timer(self, timer_id: int) -> None:
+        """
+        Remove a timer, its entry left in heap is dropped when popped.
+        """
+        entry: TimerEntry = self._timers.pop(timer_id, None)
+        if entry:
+            entry.active = False
+
+    def get_next_due(self) -> float:
+        """
+        Get due time of the earliest active timer.
+        """
+        heap: list = self._heap
+
+        while heap and not heap[0][2].active:
+            heappop(heap)
+
+        if heap:
+            return heap[0][0]
+        else:
+            return float("inf")
+
+    def pop_due(self, now: float) -> List[TimerEntry]:
+        """
+        Pop all timers due at now, repeating timers are pushed back with
+        next due time. Timers whose last run is still pending are skipped
+        for this round, so slow callbacks do not pile up in event queue.
+        """
+        heap: list = self._heap
+        entries: List[TimerEntry] = []
+
+        while heap and heap[0][0] <= now:
+            _, timer_id, entry = heappop(heap)
+
+            if not entry.active:
+                continue
+
+            if not entry.pending:
+                entry.pending = True
+                entries.append(entry)
+
+            if entry.repeat:
+                entry.due += entry.interval
+                if entry.due <= now:
+                    entry.due = now + entry.interval
+                heappush(heap, (entry.due, timer_id, entry))
+
+        return entries
+
+    def get_timer_count(self) -> int:
+        """
+        Get number of active timers.
+        """
+        return len(self._timers)
@@ -1,11 +1,45 @@
 import threading
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime
 from functools import lru_cache
-from typing import Any
+from itertools import count
+from time import time
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
 import zmq
 
-from .common import HEARTBEAT_TOPIC, HEARTBEAT_TOLERANCE
+from .common import (
+    HEARTBEAT_TOPIC,
+    HEARTBEAT_TOLERANCE,
+    NEGOTIATE_FUNCTION,
+    OPEN_HISTORY_FUNCTION,
+    READ_HISTORY_FUNCTION,
+    HISTORY_CHUNK_SIZE,
+    KEY_SEPARATOR,
+    get_event_key
+)
+from .history import HistoryData
+from .serializer import Serializer, DEFAULT_SERIALIZER, get_serializer
+
+
+# Serializers offered to server in order of preference
+SERIALIZER_OPTIONS: List[str] = ["schema", "pickle5", "pickle"]
+
+# Max number of messages received before processing them
+RECEIVE_BATCH = 10_000
+
+# Default timeout of remote call in milliseconds
+CALL_TIMEOUT = 30000
+
+# Interval of checking timeout of remote calls in seconds
+TIMEOUT_CHECK_INTERVAL = 0.1
+
+# Interval of checking result of serializer negotiation in milliseconds
+NEGOTIATE_CHECK_INTERVAL = 100
+
+# Max number of history chunks requested before received
+HISTORY_WINDOW = 4
 
 
 class RemoteException(Exception):
@@ -26,28 +60,81 @@ class RemoteException(Exception):
         return self._value
 
 
+class RpcCall:
+    """
+    Remote call sent and waiting for reply.
+    """
+
+    __slots__ = ("future", "serializer", "name", "timeout", "deadline")
+
+    def __init__(self, future: Future, serializer: Serializer, name: str, timeout: int) -> None:
+        """"""
+        self.future: Future = future
+        self.serializer: Serializer = serializer
+        self.name: str = name
+        self.timeout: int = timeout
+        self.deadline: float = time() + timeout / 1000
+
+
 class RpcClient:
-    """"""
+    """
+    Requests are sent by a DEALER socket with a correlation id, so that
+    calls from any number of threads are pipelined without waiting for
+    replies of each other. Replies are matched to calls by the request
+    thread, which also fails calls without reply after their timeout.
+
+    Remote functions are called as attributes of client and block until
+    reply, or with call_async which returns a Future immediately.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, serializers: Optional[List[str]] = None) -> None:
         """Constructor"""
+        # Serializer used after negotiated with server
+        if serializers is None:
+            serializers = SERIALIZER_OPTIONS
+        self._serializer_options: List[str] = serializers
+        self._serializer: Serializer = get_serializer(DEFAULT_SERIALIZER)
+
+        # Negotiation sent and waiting for reply, applied by client thread
+        self._negotiation: Optional[Future] = None
+
+        # Keys subscribed, prefixed by serializer name on the wire
+        self._keys: List[str] = []
+
+        # Keys of which only the latest message received is processed
+        self._conflated_keys: List[str] = []
+        self._conflated_prefixes: Tuple[bytes, ...] = ()
+
         # zmq port related
         self._context: zmq.Context = zmq.Context()
 
-        # Request socket (Request–reply pattern)
-        self._socket_req: zmq.Socket = self._context.socket(zmq.REQ)
+        # Dealer socket (Request–reply pattern), only used by request thread
+        self._socket_dealer: zmq.Socket = self._context.socket(zmq.DEALER)
+
+        # Pull socket receiving requests from caller threads, each of which
+        # sends with its own push socket, forwarded by dealer socket
+        self._socket_request: zmq.Socket = self._context.socket(zmq.PULL)
+        self._request_address: str = f"inproc://rpc_request_{id(self)}"
+        self._local: threading.local = threading.local()
+        self._push_sockets: List[zmq.Socket] = []
 
         # Subscribe socket (Publish–subscribe pattern)
         self._socket_sub: zmq.Socket = self._context.socket(zmq.SUB)
 
         # Set socket option to keepalive
-        for socket in [self._socket_req, self._socket_sub]:
+        for socket in [self._socket_dealer, self._socket_sub]:
             socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
             socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 60)
 
+        # Calls waiting for reply, key is correlation id
+        self._calls: Dict[bytes, RpcCall] = {}
+        self._call_ids: count = count(1)
+        self._timeout_check_at: float = 0
+
         # Worker thread relate, used to process data pushed from server
         self._active: bool = False                 # RpcClient status
         self._thread: threading.Thread = None      # RpcClient thread
+        self._request_thread: threading.Thread = None
         self._lock: threading.Lock = threading.Lock()
 
         self._last_received_ping: datetime = datetime.utcnow()
@@ -64,30 +151,116 @@ class RpcClient:
             if "timeout" in kwargs:
                 timeout = kwargs.pop("timeout")
             else:
-                timeout = 30000
+                timeout = CALL_TIMEOUT
 
             # Generate request
             req: list = [name, args, kwargs]
 
-            # Send request and wait for response
-            with self._lock:
-                self._socket_req.send_pyobj(req)
+            return self._request(req, timeout, self._serializer)
 
-                # Timeout reached without any data
-                n: int = self._socket_req.poll(timeout)
-                if not n:
-                    msg: str = f"Timeout of {timeout}ms reached for {req}"
-                    raise RemoteException(msg)
+        return dorpc
 
-                rep = self._socket_req.recv_pyobj()
+    def call_async(self, name: str, *args, timeout: int = CALL_TIMEOUT, **kwargs) -> Future:
+        """
+        Call remote function without waiting for reply. The Future returned
+        is resolved by request thread with result, or RemoteException if
+        remote function failed or timeout (in milliseconds) reached.
 
-            # Return response if successed; Trigger exception if failed
-            if rep[0]:
-                return rep[1]
-            else:
-                raise RemoteException(rep[1])
+        Use asyncio.wrap_future to await it in an event loop.
+        """
+        req: list = [name, args, kwargs]
+        return self._send(req, timeout, self._serializer)
 
-        return dorpc
+    def load_history(
+        self,
+        name: str,
+        *args,
+        chunk_size: int = HISTORY_CHUNK_SIZE,
+        timeout: int = CALL_TIMEOUT,
+        **kwargs
+    ) -> HistoryData:
+        """
+        Call remote function returning list of bar or tick data, and get
+        the result in columns. Use to_objects of the result to rebuild
+        data objects.
+        """
+        chunks: List[HistoryData] = list(self.iter_history(name, *args, chunk_size=chunk_size, timeout=timeout, **kwargs))
+        return HistoryData.concat(chunks)
+
+    def iter_history(
+        self,
+        name: str,
+        *args,
+        chunk_size: int = HISTORY_CHUNK_SIZE,
+        timeout: int = CALL_TIMEOUT,
+        **kwargs
+    ) -> Iterator[HistoryData]:
+        """
+        Same as load_history, but yield chunks of columns in order while
+        the following chunks are being transferred.
+        """
+        req: list = [OPEN_HISTORY_FUNCTION, (name, args, kwargs, chunk_size), {}]
+        history_id, chunk_count = self._request(req, timeout, self._serializer)
+
+        futures: Deque[Future] = deque()
+
+        for index in range(chunk_count):
+            req = [READ_HISTORY_FUNCTION, (history_id, index), {}]
+            futures.append(self._send(req, timeout, self._serializer))
+
+            if len(futures) >= HISTORY_WINDOW:
+                yield futures.popleft().result()
+
+        while futures:
+            yield futures.popleft().result()
+
+    def _request(self, req: list, timeout: int, serializer: Serializer) -> Any:
+        """
+        Send request with serializer and wait for response.
+        """
+        return self._send(req, timeout, serializer).result()
+
+    def _send(self, req: list, timeout: int, serializer: Serializer) -> Future:
+        """
+        Send request with serializer, and return Future of response.
+        """
+        # Call cannot be cancelled once sent
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        if not self._active:
+            future.set_exception(RemoteException(f"RpcClient is not started for {req[0]}"))
+            return future
+
+        call_id: bytes = str(next(self._call_ids)).encode()
+        call: RpcCall = RpcCall(future, serializer, req[0], timeout)
+
+        with self._lock:
+            self._calls[call_id] = call
+
+        # Correlation id is before empty delimiter, so server returns it
+        # in envelope of reply
+        header: bytes = serializer.name.encode()
+        frames: list = [call_id, b"", header, *serializer.dumps(req)]
+        self.get_push_socket().send_multipart(frames, copy=False)
+
+        return future
+
+    def get_push_socket(self) -> zmq.Socket:
+        """
+        Get push socket of current thread for sending request.
+        """
+        socket: Optional[zmq.Socket] = getattr(self._local, "socket", None)
+        if not socket:
+            socket = self._context.socket(zmq.PUSH)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(self._request_address)
+
+            self._local.socket = socket
+            with self._lock:
+                self._push_sockets.append(socket)
+
+        return socket
 
     def start(
         self,
@@ -101,12 +274,20 @@ class RpcClient:
             return
 
         # Connect zmq port
-        self._socket_req.connect(req_address)
+        self._socket_request.bind(self._request_address)
+        self._socket_dealer.connect(req_address)
         self._socket_sub.connect(sub_address)
 
         # Start RpcClient status
         self._active = True
 
+        # Start request thread before negotiation, which is a remote call
+        # replied in background
+        self._request_thread = threading.Thread(target=self.run_request)
+        self._request_thread.start()
+
+        self.negotiate_serializer()
+
         # Start RpcClient thread
         self._thread = threading.Thread(target=self.run)
         self._thread.start()
@@ -129,6 +310,10 @@ class RpcClient:
             self._thread.join()
         self._thread = None
 
+        if self._request_thread and self._request_thread.is_alive():
+            self._request_thread.join()
+        self._request_thread = None
+
     def run(self) -> None:
         """
         Run RpcClient function
@@ -136,23 +321,149 @@ class RpcClient:
         pull_tolerance: int = HEARTBEAT_TOLERANCE * 1000
 
         while self._active:
-            if not self._socket_sub.poll(pull_tolerance):
+            # Check negotiation often until replied
+            if self._negotiation:
+                self.check_negotiation()
+
+            if self._negotiation:
+                if not self._socket_sub.poll(NEGOTIATE_CHECK_INTERVAL):
+                    continue
+            elif not self._socket_sub.poll(pull_tolerance):
                 self.on_disconnected()
+
+                # Server may be restarted without serializer negotiated
+                if self._active:
+                    self.negotiate_serializer()
                 continue
 
-            # Receive data from subscribe socket
-            topic, data = self._socket_sub.recv_pyobj(flags=zmq.NOBLOCK)
+            # Process messages received, and conflated ones are replaced
+            # by the latest of the same key
+            for frames in self.receive().values():
+                key: str = frames[0].bytes.decode().split(":", 1)[1]
+                topic: str = key.split(KEY_SEPARATOR, 1)[0]
+                data: Any = self._serializer.loads(frames[1:])
 
-            if topic == HEARTBEAT_TOPIC:
-                self._last_received_ping = data
-            else:
-                # Process data by callable function
-                self.callback(topic, data)
+                if topic == HEARTBEAT_TOPIC:
+                    self._last_received_ping = data
+                else:
+                    # Process data by callable function
+                    self.callback(topic, data)
 
         # Close socket
-        self._socket_req.close()
         self._socket_sub.close()
 
+    def run_request(self) -> None:
+        """
+        Run request thread, forwarding requests and resolving replies.
+        """
+        poller: zmq.Poller = zmq.Poller()
+        poller.register(self._socket_request, zmq.POLLIN)
+        poller.register(self._socket_dealer, zmq.POLLIN)
+
+        poll_timeout: int = int(TIMEOUT_CHECK_INTERVAL * 1000)
+
+        while self._active:
+            events: dict = dict(poller.poll(poll_timeout))
+
+            # Forward requests of caller threads with dealer socket
+            if self._socket_request in events:
+                for frames in receive_available(self._socket_request):
+                    self._socket_dealer.send_multipart(frames, copy=False)
+
+            # Resolve calls with replies received
+            if self._socket_dealer in events:
+                for frames in receive_available(self._socket_dealer):
+                    self.on_reply(frames)
+
+            self.check_timeout()
+
+        # Fail calls which can never be replied
+        with self._lock:
+            calls: List[RpcCall] = list(self._calls.values())
+            self._calls.clear()
+
+        for call in calls:
+            call.future.set_exception(RemoteException(f"RpcClient stopped before reply of {call.name}"))
+
+        # Close socket
+        with self._lock:
+            for socket in self._push_sockets:
+                socket.close()
+            self._push_sockets.clear()
+
+        # Requests not sent yet (such as negotiation while server is down)
+        # are dropped, since their calls are already failed
+        self._socket_request.close()
+        self._socket_dealer.close(linger=0)
+
+    def on_reply(self, frames: List[zmq.Frame]) -> None:
+        """
+        Resolve call with reply frames: correlation id, empty delimiter,
+        serializer name and data.
+        """
+        call_id: bytes = frames[0].bytes
+
+        # Reply of call already timeout is dropped
+        with self._lock:
+            call: Optional[RpcCall] = self._calls.pop(call_id, None)
+        if not call:
+            return
+
+        try:
+            rep = call.serializer.loads(frames[3:])
+        except Exception as e:
+            call.future.set_exception(e)
+            return
+
+        # Return response if successed; Trigger exception if failed
+        if rep[0]:
+            call.future.set_result(rep[1])
+        else:
+            call.future.set_exception(RemoteException(rep[1]))
+
+    def check_timeout(self) -> None:
+        """
+        Fail calls without reply after timeout.
+        """
+        now: float = time()
+        if now < self._timeout_check_at:
+            return
+        self._timeout_check_at = now + TIMEOUT_CHECK_INTERVAL
+
+        with self._lock:
+            expired: List[bytes] = [
+                call_id for call_id, call in self._calls.items() if call.deadline <= now
+            ]
+            calls: List[RpcCall] = [self._calls.pop(call_id) for call_id in expired]
+
+        for call in calls:
+            msg: str = f"Timeout of {call.timeout}ms reached for {call.name}"
+            call.future.set_exception(RemoteException(msg))
+
+    def receive(self) -> Dict[Any, List[zmq.Frame]]:
+        """
+        Receive messages available from subscribe socket.
+        """
+        messages: Dict[Any, List[zmq.Frame]] = {}
+
+        for i in range(RECEIVE_BATCH):
+            try:
+                frames: List[zmq.Frame] = self._socket_sub.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                break
+
+            # Conflated message is moved to the position of the latest
+            # one, so that it is never processed before messages received
+            # earlier than it
+            header: bytes = frames[0].bytes
+            if header.startswith(self._conflated_prefixes):
+                messages.pop(header, None)
+                messages[header] = frames
+            else:
+                messages[i] = frames
+
+        return messages
+
     def callback(self, topic: str, data: Any) -> None:
         """
         Callable function
@@ -163,7 +474,94 @@ class RpcClient:
         """
         Subscribe data
         """
-        self._socket_sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        self.subscribe_key(topic)
+
+    def subscribe_event(
+        self,
+        event_type: str,
+        vt_symbol: str = "",
+        topic: str = "",
+        conflate: bool = False
+    ) -> None:
+        """
+        Subscribe events of a type, and only of a vt_symbol if given.
+        Data not subscribed by any client is filtered by server.
+
+        With conflate, only the latest event of each vt_symbol received
+        is processed, so that a slow client does not fall behind.
+        """
+        key: str = get_event_key(topic, event_type, vt_symbol)
+        self.subscribe_key(key)
+
+        if conflate:
+            self._conflated_keys.append(key)
+            self.update_conflated_prefixes()
+
+    def unsubscribe_event(self, event_type: str, vt_symbol: str = "", topic: str = "") -> None:
+        """
+        Unsubscribe events subscribed by subscribe_event.
+        """
+        key: str = get_event_key(topic, event_type, vt_symbol)
+        if key not in self._keys:
+            return
+
+        self._keys.remove(key)
+        self._socket_sub.setsockopt_string(zmq.UNSUBSCRIBE, f"{self._serializer.name}:{key}")
+
+        if key in self._conflated_keys:
+            self._conflated_keys.remove(key)
+            self.update_conflated_prefixes()
+
+    def subscribe_key(self, key: str) -> None:
+        """"""
+        self._keys.append(key)
+        self._socket_sub.setsockopt_string(zmq.SUBSCRIBE, f"{self._serializer.name}:{key}")
+
+    def update_conflated_prefixes(self) -> None:
+        """"""
+        name: str = self._serializer.name
+        self._conflated_prefixes = tuple(f"{name}:{key}".encode() for key in self._conflated_keys)
+
+    def negotiate_serializer(self) -> None:
+        """
+        Send negotiation of serializer to server without waiting for reply,
+        which is checked by client thread.
+        """
+        options: List[Tuple[str, str]] = []
+        for name in self._serializer_options:
+            serializer: Serializer = get_serializer(name)
+            options.append((serializer.name, serializer.version))
+
+        # Negotiation itself is always sent with default serializer
+        req: list = [NEGOTIATE_FUNCTION, (options,), {}]
+        self._negotiation = self._send(req, HEARTBEAT_TOLERANCE * 1000, get_serializer(DEFAULT_SERIALIZER))
+
+    def check_negotiation(self) -> None:
+        """
+        Subscribe topics with name of serializer negotiated, if replied.
+        Socket options are only set by client thread.
+        """
+        if not self._negotiation.done():
+            return
+
+        future: Future = self._negotiation
+        self._negotiation = None
+
+        try:
+            name: str = future.result()
+        except RemoteException as e:
+            print(f"Serializer negotiation failed: {e}")
+            return
+
+        # Subscribe topics again with name of new serializer
+        old_name: str = self._serializer.name
+        self._serializer = get_serializer(name)
+
+        for key in [HEARTBEAT_TOPIC] + self._keys:
+            self._socket_sub.setsockopt_string(zmq.UNSUBSCRIBE, f"{old_name}:{key}")
+            self._socket_sub.setsockopt_string(zmq.SUBSCRIBE, f"{name}:{key}")
+
+        self.update_conflated_prefixes()
 
     def on_disconnected(self):
         """
@@ -171,3 +569,18 @@ class RpcClient:
         """
         msg: str = f"RpcServer has no response over {HEARTBEAT_TOLERANCE} seconds, please check you connection."
         print(msg)
+
+
+def receive_available(socket: zmq.Socket) -> List[List[zmq.Frame]]:
+    """
+    Receive messages available from socket without blocking.
+    """
+    messages: List[List[zmq.Frame]] = []
+
+    for _ in range(RECEIVE_BATCH):
+        try:
+            messages.append(socket.recv_multipart(flags=zmq.NOBLOCK, copy=False))
+        except zmq.Again:
+            break
+
+    return messages
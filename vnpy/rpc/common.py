@@ -8,3 +8,27 @@ signal.signal(signal.SIGINT, signal.SIG_DFL)
 HEARTBEAT_TOPIC = "heartbeat"
 HEARTBEAT_INTERVAL = 10
 HEARTBEAT_TOLERANCE = 30
+
+# Function served by RpcServer for choosing serializer
+NEGOTIATE_FUNCTION = "negotiate_serializer"
+
+# Functions served by RpcServer for transferring history data in chunks
+OPEN_HISTORY_FUNCTION = "open_history"
+READ_HISTORY_FUNCTION = "read_history"
+
+# Rows of history data in a chunk
+HISTORY_CHUNK_SIZE = 50_000
+
+# Separator of topic, event type and vt_symbol in key of published data
+KEY_SEPARATOR = "|"
+
+
+def get_event_key(topic: str, event_type: str, vt_symbol: str = "") -> str:
+    """
+    Key of event published by RpcServer, or prefix of keys to subscribe
+    if vt_symbol is empty.
+    """
+    key: str = f"{topic}{KEY_SEPARATOR}{event_type}{KEY_SEPARATOR}"
+    if vt_symbol:
+        key += f"{vt_symbol}{KEY_SEPARATOR}"
+    return key
@@ -0,0 +1,256 @@
+"""
+Columnar history data transferred by RpcServer and RpcClient.
+
+A list of data objects (BarData, TickData or any other dataclass) is
+converted into one column per field:
+
+* float fields are numpy float64 arrays
+* datetime fields are arrays of datetime state bytes (as pickled), with
+  the time zone shared by all values kept once
+* other fields (str, enum) are integer codes into a list of categories
+
+Numpy arrays are sent as out-of-band buffers by pickle5 and schema
+serializers, and objects are only rebuilt when to_objects is called.
+"""
+
+from dataclasses import fields
+from datetime import datetime, tzinfo
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .serializer import get_hints
+
+
+COLUMN_FLOAT = "float"
+COLUMN_DATETIME = "datetime"
+COLUMN_CATEGORY = "category"
+COLUMN_LIST = "list"
+
+# Datetime state bytes: year (2 bytes), month, day, hour, minute, second
+# and microsecond (3 bytes)
+DATETIME_STATE = "V10"
+
+
+class Column:
+    """
+    Values of a field in one of the column kinds.
+    """
+
+    __slots__ = ("kind", "values", "categories", "tz")
+
+    def __init__(
+        self,
+        kind: str,
+        values: Any,
+        categories: Optional[list] = None,
+        tz: Optional[tzinfo] = None
+    ) -> None:
+        """"""
+        self.kind: str = kind
+        self.values: Any = values
+        self.categories: Optional[list] = categories
+        self.tz: Optional[tzinfo] = tz
+
+    def slice(self, start: int, end: int) -> "Column":
+        """
+        Column of rows from start to end, sharing memory of arrays.
+        """
+        return Column(self.kind, self.values[start:end], self.categories, self.tz)
+
+    def to_list(self) -> list:
+        """
+        Convert back into list of original values.
+        """
+        if self.kind == COLUMN_FLOAT:
+            return self.values.tolist()
+
+        elif self.kind == COLUMN_DATETIME:
+            tz: Optional[tzinfo] = self.tz
+            if tz:
+                return [datetime(state, tz) for state in self.values.tolist()]
+            return [datetime(state) for state in self.values.tolist()]
+
+        elif self.kind == COLUMN_CATEGORY:
+            categories: np.ndarray = np.empty(len(self.categories), object)
+            categories[:] = self.categories
+            return categories[self.values].tolist()
+
+        return list(self.values)
+
+    def to_datetime64(self) -> np.ndarray:
+        """
+        Convert datetime column into numpy datetime64[us] array of wall time.
+        """
+        b: np.ndarray = self.values.view(np.uint8).reshape(-1, 10).astype(np.int64)
+
+        year: np.ndarray = b[:, 0] * 256 + b[:, 1]
+        month: np.ndarray = b[:, 2] & 0x7F      # Highest bit is fold
+        day: np.ndarray = b[:, 3]
+        seconds: np.ndarray = b[:, 4] * 3600 + b[:, 5] * 60 + b[:, 6]
+        microseconds: np.ndarray = (b[:, 7] << 16) + (b[:, 8] << 8) + b[:, 9]
+
+        months: np.ndarray = (year - 1970).astype("datetime64[Y]") + (month - 1).astype("timedelta64[M]")
+        days: np.ndarray = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+        return days.astype("datetime64[us]") + (seconds * 1_000_000 + microseconds).astype("timedelta64[us]")
+
+
+class HistoryData:
+    """
+    History data of a data class in columns.
+    """
+
+    def __init__(self, cls: Optional[type] = None, size: int = 0, columns: Optional[Dict[str, Column]] = None) -> None:
+        """"""
+        self.cls: Optional[type] = cls
+        self.size: int = size
+        self.columns: Dict[str, Column] = columns or {}
+
+    def __len__(self) -> int:
+        """"""
+        return self.size
+
+    def get(self, name: str) -> Any:
+        """
+        Get values of a field, numpy array for float fields, datetime64[us]
+        array of wall time for datetime fields, and list for others.
+        """
+        column: Column = self.columns[name]
+        if column.kind == COLUMN_FLOAT:
+            return column.values
+        elif column.kind == COLUMN_DATETIME:
+            return column.to_datetime64()
+        return column.to_list()
+
+    def to_objects(self) -> list:
+        """
+        Rebuild data objects.
+        """
+        if not self.size:
+            return []
+
+        cls: type = self.cls
+        new: Callable = cls.__new__
+        names: List[str] = list(self.columns.keys())
+        post_init: Optional[Callable] = getattr(cls, "__post_init__", None)
+
+        objects: list = []
+        for values in zip(*[column.to_list() for column in self.columns.values()]):
+            obj: Any = new(cls)
+            obj.__dict__.update(zip(names, values))
+
+            if post_init:
+                post_init(obj)
+
+            objects.append(obj)
+
+        return objects
+
+    def split(self, chunk_size: int) -> List["HistoryData"]:
+        """
+        Split into chunks of at most chunk_size rows.
+        """
+        chunks: List[HistoryData] = []
+
+        for start in range(0, self.size, chunk_size):
+            end: int = min(start + chunk_size, self.size)
+            columns: Dict[str, Column] = {
+                name: column.slice(start, end) for name, column in self.columns.items()
+            }
+            chunks.append(HistoryData(self.cls, end - start, columns))
+
+        return chunks
+
+    @classmethod
+    def concat(cls, chunks: Sequence["HistoryData"]) -> "HistoryData":
+        """
+        Join chunks split from the same history data.
+        """
+        chunks = [chunk for chunk in chunks if chunk.size]
+        if not chunks:
+            return HistoryData()
+        elif len(chunks) == 1:
+            return chunks[0]
+
+        first: HistoryData = chunks[0]
+        columns: Dict[str, Column] = {}
+
+        for name, column in first.columns.items():
+            parts: list = [chunk.columns[name].values for chunk in chunks]
+
+            if column.kind == COLUMN_LIST:
+                values: Any = [v for part in parts for v in part]
+            else:
+                values = np.concatenate(parts)
+
+            columns[name] = Column(column.kind, values, column.categories, column.tz)
+
+        return HistoryData(first.cls, sum(chunk.size for chunk in chunks), columns)
+
+
+def to_history(objects: Sequence[Any]) -> HistoryData:
+    """
+    Convert list of data objects of the same class into columns.
+    """
+    if not objects:
+        return HistoryData()
+
+    cls: type = type(objects[0])
+    hints: Dict[str, Any] = get_hints(cls)
+
+    columns: Dict[str, Column] = {}
+    for f in fields(cls):
+        values: list = list(map(attrgetter(f.name), objects))
+        columns[f.name] = to_column(values, hints.get(f.name, None))
+
+    return HistoryData(cls, len(objects), columns)
+
+
+def to_column(values: list, hint: Any) -> Column:
+    """
+    Convert values of a field into column, kind of which is chosen by
+    type hint and falls back to list.
+    """
+    # None would be converted into nan by numpy
+    if hint is float and None not in values:
+        try:
+            return Column(COLUMN_FLOAT, np.fromiter(values, np.float64, len(values)))
+        except (TypeError, ValueError):
+            return Column(COLUMN_LIST, values)
+
+    elif hint is datetime:
+        column: Optional[Column] = to_datetime_column(values)
+        if column:
+            return column
+
+    # Other values are usually repeated, such as symbol and exchange,
+    # and often the same for all rows
+    if values.count(values[0]) == len(values):
+        return Column(COLUMN_CATEGORY, np.zeros(len(values), np.uint8), values[:1])
+
+    try:
+        categories: list = list(dict.fromkeys(values))
+    except TypeError:
+        return Column(COLUMN_LIST, values)
+
+    codes: Dict[Any, int] = {v: i for i, v in enumerate(categories)}
+    dtype: np.dtype = np.min_scalar_type(len(categories) - 1)
+    indexes: np.ndarray = np.fromiter(map(codes.__getitem__, values), dtype, len(values))
+    return Column(COLUMN_CATEGORY, indexes, categories)
+
+
+def to_datetime_column(values: list) -> Optional[Column]:
+    """
+    Convert datetimes of the same time zone into state bytes array, None
+    if any of them is not datetime or in another time zone.
+    """
+    tz: Optional[tzinfo] = getattr(values[0], "tzinfo", None)
+
+    states: List[bytes] = []
+    for dt in values:
+        if type(dt) is not datetime or dt.tzinfo is not tz:
+            return None
+        states.append(dt.__reduce__()[1][0])
+
+    return Column(COLUMN_DATETIME, np.array(states, DATETIME_STATE), tz=tz)
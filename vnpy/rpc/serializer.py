@@ -0,0 +1,357 @@
+"""
+Serializers used by RpcServer and RpcClient to encode requests, replies
+and published data into zmq frames.
+
+* pickle: default pickle protocol in one frame, same as send_pyobj
+* pickle5: pickle protocol 5, buffers supporting out-of-band pickling
+  (numpy array, PickleBuffer) are sent as separate frames without copying
+* schema: pickle5 of data objects encoded by a schema shared by both sides
+  into built-in types, so field names, classes and enums are not pickled
+
+Client and server negotiate the serializer when client is started.
+"""
+
+import pickle
+from abc import ABC, abstractmethod
+from dataclasses import fields, is_dataclass
+from datetime import datetime, tzinfo
+from enum import Enum
+from hashlib import md5
+from inspect import getmembers, isclass
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, get_type_hints
+from zoneinfo import ZoneInfo
+
+import Pandora.constant
+import Pandora.trader.object
+from vnpy.event import Event
+
+
+class Serializer(ABC):
+    """
+    Converts python object into frames and back.
+    """
+
+    name: str = ""
+
+    @property
+    def version(self) -> str:
+        """
+        Serializers with the same name and version are compatible.
+        """
+        return ""
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> List[Any]:
+        """
+        Encode object into a list of frames (bytes or buffer).
+        """
+        pass
+
+    @abstractmethod
+    def loads(self, frames: Sequence[Any]) -> Any:
+        """
+        Decode object from frames received.
+        """
+        pass
+
+
+class PickleSerializer(Serializer):
+    """"""
+
+    name: str = "pickle"
+
+    def dumps(self, obj: Any) -> List[Any]:
+        """"""
+        return [pickle.dumps(obj, pickle.DEFAULT_PROTOCOL)]
+
+    def loads(self, frames: Sequence[Any]) -> Any:
+        """"""
+        return pickle.loads(frames[0])
+
+
+class Pickle5Serializer(Serializer):
+    """"""
+
+    name: str = "pickle5"
+
+    def dumps(self, obj: Any) -> List[Any]:
+        """"""
+        buffers: list = []
+        data: bytes = pickle.dumps(obj, 5, buffer_callback=buffers.append)
+        return [data, *buffers]
+
+    def loads(self, frames: Sequence[Any]) -> Any:
+        """"""
+        return pickle.loads(frames[0], buffers=frames[1:])
+
+
+class SchemaSerializer(Pickle5Serializer):
+    """"""
+
+    name: str = "schema"
+
+    @property
+    def version(self) -> str:
+        """"""
+        return schema.version
+
+    def dumps(self, obj: Any) -> List[Any]:
+        """"""
+        return super().dumps(schema.encode(obj))
+
+    def loads(self, frames: Sequence[Any]) -> Any:
+        """"""
+        return schema.decode(super().loads(frames))
+
+
+class Schema:
+    """
+    Data classes of trader object module, Event and enums of constant
+    module, in a fixed order shared by client and server.
+
+    A data object is encoded as tuple of a mark, its class index and list
+    of field values, with enum member replaced by its index and datetime
+    by its state bytes and time zone key. The result only contains built-in
+    types, which are pickled much faster than classes and enums.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.classes: List[type] = []
+        self.encoders: Dict[type, Callable] = {}
+        self.decoders: List[Callable] = []
+
+        self.members: List[Enum] = []
+        self.member_indexes: Dict[Enum, int] = {}
+        self.enums: Set[type] = set()
+
+        self.zones: Dict[str, tzinfo] = {}
+
+        desc: list = []
+
+        for _, enum_cls in getmembers(Pandora.constant, is_enum):
+            if enum_cls in self.enums:
+                continue
+            self.enums.add(enum_cls)
+
+            for member in enum_cls:
+                self.member_indexes[member] = len(self.members)
+                self.members.append(member)
+
+            desc.append((enum_cls.__name__, [member.name for member in enum_cls]))
+
+        for _, cls in getmembers(Pandora.trader.object, is_dataclass):
+            if cls in self.encoders:
+                continue
+
+            names: Tuple[str, ...] = tuple(f.name for f in fields(cls))
+            hints: Dict[str, Any] = get_hints(cls)
+            self.add_class(cls, names, hints)
+
+            desc.append((cls.__name__, [(name, self.get_kind(hints.get(name, None))) for name in names]))
+
+        self.add_class(Event, ("type", "data"), {"type": str})
+
+        self.version: str = md5(repr(desc).encode()).hexdigest()[:8]
+
+    def get_kind(self, hint: Any) -> str:
+        """
+        Get how a field is encoded from its type hint.
+        """
+        # Optional[X] is Union[X, None]
+        args: tuple = getattr(hint, "__args__", ())
+        if args and len(args) == 2 and type(None) in args:
+            hint = args[0] if args[1] is type(None) else args[1]
+
+        if hint in self.enums:
+            return "enum"
+        elif hint is datetime:
+            return "datetime"
+        elif hint in {str, int, float, bool}:
+            return "plain"
+        return "any"
+
+    def add_class(self, cls: type, names: Tuple[str, ...], hints: Dict[str, Any]) -> None:
+        """"""
+        index: int = len(self.classes)
+        self.classes.append(cls)
+
+        enum_indexes: List[int] = []
+        datetime_indexes: List[int] = []
+        any_indexes: List[int] = []
+
+        for i, name in enumerate(names):
+            kind: str = self.get_kind(hints.get(name, None))
+            if kind == "enum":
+                enum_indexes.append(i)
+            elif kind == "datetime":
+                datetime_indexes.append(i)
+            elif kind == "any":
+                any_indexes.append(i)
+
+        get_values: Callable = make_getter(names)
+        member_indexes: Dict[Enum, int] = self.member_indexes
+        members: List[Enum] = self.members
+        encode_datetime: Callable = self.encode_datetime
+        decode_datetime: Callable = self.decode_datetime
+        encode: Callable = self.encode
+        decode: Callable = self.decode
+
+        def encode_object(obj: Any) -> tuple:
+            values: list = list(get_values(obj))
+
+            # Value which is not a member is kept in a tuple
+            for i in enum_indexes:
+                value: Any = values[i]
+                if value is not None:
+                    member_index: Optional[int] = member_indexes.get(value, None)
+                    values[i] = (value,) if member_index is None else member_index
+
+            for i in datetime_indexes:
+                value = values[i]
+                if value is not None:
+                    values[i] = encode_datetime(value)
+
+            for i in any_indexes:
+                values[i] = encode(values[i])
+
+            return (OBJECT_MARK, index, values)
+
+        post_init: Optional[Callable] = getattr(cls, "__post_init__", None)
+
+        def decode_object(values: list) -> Any:
+            for i in enum_indexes:
+                value: Any = values[i]
+                if type(value) is int:
+                    values[i] = members[value]
+                elif value is not None:
+                    values[i] = value[0]
+
+            for i in datetime_indexes:
+                value = values[i]
+                if value is not None:
+                    values[i] = decode_datetime(value)
+
+            for i in any_indexes:
+                values[i] = decode(values[i])
+
+            obj: Any = cls.__new__(cls)
+            obj.__dict__.update(zip(names, values))
+
+            if post_init:
+                post_init(obj)
+
+            return obj
+
+        self.encoders[cls] = encode_object
+        self.decoders.append(decode_object)
+
+    def encode(self, obj: Any) -> Any:
+        """
+        Encode data objects inside list, tuple and dict recursively.
+        """
+        encoder: Optional[Callable] = self.encoders.get(type(obj), None)
+        if encoder:
+            return encoder(obj)
+
+        t: type = type(obj)
+        if t is list:
+            return [self.encode(v) for v in obj]
+        elif t is tuple:
+            return tuple([self.encode(v) for v in obj])
+        elif t is dict:
+            return {k: self.encode(v) for k, v in obj.items()}
+        return obj
+
+    def decode(self, obj: Any) -> Any:
+        """
+        Rebuild data objects encoded.
+        """
+        t: type = type(obj)
+        if t is tuple:
+            if len(obj) == 3 and type(obj[0]) is str and obj[0] == OBJECT_MARK:
+                return self.decoders[obj[1]](obj[2])
+            return tuple([self.decode(v) for v in obj])
+        elif t is list:
+            return [self.decode(v) for v in obj]
+        elif t is dict:
+            return {k: self.decode(v) for k, v in obj.items()}
+        return obj
+
+    def encode_datetime(self, dt: datetime) -> Any:
+        """
+        Convert datetime into state bytes, with key if time zone is ZoneInfo.
+        """
+        # Subclasses such as pandas Timestamp are pickled as they are
+        if type(dt) is not datetime:
+            return dt
+
+        state: tuple = dt.__reduce__()[1]
+        if len(state) == 1:
+            return state[0]
+
+        tz: tzinfo = state[1]
+        if type(tz) is ZoneInfo:
+            return (state[0], tz.key)
+        return state
+
+    def decode_datetime(self, value: Any) -> datetime:
+        """"""
+        t: type = type(value)
+        if t is bytes:
+            return datetime(value)
+        elif t is not tuple:
+            return value
+
+        state, tz = value
+        if type(tz) is str:
+            zone: Optional[tzinfo] = self.zones.get(tz, None)
+            if not zone:
+                zone = ZoneInfo(tz)
+                self.zones[tz] = zone
+            tz = zone
+
+        return datetime(state, tz)
+
+
+def is_enum(obj: Any) -> bool:
+    """"""
+    return isclass(obj) and issubclass(obj, Enum) and obj is not Enum
+
+
+def get_hints(cls: type) -> Dict[str, Any]:
+    """
+    Get type hints of class, empty if any of them cannot be resolved.
+    """
+    try:
+        return get_type_hints(cls)
+    except Exception:
+        return {}
+
+
+def make_getter(names: Sequence[str]) -> Callable[[Any], tuple]:
+    """"""
+    getter: Callable = attrgetter(*names)
+    if len(names) == 1:
+        return lambda obj: (getter(obj),)
+    return getter
+
+
+# First item of tuple encoded from data object
+OBJECT_MARK: str = "\x00vnpy.object"
+
+schema: Schema = Schema()
+
+SERIALIZERS: Dict[str, Serializer] = {
+    s.name: s for s in [PickleSerializer(), Pickle5Serializer(), SchemaSerializer()]
+}
+
+DEFAULT_SERIALIZER: str = PickleSerializer.name
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Get serializer by name, KeyError if not found.
+    """
+    return SERIALIZERS[name]
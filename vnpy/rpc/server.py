@@ -1,37 +1,98 @@
 import threading
 import traceback
+from collections import deque
+from itertools import count
+from queue import Queue
 from time import time
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
 
 import zmq
 
-from .common import HEARTBEAT_TOPIC, HEARTBEAT_INTERVAL
+from vnpy.event import Event
 
+from .common import (
+    HEARTBEAT_TOPIC,
+    HEARTBEAT_INTERVAL,
+    NEGOTIATE_FUNCTION,
+    OPEN_HISTORY_FUNCTION,
+    READ_HISTORY_FUNCTION,
+    HISTORY_CHUNK_SIZE,
+    get_event_key
+)
+from .history import HistoryData, to_history
+from .serializer import Serializer, DEFAULT_SERIALIZER, SERIALIZERS, get_serializer
+
+
+# Seconds before history data not fully read by client is dropped
+HISTORY_EXPIRY = 300
 
 class RpcServer:
-    """"""
+    """
+    Requests are received by a ROUTER socket and executed by a pool of
+    worker threads. Requests of the same client are executed one by one
+    in the order received.
+
+    By default there is only one worker, so registered functions never
+    run concurrently. With worker_count raised, requests of different
+    clients are executed concurrently, and every registered function
+    (such as send_order of main engine, which calls gateway) must be
+    thread-safe.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, worker_count: int = 1) -> None:
         """
         Constructor
         """
         # Save functions dict: key is function name, value is function object
         self._functions: Dict[str, Callable] = {}
+        self._functions[NEGOTIATE_FUNCTION] = self.negotiate_serializer
+        self._functions[OPEN_HISTORY_FUNCTION] = self.open_history
+        self._functions[READ_HISTORY_FUNCTION] = self.read_history
+
+        # Chunks of history data waiting to be read, and time of expiry
+        self._histories: Dict[str, Tuple[List[HistoryData], float]] = {}
+        self._history_ids: count = count(1)
+        self._history_lock: threading.Lock = threading.Lock()
+
+        # Serializers negotiated by clients, used for publishing data.
+        # Legacy format (topic and data pickled in one frame) is published
+        # until any client negotiated, so that legacy clients still work
+        # with server not used by new clients
+        self._pub_serializers: Set[str] = set()
 
         # Zmq port related
         self._context: zmq.Context = zmq.Context()
 
-        # Reply socket (Request–reply pattern)
-        self._socket_rep: zmq.Socket = self._context.socket(zmq.REP)
+        # Router socket (Request–reply pattern), serving REQ and DEALER clients
+        self._socket_router: zmq.Socket = self._context.socket(zmq.ROUTER)
 
-        # Publish socket (Publish–subscribe pattern)
-        self._socket_pub: zmq.Socket = self._context.socket(zmq.PUB)
+        # Pull socket receiving replies from workers, sent by router socket
+        self._socket_reply: zmq.Socket = self._context.socket(zmq.PULL)
+        self._reply_address: str = f"inproc://rpc_reply_{id(self)}"
+
+        # Publish socket (Publish–subscribe pattern), receiving every
+        # subscribe and unsubscribe message of clients
+        self._socket_pub: zmq.Socket = self._context.socket(zmq.XPUB)
+        self._socket_pub.setsockopt(zmq.XPUB_VERBOSER, 1)
+
+        # Subscribed prefixes and number of subscribers, data not matching
+        # any of them is not serialized
+        self._subscriptions: Dict[bytes, int] = {}
+        self._prefixes: Tuple[bytes, ...] = ()
 
         # Worker thread related
         self._active: bool = False                      # RpcServer status
         self._thread: threading.Thread = None           # RpcServer thread
         self._lock: threading.Lock = threading.Lock()
 
+        # Worker pool related: requests waiting of each client, and queue
+        # of clients whose first waiting request can be executed
+        self._worker_count: int = worker_count
+        self._workers: List[threading.Thread] = []
+        self._pending: Dict[bytes, Deque[List[zmq.Frame]]] = {}
+        self._pending_lock: threading.Lock = threading.Lock()
+        self._ready: Queue = Queue()
+
         # Heartbeat related
         self._heartbeat_at: int = None
 
@@ -51,12 +112,20 @@ class RpcServer:
             return
 
         # Bind socket address
-        self._socket_rep.bind(rep_address)
+        self._socket_router.bind(rep_address)
         self._socket_pub.bind(pub_address)
+        self._socket_reply.bind(self._reply_address)
 
         # Start RpcServer status
         self._active = True
 
+        # Start worker threads
+        self._workers = []
+        for _ in range(self._worker_count):
+            worker: threading.Thread = threading.Thread(target=self.run_worker)
+            worker.start()
+            self._workers.append(worker)
+
         # Start RpcServer thread
         self._thread = threading.Thread(target=self.run)
         self._thread.start()
@@ -84,41 +153,232 @@ class RpcServer:
         """
         Run RpcServer functions
         """
+        poller: zmq.Poller = zmq.Poller()
+        poller.register(self._socket_router, zmq.POLLIN)
+        poller.register(self._socket_reply, zmq.POLLIN)
+
         while self._active:
-            # Poll response socket for 1 second
-            n: int = self._socket_rep.poll(1000)
+            # Poll request and reply sockets for 1 second
+            events: dict = dict(poller.poll(1000))
             self.check_heartbeat()
 
-            if not n:
-                continue
+            # Dispatch request received from Router socket to workers
+            if self._socket_router in events:
+                frames: List[zmq.Frame] = self._socket_router.recv_multipart(copy=False)
+                self.dispatch(frames)
 
-            # Receive request data from Reply socket
-            req = self._socket_rep.recv_pyobj()
+            # Send reply finished by worker with Router socket
+            if self._socket_reply in events:
+                frames = self._socket_reply.recv_multipart(copy=False)
+                self._socket_router.send_multipart(frames, copy=False)
 
-            # Get function name and parameters
-            name, args, kwargs = req
+        # Stop worker threads
+        for _ in self._workers:
+            self._ready.put(None)
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func: Callable = self._functions[name]
-                r: Any = func(*args, **kwargs)
-                rep: list = [True, r]
-            except Exception as e:  # noqa
-                rep: list = [False, traceback.format_exc()]
-
-            # send callable response by Reply socket
-            self._socket_rep.send_pyobj(rep)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
 
         # Unbind socket address
         self._socket_pub.unbind(self._socket_pub.LAST_ENDPOINT)
-        self._socket_rep.unbind(self._socket_rep.LAST_ENDPOINT)
+        self._socket_router.unbind(self._socket_router.LAST_ENDPOINT)
+        self._socket_reply.unbind(self._socket_reply.LAST_ENDPOINT)
+
+    def dispatch(self, frames: List[zmq.Frame]) -> None:
+        """
+        Queue request after earlier ones of the same client.
+        """
+        # First frame is identity of client added by Router socket
+        client: bytes = frames[0].bytes
+
+        with self._pending_lock:
+            requests: Optional[Deque[List[zmq.Frame]]] = self._pending.get(client, None)
+            if requests:
+                requests.append(frames)
+                return
+
+            self._pending[client] = deque([frames])
+
+        self._ready.put(client)
+
+    def run_worker(self) -> None:
+        """
+        Run worker thread executing requests.
+        """
+        socket: zmq.Socket = self._context.socket(zmq.PUSH)
+        socket.connect(self._reply_address)
+
+        while True:
+            client: Optional[bytes] = self._ready.get()
+            if client is None:
+                break
+
+            frames: List[zmq.Frame] = self._pending[client][0]
+            try:
+                socket.send_multipart(self.process(frames), copy=False)
+            except Exception:
+                # Malformed request cannot be replied
+                traceback.print_exc()
+
+            # Make next request of the client ready
+            with self._pending_lock:
+                requests: Deque[List[zmq.Frame]] = self._pending[client]
+                requests.popleft()
+
+                if requests:
+                    self._ready.put(client)
+                else:
+                    self._pending.pop(client)
+
+        socket.close()
+
+    def process(self, frames: List[zmq.Frame]) -> List[Any]:
+        """
+        Execute request and return reply frames.
+        """
+        # Envelope (identity and others) ends with an empty delimiter
+        i: int = 0
+        while i < len(frames) - 1 and len(frames[i]):
+            i += 1
+
+        envelope: List[zmq.Frame] = frames[:i + 1]
+        body: List[zmq.Frame] = frames[i + 1:]
+
+        # Client sends serializer name before data, except for the
+        # legacy format which is pickled in one frame
+        if len(body) > 1:
+            header: List[zmq.Frame] = body[:1]
+            serializer: Serializer = get_serializer(body[0].bytes.decode())
+            req = serializer.loads(body[1:])
+        else:
+            header = []
+            serializer = get_serializer(DEFAULT_SERIALIZER)
+            req = serializer.loads(body)
+
+        # Get function name and parameters
+        name, args, kwargs = req
+
+        # Try to get and execute callable function object; capture exception information if it fails
+        try:
+            func: Callable = self._functions[name]
+            r: Any = func(*args, **kwargs)
+            rep: list = [True, r]
+        except Exception as e:  # noqa
+            rep: list = [False, traceback.format_exc()]
+
+        return envelope + header + serializer.dumps(rep)
 
     def publish(self, topic: str, data: Any) -> None:
         """
         Publish data
         """
+        key: str = get_key(topic, data)
+
+        with self._lock:
+            self.update_subscriptions()
+
+            if not self._pub_serializers:
+                self._socket_pub.send_pyobj([topic, data])
+                return
+
+            # Data is serialized once for each serializer used by clients,
+            # only when subscribed by any of them
+            for name in list(self._pub_serializers):
+                header: bytes = f"{name}:{key}".encode()
+                if not header.startswith(self._prefixes):
+                    continue
+
+                serializer: Serializer = get_serializer(name)
+                self._socket_pub.send_multipart([header, *serializer.dumps(data)], copy=False)
+
+    def update_subscriptions(self) -> None:
+        """
+        Receive subscribe and unsubscribe messages from publish socket.
+        """
+        changed: bool = False
+
+        while self._socket_pub.getsockopt(zmq.EVENTS) & zmq.POLLIN:
+            msg: bytes = self._socket_pub.recv()
+            if not msg:
+                continue
+
+            # First byte is 1 for subscribe and 0 for unsubscribe
+            prefix: bytes = msg[1:]
+            count: int = self._subscriptions.get(prefix, 0)
+
+            if msg[0]:
+                self._subscriptions[prefix] = count + 1
+            elif count > 1:
+                self._subscriptions[prefix] = count - 1
+            else:
+                self._subscriptions.pop(prefix, None)
+
+            changed = True
+
+        if changed:
+            self._prefixes = tuple(self._subscriptions.keys())
+
+    def negotiate_serializer(self, options: Sequence[Tuple[str, str]]) -> str:
+        """
+        Choose the first serializer of client options (name and version)
+        supported by server.
+        """
+        for name, version in options:
+            serializer: Serializer = SERIALIZERS.get(name, None)
+            if serializer and serializer.version == version:
+                break
+        else:
+            name = DEFAULT_SERIALIZER
+
+        # Called by worker threads while publish may be iterating
         with self._lock:
-            self._socket_pub.send_pyobj([topic, data])
+            self._pub_serializers.add(name)
+
+        return name
+
+    def open_history(
+        self,
+        name: str,
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+        chunk_size: int = HISTORY_CHUNK_SIZE
+    ) -> Tuple[str, int]:
+        """
+        Call registered function returning list of bar or tick data, and
+        keep the result in column chunks to be read by read_history.
+        Return id of history and number of chunks.
+        """
+        func: Callable = self._functions[name]
+        data: Optional[list] = func(*args, **kwargs)
+
+        chunks: List[HistoryData] = to_history(data or []).split(chunk_size)
+        if not chunks:
+            return "", 0
+
+        now: float = time()
+        history_id: str = str(next(self._history_ids))
+
+        with self._history_lock:
+            for expired_id, (_, expiry) in list(self._histories.items()):
+                if expiry < now:
+                    self._histories.pop(expired_id)
+
+            self._histories[history_id] = (chunks, now + HISTORY_EXPIRY)
+
+        return history_id, len(chunks)
+
+    def read_history(self, history_id: str, index: int) -> HistoryData:
+        """
+        Read a chunk of history opened, which is dropped after the last
+        chunk is read.
+        """
+        with self._history_lock:
+            chunks, _ = self._histories[history_id]
+            if index == len(chunks) - 1:
+                self._histories.pop(history_id)
+
+        return chunks[index]
 
     def register(self, func: Callable) -> None:
         """
@@ -137,3 +397,14 @@ class RpcServer:
 
             # Update timestamp of next publish
             self._heartbeat_at = now + HEARTBEAT_INTERVAL
+
+
+def get_key(topic: str, data: Any) -> str:
+    """
+    Key of published data: topic, with event type and vt_symbol of event
+    data appended if data is an event. Clients subscribe to prefix of key.
+    """
+    if not isinstance(data, Event):
+        return topic
+
+    return get_event_key(topic, data.type, getattr(data.data, "vt_symbol", ""))
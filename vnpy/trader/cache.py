@@ -0,0 +1,113 @@
+"""
+On-disk cache of contracts queried by gateway, so that contracts can be
+pushed right after login instead of waiting for the full query.
+"""
+
+import pickle
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from Pandora.trader.object import ContractData
+from Pandora.trader.utility import get_folder_path
+
+
+class ContractCache:
+    """
+    Contracts of a gateway saved by trading day.
+
+    Gateway loads cached contracts of current trading day after login,
+    then passes every contract from live query to update, which tells
+    whether the contract is new or changed and should be pushed again.
+    Contracts are saved after live query finished.
+    """
+
+    def __init__(self, gateway_name: str) -> None:
+        """"""
+        self.gateway_name: str = gateway_name
+        self.folder: Path = get_folder_path(gateway_name.lower())
+
+        self.trading_day: str = ""
+        self.cached: Dict[str, ContractData] = {}
+        self.live: Dict[str, ContractData] = {}
+
+    def get_path(self, trading_day: str) -> Path:
+        """"""
+        return self.folder.joinpath(f"contract_{trading_day}.pkl")
+
+    def load(self, trading_day: str) -> List[ContractData]:
+        """
+        Load cached contracts of trading day, empty if not found.
+        """
+        self.trading_day = trading_day
+        self.cached.clear()
+        self.live.clear()
+
+        path: Path = self.get_path(trading_day)
+        if not path.exists():
+            return []
+
+        try:
+            with open(path, "rb") as f:
+                contracts: List[ContractData] = pickle.load(f)
+        except Exception:
+            return []
+
+        for contract in contracts:
+            contract.gateway_name = self.gateway_name
+            self.cached[contract.vt_symbol] = contract
+
+        return contracts
+
+    def update(self, contract: ContractData) -> bool:
+        """
+        Record contract from live query, return True if it is not the
+        same as cached one.
+        """
+        self.live[contract.vt_symbol] = contract
+
+        cached_contract: ContractData = self.cached.get(contract.vt_symbol, None)
+        return cached_contract != contract
+
+    def save(self) -> Tuple[int, int, int]:
+        """
+        Save contracts from live query and remove cache files of other
+        trading days. Return number of contracts added, changed and
+        removed compared with cache.
+        """
+        added: int = 0
+        changed: int = 0
+
+        for vt_symbol, contract in self.live.items():
+            cached_contract: ContractData = self.cached.get(vt_symbol, None)
+            if not cached_contract:
+                added += 1
+            elif cached_contract != contract:
+                changed += 1
+
+        removed: int = len(self.cached.keys() - self.live.keys())
+
+        if self.trading_day:
+            self.write(self.trading_day, list(self.live.values()))
+
+        self.cached = self.live
+        self.live = {}
+
+        return added, changed, removed
+
+    def write(self, trading_day: str, contracts: List[ContractData]) -> None:
+        """
+        Write contracts into cache file, failure only loses the cache.
+        """
+        path: Path = self.get_path(trading_day)
+        temp_path: Path = path.with_suffix(".tmp")
+
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(contracts, f, pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+
+            for old_path in self.folder.glob("contract_*.pkl"):
+                if old_path != path:
+                    old_path.unlink()
+        except OSError:
+            pass
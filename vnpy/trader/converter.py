@@ -1,5 +1,5 @@
 from copy import copy
-from typing import Dict, List, Set, TYPE_CHECKING
+from typing import Dict, List, Set, Tuple, TYPE_CHECKING
 
 from Pandora.trader.object import (
     ContractData,
@@ -110,6 +110,14 @@ class PositionHolding:
 
         self.active_orders: Dict[str, OrderData] = {}
 
+        # Unfilled volume of active close orders, updated incrementally
+        self.order_frozens: Dict[str, Tuple[Tuple[Direction, Offset], float]] = {}
+        self.frozen_volumes: Dict[Tuple[Direction, Offset], float] = {
+            (direction, offset): 0
+            for direction in [Direction.LONG, Direction.SHORT]
+            for offset in [Offset.CLOSE, Offset.CLOSETODAY, Offset.CLOSEYESTERDAY]
+        }
+
         self.long_pos: float = 0
         self.long_yd: float = 0
         self.long_td: float = 0
@@ -139,13 +147,25 @@ class PositionHolding:
 
     def update_order(self, order: OrderData) -> None:
         """"""
+        # Remove frozen volume of last update of the order
+        if order.vt_orderid in self.order_frozens:
+            key, frozen = self.order_frozens.pop(order.vt_orderid)
+            self.frozen_volumes[key] -= frozen
+
         if order.is_active():
             self.active_orders[order.vt_orderid] = order
+
+            # Add frozen volume of close order
+            key: Tuple[Direction, Offset] = (order.direction, order.offset)
+            if key in self.frozen_volumes:
+                frozen: float = order.volume - order.traded
+                self.order_frozens[order.vt_orderid] = (key, frozen)
+                self.frozen_volumes[key] += frozen
         else:
             if order.vt_orderid in self.active_orders:
                 self.active_orders.pop(order.vt_orderid)
 
-        self.calculate_frozen()
+        self.apply_frozen()
 
     def update_order_request(self, req: OrderRequest, vt_orderid: str) -> None:
         """"""
@@ -192,50 +212,77 @@ class PositionHolding:
         self.long_pos = self.long_td + self.long_yd
         self.short_pos = self.short_td + self.short_yd
 
-        # Update frozen volume to ensure no more than total volume
-        self.sum_pos_frozen()
-
-    def calculate_frozen(self) -> None:
-        """"""
-        self.long_pos_frozen = 0
-        self.long_yd_frozen = 0
-        self.long_td_frozen = 0
+        # Update frozen volume since today/yesterday position changed
+        self.apply_frozen()
 
-        self.short_pos_frozen = 0
-        self.short_yd_frozen = 0
-        self.short_td_frozen = 0
+    def calculate_frozen_volumes(self) -> Dict[Tuple[Direction, Offset], float]:
+        """
+        Calculate unfilled volume of close orders by scanning all active orders.
+        """
+        frozen_volumes: Dict[Tuple[Direction, Offset], float] = {
+            key: 0 for key in self.frozen_volumes
+        }
 
         for order in self.active_orders.values():
+            key: Tuple[Direction, Offset] = (order.direction, order.offset)
+
             # Ignore position open orders
-            if order.offset == Offset.OPEN:
-                continue
-
-            frozen: float = order.volume - order.traded
-
-            if order.direction == Direction.LONG:
-                if order.offset == Offset.CLOSETODAY:
-                    self.short_td_frozen += frozen
-                elif order.offset == Offset.CLOSEYESTERDAY:
-                    self.short_yd_frozen += frozen
-                elif order.offset == Offset.CLOSE:
-                    self.short_td_frozen += frozen
-
-                    if self.short_td_frozen > self.short_td:
-                        self.short_yd_frozen += (self.short_td_frozen
-                                                 - self.short_td)
-                        self.short_td_frozen = self.short_td
-            elif order.direction == Direction.SHORT:
-                if order.offset == Offset.CLOSETODAY:
-                    self.long_td_frozen += frozen
-                elif order.offset == Offset.CLOSEYESTERDAY:
-                    self.long_yd_frozen += frozen
-                elif order.offset == Offset.CLOSE:
-                    self.long_td_frozen += frozen
-
-                    if self.long_td_frozen > self.long_td:
-                        self.long_yd_frozen += (self.long_td_frozen
-                                                - self.long_td)
-                        self.long_td_frozen = self.long_td
+            if key in frozen_volumes:
+                frozen_volumes[key] += order.volume - order.traded
+
+        return frozen_volumes
+
+    def calculate_frozen(self) -> None:
+        """
+        Recalculate frozen volume from all active orders.
+        """
+        self.frozen_volumes = self.calculate_frozen_volumes()
+        self.order_frozens = {
+            order.vt_orderid: ((order.direction, order.offset), order.volume - order.traded)
+            for order in self.active_orders.values()
+            if (order.direction, order.offset) in self.frozen_volumes
+        }
+
+        self.apply_frozen()
+
+    def check_frozen(self) -> bool:
+        """
+        Check if incrementally tracked frozen volume is consistent with
+        the result of scanning all active orders.
+        """
+        frozen_volumes: Dict[Tuple[Direction, Offset], float] = self.calculate_frozen_volumes()
+
+        for key, volume in frozen_volumes.items():
+            if abs(self.frozen_volumes[key] - volume) > 1e-6:
+                return False
+
+        return True
+
+    def apply_frozen(self) -> None:
+        """
+        Calculate today/yesterday frozen volume with unfilled volume of
+        close orders. Volume of close orders is frozen from today
+        position first, the part exceeding is frozen from yesterday.
+        """
+        volumes: Dict[Tuple[Direction, Offset], float] = self.frozen_volumes
+
+        # Long orders close short position
+        close_volume: float = volumes[(Direction.LONG, Offset.CLOSE)]
+        self.short_td_frozen = volumes[(Direction.LONG, Offset.CLOSETODAY)] + close_volume
+        self.short_yd_frozen = volumes[(Direction.LONG, Offset.CLOSEYESTERDAY)]
+
+        if close_volume and self.short_td_frozen > self.short_td:
+            self.short_yd_frozen += (self.short_td_frozen - self.short_td)
+            self.short_td_frozen = self.short_td
+
+        # Short orders close long position
+        close_volume = volumes[(Direction.SHORT, Offset.CLOSE)]
+        self.long_td_frozen = volumes[(Direction.SHORT, Offset.CLOSETODAY)] + close_volume
+        self.long_yd_frozen = volumes[(Direction.SHORT, Offset.CLOSEYESTERDAY)]
+
+        if close_volume and self.long_td_frozen > self.long_td:
+            self.long_yd_frozen += (self.long_td_frozen - self.long_td)
+            self.long_td_frozen = self.long_td
 
         self.sum_pos_frozen()
 
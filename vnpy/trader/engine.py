@@ -1,16 +1,22 @@
 import logging
-from logging import Logger
+from logging import Logger, LogRecord
+from logging.handlers import QueueHandler, QueueListener
 import smtplib
 import os
 from abc import ABC
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
+from time import monotonic, perf_counter
 from email.message import EmailMessage
-from queue import Empty, Queue
-from threading import Thread
-from typing import Any, Type, Dict, List, Optional
+from functools import partial
+from importlib import import_module
+from queue import Empty, Full, Queue
+from threading import RLock, Thread
+from typing import Any, Callable, Type, Dict, List, Optional, Sequence, Tuple, Union
 
-from vnpy.event import Event, EventEngine
+from vnpy.event import Event, EventEngine, EVENT_MONITOR, format_summary
 from .app import BaseApp
 from .event import (
     EVENT_TICK,
@@ -20,7 +26,8 @@ from .event import (
     EVENT_ACCOUNT,
     EVENT_CONTRACT,
     EVENT_LOG,
-    EVENT_QUOTE
+    EVENT_QUOTE,
+    EVENT_LATENCY
 )
 from .gateway import BaseGateway
 from Pandora.trader.object import (
@@ -43,6 +50,11 @@ from Pandora.trader.object import (
 from .setting import SETTINGS
 from Pandora.trader.utility import get_folder_path, TRADER_DIR
 from .converter import OffsetConverter
+from .latency import OrderLatencyTracer, LatencyData
+
+
+# Shared by all calls of trace_strategy when tracing is not active
+NULL_CONTEXT: AbstractContextManager = nullcontext()
 
 
 class MainEngine:
@@ -63,6 +75,20 @@ class MainEngine:
         self.apps: Dict[str, BaseApp] = {}
         self.exchanges: List[Exchange] = []
 
+        # Apps and gateways to be imported and created on first use
+        self.lazy_apps: Dict[str, Union[Type[BaseApp], str]] = {}
+        self.lazy_gateways: Dict[str, Union[Type[BaseGateway], str]] = {}
+        self.lazy_lock: RLock = RLock()
+
+        # Handlers creating lazy apps on first event, and their event types
+        self.lazy_handlers: Dict[str, Tuple[Callable[[Event], None], Sequence[str]]] = {}
+
+        # Seconds used for importing modules and creating objects
+        self.load_times: Dict[str, float] = {}
+
+        # Set by LatencyEngine if order latency tracing is active
+        self.order_tracer: Optional[OrderLatencyTracer] = None
+
         os.chdir(TRADER_DIR)    # Change working directory
         self.init_engines()     # Initialize function engines
 
@@ -70,38 +96,160 @@ class MainEngine:
         """
         Add function engine.
         """
+        start: float = perf_counter()
+
         engine: BaseEngine = engine_class(self, self.event_engine)
         self.engines[engine.engine_name] = engine
+
+        self.load_times[f"创建引擎 {engine.engine_name}"] = perf_counter() - start
         return engine
 
-    def add_gateway(self, gateway_class: Type[BaseGateway], gateway_name: str = "") -> BaseGateway:
+    def add_gateway(
+        self,
+        gateway_class: Union[Type[BaseGateway], str],
+        gateway_name: str = "",
+        lazy: bool = False,
+        exchanges: Sequence[Exchange] = ()
+    ) -> Optional[BaseGateway]:
         """
         Add gateway.
+
+        Gateway class can also be passed as "module.ClassName" string,
+        which is imported when gateway is created. If lazy, gateway is
+        created on first get_gateway, and supported exchanges are added
+        at once, which should be passed if gateway class is string.
         """
         # Use default name if gateway_name not passed
         if not gateway_name:
+            if isinstance(gateway_class, str):
+                raise ValueError(f"gateway_name is required for {gateway_class}")
             gateway_name: str = gateway_class.default_name
 
+        if lazy:
+            self.lazy_gateways[gateway_name] = gateway_class
+
+            if not isinstance(gateway_class, str):
+                exchanges = gateway_class.exchanges
+            self.add_exchanges(exchanges)
+
+            return None
+
+        if isinstance(gateway_class, str):
+            gateway_class = self.import_class(gateway_class)
+
+        start: float = perf_counter()
+
         gateway: BaseGateway = gateway_class(self.event_engine, gateway_name)
+        gateway.order_tracer = self.order_tracer
         self.gateways[gateway_name] = gateway
 
+        self.load_times[f"创建接口 {gateway_name}"] = perf_counter() - start
+
         # Add gateway supported exchanges into engine
-        for exchange in gateway.exchanges:
-            if exchange not in self.exchanges:
-                self.exchanges.append(exchange)
+        self.add_exchanges(gateway.exchanges)
 
         return gateway
 
-    def add_app(self, app_class: Type[BaseApp]) -> "BaseEngine":
+    def add_exchanges(self, exchanges: Sequence[Exchange]) -> None:
+        """
+        Add exchanges supported by gateway.
+        """
+        for exchange in exchanges:
+            if exchange not in self.exchanges:
+                self.exchanges.append(exchange)
+
+    def add_app(
+        self,
+        app_class: Union[Type[BaseApp], str],
+        lazy: bool = False,
+        app_name: str = "",
+        event_types: Sequence[str] = ()
+    ) -> Optional["BaseEngine"]:
         """
         Add app.
+
+        App class can also be passed as "module.ClassName" string, which
+        is imported when app engine is created. If lazy, app engine is
+        created on first get_engine, or on first event of any of
+        event_types, and app_name is required if app class is passed as
+        string.
+
+        App engine created by event receives the event which created it,
+        but no events before it. So event_types should include all types
+        the app needs from start, and app without event_types must not
+        need any event before its engine is got.
+
+        Lazy app is listed by get_all_apps before created. If app class
+        is string, only app_name and app_module are known, and the app
+        is not shown in app menu.
         """
+        if lazy:
+            if isinstance(app_class, str):
+                if not app_name:
+                    raise ValueError(f"app_name is required for {app_class}")
+
+                app: BaseApp = BaseApp()
+                app.app_name = app_name
+                app.app_module = app_class.rsplit(".", 1)[0]
+                app.display_name = app_name
+            else:
+                app = app_class()
+                app_name = app.app_name
+
+            self.apps[app_name] = app
+            self.lazy_apps[app_name] = app_class
+
+            if event_types:
+                handler: Callable[[Event], None] = partial(self.process_lazy_event, app_name)
+                self.lazy_handlers[app_name] = (handler, event_types)
+
+                for event_type in event_types:
+                    self.event_engine.register(event_type, handler)
+
+            return None
+
+        if isinstance(app_class, str):
+            app_class = self.import_class(app_class)
+
         app: BaseApp = app_class()
         self.apps[app.app_name] = app
 
         engine: BaseEngine = self.add_engine(app.engine_class)
         return engine
 
+    def import_class(self, class_path: str) -> type:
+        """
+        Import class by "module.ClassName" string and record time used.
+        """
+        module_name, class_name = class_path.rsplit(".", 1)
+
+        start: float = perf_counter()
+        module: Any = import_module(module_name)
+        self.load_times[f"导入模块 {module_name}"] = perf_counter() - start
+
+        return getattr(module, class_name)
+
+    def report_load_times(self) -> None:
+        """
+        Output time used for importing modules and creating objects,
+        slowest first.
+        """
+        items: List[Tuple[str, float]] = sorted(
+            self.load_times.items(), key=lambda item: item[1], reverse=True
+        )
+
+        total: float = sum([cost for _, cost in items])
+        lines: List[str] = [f"启动耗时{total:.3f}秒："]
+
+        for name, cost in items:
+            lines.append(f"{name} {cost:.3f}秒")
+
+        if self.lazy_apps or self.lazy_gateways:
+            names: List[str] = list(self.lazy_apps) + list(self.lazy_gateways)
+            lines.append(f"延迟加载：{', '.join(names)}")
+
+        self.write_log("\n".join(lines))
+
     def init_engines(self) -> None:
         """
         Init all engines.
@@ -109,6 +257,7 @@ class MainEngine:
         self.add_engine(LogEngine)
         self.add_engine(OmsEngine)
         self.add_engine(EmailEngine)
+        self.add_engine(LatencyEngine)
 
     def write_log(self, msg: str, source: str = "") -> None:
         """
@@ -123,6 +272,19 @@ class MainEngine:
         Return gateway object by name.
         """
         gateway: BaseGateway = self.gateways.get(gateway_name, None)
+
+        if not gateway and gateway_name in self.lazy_gateways:
+            # Gateway may be requested from other threads at the same time
+            with self.lazy_lock:
+                gateway = self.gateways.get(gateway_name, None)
+
+                if not gateway and gateway_name in self.lazy_gateways:
+                    # Removed after created, so that gateway is always
+                    # found in one of the dicts
+                    gateway_class: Union[Type[BaseGateway], str] = self.lazy_gateways[gateway_name]
+                    gateway = self.add_gateway(gateway_class, gateway_name)
+                    self.lazy_gateways.pop(gateway_name)
+
         if not gateway:
             self.write_log(f"找不到底层接口：{gateway_name}")
         return gateway
@@ -132,10 +294,34 @@ class MainEngine:
         Return engine object by name.
         """
         engine: BaseEngine = self.engines.get(engine_name, None)
+
+        if not engine and engine_name in self.lazy_apps:
+            # Reentrant lock, since app engine may get other lazy engines
+            # when created
+            with self.lazy_lock:
+                engine = self.engines.get(engine_name, None)
+
+                if not engine and engine_name in self.lazy_apps:
+                    app_class: Union[Type[BaseApp], str] = self.lazy_apps[engine_name]
+                    engine = self.add_app(app_class)
+                    self.lazy_apps.pop(engine_name)
+
+                    # Handlers of new engine are registered, and unregistering
+                    # during dispatch does not skip them
+                    handler, event_types = self.lazy_handlers.pop(engine_name, (None, ()))
+                    for event_type in event_types:
+                        self.event_engine.unregister(event_type, handler)
+
         if not engine:
             self.write_log(f"找不到引擎：{engine_name}")
         return engine
 
+    def process_lazy_event(self, app_name: str, event: Event) -> None:
+        """
+        Create engine of lazy app on first event it needs.
+        """
+        self.get_engine(app_name)
+
     def get_default_setting(self, gateway_name: str) -> Optional[Dict[str, Any]]:
         """
         Get default setting dict of a specific gateway.
@@ -149,7 +335,7 @@ class MainEngine:
         """
         Get all names of gateway added in main engine.
         """
-        return list(self.gateways.keys())
+        return list(self.gateways.keys()) + list(self.lazy_gateways.keys())
 
     def get_all_apps(self) -> List[BaseApp]:
         """
@@ -179,16 +365,45 @@ class MainEngine:
         if gateway:
             gateway.subscribe(req)
 
+    def subscribe_batch(self, reqs: List[SubscribeRequest], gateway_name: str) -> None:
+        """
+        Subscribe tick data update of a list of symbols of a specific gateway.
+        """
+        gateway: BaseGateway = self.get_gateway(gateway_name)
+        if gateway:
+            gateway.subscribe_batch(reqs)
+
     def send_order(self, req: OrderRequest, gateway_name: str) -> str:
         """
         Send new order request to a specific gateway.
         """
         gateway: BaseGateway = self.get_gateway(gateway_name)
-        if gateway:
-            return gateway.send_order(req)
-        else:
+        if not gateway:
             return ""
 
+        if not self.order_tracer:
+            return gateway.send_order(req)
+
+        send_time: float = perf_counter()
+        vt_orderid: str = gateway.send_order(req)
+
+        if vt_orderid:
+            self.order_tracer.start(vt_orderid, gateway_name, req.reference, send_time, perf_counter())
+
+        return vt_orderid
+
+    def trace_strategy(self, timestamp: float) -> AbstractContextManager:
+        """
+        Return context in which orders sent from current thread are traced
+        from strategy hop at timestamp, if latency tracing is active.
+
+        Send order call is kept unchanged, since it may be patched by apps
+        such as risk manager and paper account.
+        """
+        if self.order_tracer:
+            return self.order_tracer.trace_strategy(timestamp)
+        return NULL_CONTEXT
+
     def cancel_order(self, req: CancelRequest, gateway_name: str) -> None:
         """
         Send cancel order request to a specific gateway.
@@ -261,9 +476,38 @@ class BaseEngine(ABC):
         pass
 
 
+class DroppingQueueHandler(QueueHandler):
+    """
+    Puts log record into a bounded queue without formatting it, record
+    is dropped and counted if the queue is full.
+    """
+
+    def __init__(self, queue: Queue) -> None:
+        """"""
+        super().__init__(queue)
+
+        self.dropped_count: int = 0
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Leave formatting to handlers of the listener thread.
+        """
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        """"""
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped_count += 1
+
+
 class LogEngine(BaseEngine):
     """
     Processes log event and output with logging module.
+
+    Log records are only put into a bounded queue on event thread, then
+    formatted and written by a background listener thread.
     """
 
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
@@ -282,6 +526,9 @@ class LogEngine(BaseEngine):
             "%(asctime)s  %(levelname)s: %(message)s"
         )
 
+        # Handlers run in listener thread
+        self.handlers: List[logging.Handler] = []
+
         self.add_null_handler()
 
         if SETTINGS["log.console"]:
@@ -290,6 +537,17 @@ class LogEngine(BaseEngine):
         if SETTINGS["log.file"]:
             self.add_file_handler()
 
+        self.queue: Queue = Queue(maxsize=SETTINGS["log.buffer_size"])
+        self.queue_handler: DroppingQueueHandler = DroppingQueueHandler(self.queue)
+        self.logger.addHandler(self.queue_handler)
+
+        self.listener: QueueListener = QueueListener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+        self.reported_dropped_count: int = 0
+
         self.register_event()
 
     def add_null_handler(self) -> None:
@@ -297,7 +555,7 @@ class LogEngine(BaseEngine):
         Add null handler for logger.
         """
         null_handler: logging.NullHandler = logging.NullHandler()
-        self.logger.addHandler(null_handler)
+        self.handlers.append(null_handler)
 
     def add_console_handler(self) -> None:
         """
@@ -306,7 +564,7 @@ class LogEngine(BaseEngine):
         console_handler: logging.StreamHandler = logging.StreamHandler()
         console_handler.setLevel(self.level)
         console_handler.setFormatter(self.formatter)
-        self.logger.addHandler(console_handler)
+        self.handlers.append(console_handler)
 
     def add_file_handler(self) -> None:
         """
@@ -322,11 +580,14 @@ class LogEngine(BaseEngine):
         )
         file_handler.setLevel(self.level)
         file_handler.setFormatter(self.formatter)
-        self.logger.addHandler(file_handler)
+        self.handlers.append(file_handler)
 
     def register_event(self) -> None:
         """"""
         self.event_engine.register(EVENT_LOG, self.process_log_event)
+        self.event_engine.register(EVENT_MONITOR, self.process_monitor_event)
+
+        self.event_engine.add_timer(self.check_dropped, 60)
 
     def process_log_event(self, event: Event) -> None:
         """
@@ -339,6 +600,83 @@ class LogEngine(BaseEngine):
         elif isinstance(log, str):
             self.logger.log(logging.INFO, log)
 
+    def process_monitor_event(self, event: Event) -> None:
+        """
+        Output summary of event engine instrumentation.
+        """
+        summary: dict = event.data
+        self.logger.log(logging.INFO, format_summary(summary))
+
+    def check_dropped(self) -> None:
+        """
+        Output warning if any log record dropped since last check.
+        """
+        dropped_count: int = self.get_dropped_count()
+        if dropped_count == self.reported_dropped_count:
+            return
+
+        msg: str = f"日志队列已满，累计丢弃{dropped_count}条日志"
+        self.logger.log(logging.WARNING, msg)
+
+        self.reported_dropped_count = dropped_count
+
+    def get_dropped_count(self) -> int:
+        """
+        Get number of log records dropped because queue is full.
+        """
+        return self.queue_handler.dropped_count
+
+    def close(self) -> None:
+        """
+        Stop listener thread after all queued records written.
+        """
+        if not SETTINGS["log.active"]:
+            return
+
+        self.listener.stop()
+
+
+class LatencyEngine(BaseEngine):
+    """
+    Traces order round trip latency when enabled in global setting, and
+    publishes percentile summary per gateway and strategy periodically.
+    """
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """"""
+        super(LatencyEngine, self).__init__(main_engine, event_engine, "latency")
+
+        self.tracer: Optional[OrderLatencyTracer] = None
+
+        self.main_engine.get_latency_data = self.get_latency_data
+
+        if not SETTINGS["latency.active"]:
+            return
+
+        self.tracer = OrderLatencyTracer()
+
+        main_engine.order_tracer = self.tracer
+        for gateway in main_engine.gateways.values():
+            gateway.order_tracer = self.tracer
+
+        self.event_engine.add_timer(self.publish_latency, SETTINGS["latency.interval"])
+
+    def publish_latency(self) -> None:
+        """
+        Put latency summary of every gateway and strategy hop as event.
+        """
+        for data in self.get_latency_data():
+            self.event_engine.put(Event(EVENT_LATENCY, data))
+
+    def get_latency_data(self) -> List[LatencyData]:
+        """
+        Get latency summary of every gateway and strategy hop.
+        """
+        if not self.tracer:
+            return []
+
+        return self.tracer.collect()
+
 
 class OmsEngine(BaseEngine):
     """
@@ -360,8 +698,19 @@ class OmsEngine(BaseEngine):
         self.active_orders: Dict[str, OrderData] = {}
         self.active_quotes: Dict[str, QuoteData] = {}
 
+        # Secondary indexes of active orders/quotes: key -> {vt_orderid: data}
+        self.symbol_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.gateway_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.symbol_active_quotes: Dict[str, Dict[str, QuoteData]] = {}
+        self.gateway_active_quotes: Dict[str, Dict[str, QuoteData]] = {}
+
         self.offset_converters: Dict[str, OffsetConverter] = {}
 
+        # Version of every data dict is increased on each change, and
+        # snapshot is only rebuilt when version changed since last read.
+        self.versions: Dict[str, int] = {name: 0 for name in SNAPSHOT_NAMES}
+        self.snapshots: Dict[str, OmsSnapshot] = {}
+
         self.add_function()
         self.register_event()
 
@@ -384,6 +733,7 @@ class OmsEngine(BaseEngine):
         self.main_engine.get_all_quotes = self.get_all_quotes
         self.main_engine.get_all_active_orders = self.get_all_active_orders
         self.main_engine.get_all_active_quotes = self.get_all_active_quotes
+        self.main_engine.get_snapshot = self.get_snapshot
 
         self.main_engine.update_order_request = self.update_order_request
         self.main_engine.convert_order_request = self.convert_order_request
@@ -403,18 +753,28 @@ class OmsEngine(BaseEngine):
         """"""
         tick: TickData = event.data
         self.ticks[tick.vt_symbol] = tick
+        self.versions["ticks"] += 1
 
     def process_order_event(self, event: Event) -> None:
         """"""
         order: OrderData = event.data
         self.orders[order.vt_orderid] = order
+        self.versions["orders"] += 1
 
         # If order is active, then update data in dict.
         if order.is_active():
             self.active_orders[order.vt_orderid] = order
+            self.versions["active_orders"] += 1
+
+            add_index(self.symbol_active_orders, order.vt_symbol, order.vt_orderid, order)
+            add_index(self.gateway_active_orders, order.gateway_name, order.vt_orderid, order)
         # Otherwise, pop inactive order from in dict
         elif order.vt_orderid in self.active_orders:
             self.active_orders.pop(order.vt_orderid)
+            self.versions["active_orders"] += 1
+
+            remove_index(self.symbol_active_orders, order.vt_symbol, order.vt_orderid)
+            remove_index(self.gateway_active_orders, order.gateway_name, order.vt_orderid)
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(order.gateway_name, None)
@@ -425,6 +785,7 @@ class OmsEngine(BaseEngine):
         """"""
         trade: TradeData = event.data
         self.trades[trade.vt_tradeid] = trade
+        self.versions["trades"] += 1
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(trade.gateway_name, None)
@@ -435,6 +796,7 @@ class OmsEngine(BaseEngine):
         """"""
         position: PositionData = event.data
         self.positions[position.vt_positionid] = position
+        self.versions["positions"] += 1
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(position.gateway_name, None)
@@ -445,11 +807,13 @@ class OmsEngine(BaseEngine):
         """"""
         account: AccountData = event.data
         self.accounts[account.vt_accountid] = account
+        self.versions["accounts"] += 1
 
     def process_contract_event(self, event: Event) -> None:
         """"""
         contract: ContractData = event.data
         self.contracts[contract.vt_symbol] = contract
+        self.versions["contracts"] += 1
 
         # Initialize offset converter for each gateway
         if contract.gateway_name not in self.offset_converters:
@@ -459,13 +823,22 @@ class OmsEngine(BaseEngine):
         """"""
         quote: QuoteData = event.data
         self.quotes[quote.vt_quoteid] = quote
+        self.versions["quotes"] += 1
 
         # If quote is active, then update data in dict.
         if quote.is_active():
             self.active_quotes[quote.vt_quoteid] = quote
+            self.versions["active_quotes"] += 1
+
+            add_index(self.symbol_active_quotes, quote.vt_symbol, quote.vt_quoteid, quote)
+            add_index(self.gateway_active_quotes, quote.gateway_name, quote.vt_quoteid, quote)
         # Otherwise, pop inactive quote from in dict
         elif quote.vt_quoteid in self.active_quotes:
             self.active_quotes.pop(quote.vt_quoteid)
+            self.versions["active_quotes"] += 1
+
+            remove_index(self.symbol_active_quotes, quote.vt_symbol, quote.vt_quoteid)
+            remove_index(self.gateway_active_quotes, quote.gateway_name, quote.vt_quoteid)
 
     def get_tick(self, vt_symbol: str) -> Optional[TickData]:
         """
@@ -513,74 +886,95 @@ class OmsEngine(BaseEngine):
         """
         Get all tick data.
         """
-        return list(self.ticks.values())
+        return self.get_snapshot("ticks").data
 
     def get_all_orders(self) -> List[OrderData]:
         """
         Get all order data.
         """
-        return list(self.orders.values())
+        return self.get_snapshot("orders").data
 
     def get_all_trades(self) -> List[TradeData]:
         """
         Get all trade data.
         """
-        return list(self.trades.values())
+        return self.get_snapshot("trades").data
 
     def get_all_positions(self) -> List[PositionData]:
         """
         Get all position data.
         """
-        return list(self.positions.values())
+        return self.get_snapshot("positions").data
 
     def get_all_accounts(self) -> List[AccountData]:
         """
         Get all account data.
         """
-        return list(self.accounts.values())
+        return self.get_snapshot("accounts").data
 
     def get_all_contracts(self) -> List[ContractData]:
         """
         Get all contract data.
         """
-        return list(self.contracts.values())
+        return self.get_snapshot("contracts").data
 
     def get_all_quotes(self) -> List[QuoteData]:
         """
         Get all quote data.
         """
-        return list(self.quotes.values())
+        return self.get_snapshot("quotes").data
+
+    def get_snapshot(self, name: str) -> "OmsSnapshot":
+        """
+        Get snapshot of a data dict, which is safe to be read from other
+        threads. Snapshot list is shared by all readers until the data
+        dict changes, so it must not be modified.
+        """
+        version: int = self.versions[name]
+
+        snapshot: Optional[OmsSnapshot] = self.snapshots.get(name, None)
+        if snapshot and snapshot.version == version:
+            return snapshot
 
-    def get_all_active_orders(self, vt_symbol: str = "") -> List[OrderData]:
+        data: Dict[str, Any] = getattr(self, name)
+        snapshot = OmsSnapshot(version, list(data.values()))
+        self.snapshots[name] = snapshot
+
+        return snapshot
+
+    def get_all_active_orders(self, vt_symbol: str = "", gateway_name: str = "") -> List[OrderData]:
         """
-        Get all active orders by vt_symbol.
+        Get all active orders by vt_symbol and/or gateway_name.
 
-        If vt_symbol is empty, return all active orders.
+        If both are empty, return all active orders.
         """
-        if not vt_symbol:
-            return list(self.active_orders.values())
-        else:
-            active_orders: List[OrderData] = [
-                order
-                for order in self.active_orders.values()
-                if order.vt_symbol == vt_symbol
-            ]
-            return active_orders
+        if not vt_symbol and not gateway_name:
+            return self.get_snapshot("active_orders").data
 
-    def get_all_active_quotes(self, vt_symbol: str = "") -> List[QuoteData]:
+        return query_index(
+            self.active_orders,
+            self.symbol_active_orders,
+            self.gateway_active_orders,
+            vt_symbol,
+            gateway_name
+        )
+
+    def get_all_active_quotes(self, vt_symbol: str = "", gateway_name: str = "") -> List[QuoteData]:
         """
-        Get all active quotes by vt_symbol.
-        If vt_symbol is empty, return all active qutoes.
+        Get all active quotes by vt_symbol and/or gateway_name.
+
+        If both are empty, return all active qutoes.
         """
-        if not vt_symbol:
-            return list(self.active_quotes.values())
-        else:
-            active_quotes: List[QuoteData] = [
-                quote
-                for quote in self.active_quotes.values()
-                if quote.vt_symbol == vt_symbol
-            ]
-            return active_quotes
+        if not vt_symbol and not gateway_name:
+            return self.get_snapshot("active_quotes").data
+
+        return query_index(
+            self.active_quotes,
+            self.symbol_active_quotes,
+            self.gateway_active_quotes,
+            vt_symbol,
+            gateway_name
+        )
 
     def update_order_request(self, req: OrderRequest, vt_orderid: str, gateway_name: str) -> None:
         """
@@ -614,11 +1008,89 @@ class OmsEngine(BaseEngine):
         return self.offset_converters.get(gateway_name, None)
 
 
+SNAPSHOT_NAMES: Tuple[str] = (
+    "ticks",
+    "orders",
+    "trades",
+    "positions",
+    "accounts",
+    "contracts",
+    "quotes",
+    "active_orders",
+    "active_quotes",
+)
+
+
+@dataclass(frozen=True)
+class OmsSnapshot:
+    """
+    View of a data dict in OmsEngine at a specific version, list of
+    which is rebuilt only when the version changes.
+    """
+
+    version: int
+    data: list
+
+
+def add_index(index: Dict[str, Dict[str, Any]], key: str, vt_id: str, data: Any) -> None:
+    """
+    Add active data into secondary index.
+    """
+    d: Optional[Dict[str, Any]] = index.get(key, None)
+    if d is None:
+        d = {}
+        index[key] = d
+    d[vt_id] = data
+
+
+def remove_index(index: Dict[str, Dict[str, Any]], key: str, vt_id: str) -> None:
+    """
+    Remove inactive data from secondary index.
+    """
+    d: Optional[Dict[str, Any]] = index.get(key, None)
+    if d is None:
+        return
+
+    d.pop(vt_id, None)
+    if not d:
+        index.pop(key)
+
+
+def query_index(
+    data: Dict[str, Any],
+    symbol_index: Dict[str, Dict[str, Any]],
+    gateway_index: Dict[str, Dict[str, Any]],
+    vt_symbol: str,
+    gateway_name: str
+) -> list:
+    """
+    Query active data with secondary indexes, cost is proportional to
+    number of data found by vt_symbol or gateway_name.
+    """
+    if vt_symbol:
+        d: Dict[str, Any] = symbol_index.get(vt_symbol, {})
+        if gateway_name:
+            return [v for v in list(d.values()) if v.gateway_name == gateway_name]
+        return list(d.values())
+    elif gateway_name:
+        return list(gateway_index.get(gateway_name, {}).values())
+    else:
+        return list(data.values())
+
+
 class EmailEngine(BaseEngine):
     """
     Provides email sending function.
+
+    A persistent SMTP connection is reused for all emails. A single email
+    is sent at once, and emails queued together or within merge interval
+    after last delivery are sent as one digest per receiver.
     """
 
+    merge_interval: float = 3       # Seconds to wait for more emails
+    idle_timeout: float = 60        # Seconds before closing idle connection
+    retry_count: int = 2            # Times of sending with new connection
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
         """"""
         super(EmailEngine, self).__init__(main_engine, event_engine, "email")
@@ -627,6 +1099,10 @@ class EmailEngine(BaseEngine):
         self.queue: Queue = Queue()
         self.active: bool = False
 
+        self.smtp: Optional[smtplib.SMTP_SSL] = None
+        self.last_send: float = 0
+        self.last_deliver: float = 0
+
         self.main_engine.send_email = self.send_email
 
     def send_email(self, subject: str, content: str, receiver: str = "") -> None:
@@ -639,29 +1115,94 @@ class EmailEngine(BaseEngine):
         if not receiver:
             receiver: str = SETTINGS["email.receiver"]
 
-        msg: EmailMessage = EmailMessage()
-        msg["From"] = SETTINGS["email.sender"]
-        msg["To"] = receiver
-        msg["Subject"] = subject
-        msg.set_content(content)
-
-        self.queue.put(msg)
+        self.queue.put((subject, content, receiver))
 
     def run(self) -> None:
         """"""
         while self.active:
             try:
-                msg: EmailMessage = self.queue.get(block=True, timeout=1)
-
-                with smtplib.SMTP_SSL(
-                    SETTINGS["email.server"], SETTINGS["email.port"]
-                ) as smtp:
-                    smtp.login(
-                        SETTINGS["email.username"], SETTINGS["email.password"]
-                    )
-                    smtp.send_message(msg)
+                email: Tuple[str, str, str] = self.queue.get(block=True, timeout=1)
             except Empty:
-                pass
+                self.check_idle()
+                continue
+
+            emails: List[Tuple[str, str, str]] = [email]
+
+            # Emails already queued are merged
+            while True:
+                try:
+                    emails.append(self.queue.get(block=False))
+                except Empty:
+                    break
+
+            # Wait for more emails only if emails keep coming, so that
+            # a single email is not delayed
+            if len(emails) > 1 or monotonic() - self.last_deliver < self.merge_interval:
+                end: float = monotonic() + self.merge_interval
+                while True:
+                    timeout: float = end - monotonic()
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        emails.append(self.queue.get(block=True, timeout=timeout))
+                    except Empty:
+                        break
+
+            for msg in merge_emails(emails):
+                self.deliver(msg)
+
+            self.last_deliver = monotonic()
+            for _ in emails:
+                self.queue.task_done()
+
+        self.disconnect()
+
+    def deliver(self, msg: EmailMessage) -> None:
+        """
+        Send message with persistent connection, reconnect if failed.
+        """
+        for i in range(self.retry_count):
+            try:
+                if not self.smtp:
+                    self.connect()
+
+                self.smtp.send_message(msg)
+                self.last_send = monotonic()
+                return
+            except (smtplib.SMTPException, OSError) as e:
+                error: Exception = e
+                self.disconnect()
+
+        self.main_engine.write_log(f"邮件发送失败：{msg['Subject']}，{error}")
+
+    def connect(self) -> None:
+        """
+        Create connection to SMTP server and login.
+        """
+        self.smtp = smtplib.SMTP_SSL(SETTINGS["email.server"], SETTINGS["email.port"])
+        self.smtp.login(SETTINGS["email.username"], SETTINGS["email.password"])
+
+    def disconnect(self) -> None:
+        """
+        Close connection to SMTP server.
+        """
+        if not self.smtp:
+            return
+
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+        self.smtp = None
+
+    def check_idle(self) -> None:
+        """
+        Close connection if no email sent for a while.
+        """
+        if self.smtp and monotonic() - self.last_send > self.idle_timeout:
+            self.disconnect()
 
     def start(self) -> None:
         """"""
@@ -675,3 +1216,33 @@ class EmailEngine(BaseEngine):
 
         self.active = False
         self.thread.join()
+
+
+def merge_emails(emails: List[Tuple[str, str, str]]) -> List[EmailMessage]:
+    """
+    Merge emails of the same receiver into one digest message.
+    """
+    receiver_emails: Dict[str, List[Tuple[str, str]]] = {}
+    for subject, content, receiver in emails:
+        receiver_emails.setdefault(receiver, []).append((subject, content))
+
+    msgs: List[EmailMessage] = []
+
+    for receiver, contents in receiver_emails.items():
+        if len(contents) == 1:
+            subject, content = contents[0]
+        else:
+            subject = f"[{len(contents)}封合并] {contents[0][0]}"
+            content = "\n\n".join([
+                f"==== {i + 1}. {s} ====\n{c}"
+                for i, (s, c) in enumerate(contents)
+            ])
+
+        msg: EmailMessage = EmailMessage()
+        msg["From"] = SETTINGS["email.sender"]
+        msg["To"] = receiver
+        msg["Subject"] = subject
+        msg.set_content(content)
+        msgs.append(msg)
+
+    return msgs
@@ -12,3 +12,14 @@ EVENT_ACCOUNT = "eAccount."
 EVENT_QUOTE = "eQuote."
 EVENT_CONTRACT = "eContract."
 EVENT_LOG = "eLog"
+EVENT_LATENCY = "eLatency"
+
+# Priority of event types used by PriorityEventEngine, smaller number first.
+EVENT_PRIORITIES = {
+    EVENT_ORDER: 0,
+    EVENT_TRADE: 0,
+    EVENT_POSITION: 0,
+    EVENT_QUOTE: 0,
+    EVENT_TICK: 2,
+    EVENT_LOG: 2,
+}
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
 from typing import Any, Dict, List, Optional, Callable
 from copy import copy
 
 from vnpy.event import Event, EventEngine
+from .latency import OrderLatencyTracer
 from .event import (
     EVENT_TICK,
     EVENT_ORDER,
@@ -85,6 +88,9 @@ class BaseGateway(ABC):
         self.event_engine: EventEngine = event_engine
         self.gateway_name: str = gateway_name
 
+        # Set by main engine if order latency tracing is active
+        self.order_tracer: Optional[OrderLatencyTracer] = None
+
     def on_event(self, type: str, data: Any = None) -> None:
         """
         General event push.
@@ -105,6 +111,9 @@ class BaseGateway(ABC):
         Trade event push.
         Trade event of a specific vt_symbol is also pushed.
         """
+        if self.order_tracer:
+            self.order_tracer.on_trade(trade)
+
         self.on_event(EVENT_TRADE, trade)
         self.on_event(EVENT_TRADE + trade.vt_symbol, trade)
 
@@ -113,6 +122,9 @@ class BaseGateway(ABC):
         Order event push.
         Order event of a specific vt_orderid is also pushed.
         """
+        if self.order_tracer:
+            self.order_tracer.on_order(order)
+
         self.on_event(EVENT_ORDER, order)
         self.on_event(EVENT_ORDER + order.vt_orderid, order)
 
@@ -195,6 +207,16 @@ class BaseGateway(ABC):
         """
         pass
 
+    def subscribe_batch(self, reqs: List[SubscribeRequest]) -> None:
+        """
+        Subscribe tick data update of a list of symbols.
+
+        Gateway should override it if the API supports subscribing
+        many symbols in one request.
+        """
+        for req in reqs:
+            self.subscribe(req)
+
     @abstractmethod
     def send_order(self, req: OrderRequest) -> str:
         """
@@ -277,12 +299,33 @@ class BaseGateway(ABC):
 class LocalOrderManager:
     """
     Management tool to support use local order id for trading.
+
+    Finished orders are evicted after max_age seconds or when there are
+    more than max_finished of them, together with their orderid map.
+    Push data and cancel requests never matched are evicted by age.
     """
 
-    def __init__(self, gateway: BaseGateway, order_prefix: str = "") -> None:
+    def __init__(
+        self,
+        gateway: BaseGateway,
+        order_prefix: str = "",
+        max_finished: int = 100000,
+        max_age: float = 86400
+    ) -> None:
         """"""
         self.gateway: BaseGateway = gateway
 
+        # Eviction limits
+        self.max_finished: int = max_finished
+        self.max_age: float = max_age
+
+        # Finish time of orders no longer active, oldest first
+        self.finished_times: OrderedDict[str, float] = OrderedDict()    # local_orderid: time
+
+        # Buffer time of push data and cancel request, oldest first
+        self.push_data_times: OrderedDict[str, float] = OrderedDict()       # sys_orderid: time
+        self.cancel_request_times: OrderedDict[str, float] = OrderedDict()  # local_orderid: time
+
         # For generating local orderid
         self.order_prefix: str = order_prefix
         self.order_count: int = 0
@@ -350,6 +393,8 @@ class LocalOrderManager:
             return
 
         data: dict = self.push_data_buf.pop(sys_orderid)
+        self.push_data_times.pop(sys_orderid, None)
+
         if self.push_data_callback:
             self.push_data_callback(data)
 
@@ -359,6 +404,10 @@ class LocalOrderManager:
         """
         self.push_data_buf[sys_orderid] = data
 
+        self.push_data_times[sys_orderid] = monotonic()
+        self.push_data_times.move_to_end(sys_orderid)
+        self.evict_buf(self.push_data_buf, self.push_data_times)
+
     def get_order_with_sys_orderid(self, sys_orderid: str) -> Optional[OrderData]:
         """"""
         local_orderid: str = self.sys_local_orderid_map.get(sys_orderid, None)
@@ -379,11 +428,69 @@ class LocalOrderManager:
         self.orders[order.orderid] = copy(order)
         self.gateway.on_order(order)
 
+        if not order.is_active():
+            self.finished_times[order.orderid] = monotonic()
+            self.finished_times.move_to_end(order.orderid)
+            self.evict_finished()
+        elif order.orderid in self.finished_times:
+            self.finished_times.pop(order.orderid)
+
+    def evict_finished(self) -> None:
+        """
+        Remove finished orders which are too old or too many.
+        """
+        expire: float = monotonic() - self.max_age
+
+        while self.finished_times:
+            local_orderid, finish_time = next(iter(self.finished_times.items()))
+            if finish_time > expire and len(self.finished_times) <= self.max_finished:
+                break
+
+            self.finished_times.popitem(last=False)
+            self.orders.pop(local_orderid, None)
+
+            sys_orderid: str = self.local_sys_orderid_map.pop(local_orderid, "")
+            if sys_orderid:
+                self.sys_local_orderid_map.pop(sys_orderid, None)
+
+            self.cancel_request_buf.pop(local_orderid, None)
+            self.cancel_request_times.pop(local_orderid, None)
+
+    def evict_buf(self, buf: Dict[str, Any], times: "OrderedDict[str, float]") -> None:
+        """
+        Remove buffered data which has waited longer than max age.
+        """
+        expire: float = monotonic() - self.max_age
+
+        while times:
+            key, buf_time = next(iter(times.items()))
+            if buf_time > expire:
+                break
+
+            times.popitem(last=False)
+            buf.pop(key, None)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get size of all caches for monitoring memory usage.
+        """
+        return {
+            "orders": len(self.orders),
+            "finished_orders": len(self.finished_times),
+            "orderid_map": len(self.local_sys_orderid_map),
+            "push_data_buf": len(self.push_data_buf),
+            "cancel_request_buf": len(self.cancel_request_buf),
+        }
+
     def cancel_order(self, req: CancelRequest) -> None:
         """"""
         sys_orderid: str = self.get_sys_orderid(req.orderid)
         if not sys_orderid:
             self.cancel_request_buf[req.orderid] = req
+
+            self.cancel_request_times[req.orderid] = monotonic()
+            self.cancel_request_times.move_to_end(req.orderid)
+            self.evict_buf(self.cancel_request_buf, self.cancel_request_times)
             return
 
         self._cancel_order(req)
@@ -394,4 +501,6 @@ class LocalOrderManager:
             return
 
         req: CancelRequest = self.cancel_request_buf.pop(local_orderid)
+        self.cancel_request_times.pop(local_orderid, None)
+
         self.gateway.cancel_order(req)
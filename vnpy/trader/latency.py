@@ -0,0 +1,245 @@
+"""
+Order round trip latency tracing.
+
+Timestamps (perf_counter) are recorded at each hop of an order, keyed by
+vt_orderid:
+
+* strategy: strategy engine received send order call
+* send: main engine received send order request
+* gateway: gateway send_order returned
+* ack: first order update from gateway which is not submitting
+* trade: first trade update from gateway
+
+Latency of every hop is measured from the first hop of the order, and
+aggregated into histograms per gateway and per strategy.
+"""
+
+from dataclasses import dataclass
+from threading import Lock, local
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from vnpy.event import LatencyHistogram
+from Pandora.constant import Status
+from Pandora.trader.object import OrderData, TradeData
+
+
+HOP_STRATEGY = "strategy"
+HOP_SEND = "send"
+HOP_GATEWAY = "gateway"
+HOP_ACK = "ack"
+HOP_TRADE = "trade"
+
+GROUP_GATEWAY = "gateway"
+GROUP_STRATEGY = "strategy"
+
+
+@dataclass
+class LatencyData:
+    """
+    Latency summary of a hop for a gateway or strategy, in microseconds.
+    """
+
+    group: str
+    name: str
+    hop: str
+    count: int = 0
+    average: float = 0
+    p50: float = 0
+    p99: float = 0
+    max: float = 0
+
+    def __post_init__(self) -> None:
+        """"""
+        self.vt_latencyid: str = f"{self.group}.{self.name}.{self.hop}"
+
+
+class OrderTrace:
+    """
+    Timestamps of an order at each hop.
+    """
+
+    __slots__ = ("vt_orderid", "gateway_name", "reference", "create_time", "times", "counted")
+
+    def __init__(self, vt_orderid: str) -> None:
+        """"""
+        self.vt_orderid: str = vt_orderid
+        self.gateway_name: str = ""
+        self.reference: str = ""
+        self.create_time: float = perf_counter()
+
+        self.times: Dict[str, float] = {}
+        self.counted: Set[str] = set()
+
+
+
+class StrategyScope:
+    """
+    Sets strategy time of current thread when entered, and restores the
+    previous one when exited.
+    """
+
+    __slots__ = ("thread_data", "timestamp", "previous")
+
+    def __init__(self, thread_data: local, timestamp: float) -> None:
+        """"""
+        self.thread_data: local = thread_data
+        self.timestamp: float = timestamp
+        self.previous: float = 0
+
+    def __enter__(self) -> None:
+        """"""
+        self.previous = getattr(self.thread_data, "strategy_time", 0)
+        self.thread_data.strategy_time = self.timestamp
+
+    def __exit__(self, *args: Any) -> None:
+        """"""
+        self.thread_data.strategy_time = self.previous
+
+class OrderLatencyTracer:
+    """
+    Collects hop timestamps of orders from any thread, and aggregates
+    them into latency histograms when collect is called.
+    """
+
+    def __init__(self, max_age: float = 60) -> None:
+        """
+        Traces are dropped after traded or max_age seconds.
+        """
+        self.max_age: float = max_age
+
+        self.traces: Dict[str, OrderTrace] = {}
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.lock: Lock = Lock()
+
+        # Strategy time of orders being sent from each thread
+        self.local: local = local()
+
+    def trace_strategy(self, timestamp: float) -> "StrategyScope":
+        """
+        Return context in which orders sent from current thread are
+        traced from strategy hop at timestamp.
+        """
+        return StrategyScope(self.local, timestamp)
+
+    def record(self, vt_orderid: str, hop: str, timestamp: float = 0) -> None:
+        """
+        Record timestamp of an order at a hop, only the first one of
+        each hop is kept.
+        """
+        if not timestamp:
+            timestamp = perf_counter()
+
+        with self.lock:
+            trace: OrderTrace = self.get_trace(vt_orderid)
+            if hop not in trace.times:
+                trace.times[hop] = timestamp
+
+    def start(
+        self,
+        vt_orderid: str,
+        gateway_name: str,
+        reference: str,
+        send_time: float,
+        return_time: float
+    ) -> None:
+        """
+        Record an order sent by main engine. Strategy hop set by
+        trace_strategy in current thread is recorded with other hops at
+        once, so that collect never counts the order without it.
+        """
+        strategy_time: float = getattr(self.local, "strategy_time", 0)
+
+        with self.lock:
+            trace: OrderTrace = self.get_trace(vt_orderid)
+            trace.gateway_name = gateway_name
+            trace.reference = reference
+
+            if strategy_time:
+                trace.times.setdefault(HOP_STRATEGY, strategy_time)
+            trace.times.setdefault(HOP_SEND, send_time)
+            trace.times.setdefault(HOP_GATEWAY, return_time)
+
+    def on_order(self, order: OrderData) -> None:
+        """
+        Record order update pushed by gateway.
+        """
+        if order.status != Status.SUBMITTING:
+            self.record(order.vt_orderid, HOP_ACK)
+
+    def on_trade(self, trade: TradeData) -> None:
+        """
+        Record trade update pushed by gateway.
+        """
+        self.record(trade.vt_orderid, HOP_TRADE)
+
+    def get_trace(self, vt_orderid: str) -> OrderTrace:
+        """"""
+        trace: Optional[OrderTrace] = self.traces.get(vt_orderid, None)
+        if not trace:
+            trace = OrderTrace(vt_orderid)
+            self.traces[vt_orderid] = trace
+        return trace
+
+    def collect(self) -> List[LatencyData]:
+        """
+        Add latency of new hops into histograms, drop finished traces,
+        and return summary of all histograms.
+        """
+        now: float = perf_counter()
+
+        with self.lock:
+            for vt_orderid, trace in list(self.traces.items()):
+                if trace.gateway_name:
+                    self.count_trace(trace)
+
+                if HOP_TRADE in trace.counted or now - trace.create_time > self.max_age:
+                    self.traces.pop(vt_orderid)
+
+            data_list: List[LatencyData] = []
+            for (group, name, hop), histogram in self.histograms.items():
+                data_list.append(LatencyData(group, name, hop, **histogram.get_summary()))
+
+        return data_list
+
+    def count_trace(self, trace: OrderTrace) -> None:
+        """
+        Add latency of hops not counted yet into histograms.
+        """
+        times: Dict[str, float] = trace.times
+        start: float = times.get(HOP_STRATEGY, times[HOP_SEND])
+
+        for hop, timestamp in times.items():
+            if hop == HOP_STRATEGY or hop in trace.counted:
+                continue
+            trace.counted.add(hop)
+
+            # Send hop is only meaningful when started from strategy
+            if hop == HOP_SEND and HOP_STRATEGY not in times:
+                continue
+
+            latency: float = max(timestamp - start, 0)
+
+            self.add_latency(GROUP_GATEWAY, trace.gateway_name, hop, latency)
+            # Reference of strategy orders is "AppName_StrategyName"
+            if trace.reference:
+                self.add_latency(GROUP_STRATEGY, trace.reference, hop, latency)
+
+    def add_latency(self, group: str, name: str, hop: str, latency: float) -> None:
+        """"""
+        key: Tuple[str, str, str] = (group, name, hop)
+
+        histogram: Optional[LatencyHistogram] = self.histograms.get(key, None)
+        if not histogram:
+            histogram = LatencyHistogram()
+            self.histograms[key] = histogram
+
+        histogram.add(latency)
+
+    def reset(self) -> None:
+        """
+        Clear all traces and histograms.
+        """
+        with self.lock:
+            self.traces.clear()
+            self.histograms.clear()
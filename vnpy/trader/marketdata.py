@@ -0,0 +1,224 @@
+"""
+Helpers shared by gateways for converting depth market data of CTP-like
+APIs into TickData.
+"""
+
+import sys
+from datetime import datetime, tzinfo
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+MAX_FLOAT: float = sys.float_info.max
+
+# TickData field and depth market data key of prices and volumes of
+# level 1 and the whole day
+TICK_PRICE_FIELDS: Dict[str, str] = {
+    "last_price": "LastPrice",
+    "limit_up": "UpperLimitPrice",
+    "limit_down": "LowerLimitPrice",
+    "open_price": "OpenPrice",
+    "high_price": "HighestPrice",
+    "low_price": "LowestPrice",
+    "pre_close": "PreClosePrice",
+    "bid_price_1": "BidPrice1",
+    "ask_price_1": "AskPrice1",
+}
+
+TICK_VOLUME_FIELDS: Dict[str, str] = {
+    "volume": "Volume",
+    "open_interest": "OpenInterest",
+    "bid_volume_1": "BidVolume1",
+    "ask_volume_1": "AskVolume1",
+}
+
+# Level 2 to 5
+DEPTH_PRICE_FIELDS: Dict[str, str] = {}
+DEPTH_VOLUME_FIELDS: Dict[str, str] = {}
+
+for n in range(2, 6):
+    DEPTH_PRICE_FIELDS[f"bid_price_{n}"] = f"BidPrice{n}"
+    DEPTH_PRICE_FIELDS[f"ask_price_{n}"] = f"AskPrice{n}"
+    DEPTH_VOLUME_FIELDS[f"bid_volume_{n}"] = f"BidVolume{n}"
+    DEPTH_VOLUME_FIELDS[f"ask_volume_{n}"] = f"AskVolume{n}"
+
+
+class TickTimeParser:
+    """
+    Builds tick datetime from date string (%Y%m%d), time string (%H:%M:%S)
+    and microsecond with integer fields, instead of strptime on the whole
+    timestamp string.
+
+    Parsed date strings are cached, and the last time string is reused
+    since ticks of many symbols share the same second.
+    """
+
+    def __init__(self, tz: Optional[tzinfo] = None) -> None:
+        """"""
+        self.tz: Optional[tzinfo] = tz
+
+        self.dates: Dict[str, Tuple[int, int, int]] = {}
+
+        self.last_time: str = ""
+        self.last_fields: Tuple[int, int, int] = (0, 0, 0)
+
+    def parse(self, date_str: str, time_str: str, microsecond: int = 0) -> datetime:
+        """
+        Get datetime of a tick.
+        """
+        date_fields: Tuple[int, int, int] = self.dates.get(date_str, None)
+        if not date_fields:
+            date_fields = self.parse_date(date_str)
+
+        if time_str == self.last_time:
+            time_fields: Tuple[int, int, int] = self.last_fields
+        else:
+            time_fields = (int(time_str[0:2]), int(time_str[3:5]), int(time_str[6:8]))
+            self.last_time = time_str
+            self.last_fields = time_fields
+
+        year, month, day = date_fields
+        hour, minute, second = time_fields
+
+        return datetime(year, month, day, hour, minute, second, microsecond, self.tz)
+
+    def parse_date(self, date_str: str) -> Tuple[int, int, int]:
+        """
+        Parse and cache a date string.
+        """
+        date_fields: Tuple[int, int, int] = (
+            int(date_str[0:4]),
+            int(date_str[4:6]),
+            int(date_str[6:8])
+        )
+
+        # Validate date before caching, same as strptime
+        datetime(*date_fields)
+
+        # Only a few dates appear in one session, clear in case of a
+        # long running process
+        if len(self.dates) > 100:
+            self.dates.clear()
+        self.dates[date_str] = date_fields
+
+        return date_fields
+
+
+class PriceCache(dict):
+    """
+    Maps raw price to adjusted price: MAX_FLOAT into 0 and rounded to 5
+    decimals. Prices of a tick repeat a lot (limits, open, pre close and
+    the book around last price), so most lookups are done in C without
+    calling round.
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        """"""
+        super().__init__()
+
+        self.max_size: int = max_size
+
+    def __missing__(self, price: float) -> float:
+        """"""
+        if len(self) >= self.max_size:
+            self.clear()
+
+        if price == MAX_FLOAT:
+            adjusted: float = 0
+        else:
+            adjusted = round(price, 5)
+
+        self[price] = adjusted
+        return adjusted
+
+
+class DepthNormalizer:
+    """
+    Converts depth market data dict into keyword arguments of TickData,
+    configured by mapping from TickData field to data key.
+
+    All values of a group are fetched with one itemgetter call, and
+    prices are adjusted through PriceCache in one pass.
+    """
+
+    def __init__(
+        self,
+        adjust: bool = True,
+        required: Sequence[str] = (),
+        depth_keys: Sequence[str] = (),
+        price_fields: Dict[str, str] = TICK_PRICE_FIELDS,
+        volume_fields: Dict[str, str] = TICK_VOLUME_FIELDS,
+        depth_price_fields: Dict[str, str] = DEPTH_PRICE_FIELDS,
+        depth_volume_fields: Dict[str, str] = DEPTH_VOLUME_FIELDS
+    ) -> None:
+        """
+        adjust: change MAX_FLOAT price into 0 and round to 5 decimals
+        required: data is dropped if any of these fields is 0
+        depth_keys: level 2-5 is only converted if any of these keys in
+        data is not 0, or always converted if empty
+        """
+        self.adjust: bool = adjust
+        self.price_cache: PriceCache = PriceCache()
+        self.required: Tuple[str, ...] = tuple(required)
+
+        # Names are interned so that keyword arguments of TickData are
+        # matched by identity
+        self.price_names: Tuple[str, ...] = intern_names(price_fields)
+        self.get_prices: Callable = make_getter(price_fields.values())
+
+        self.volume_names: Tuple[str, ...] = intern_names(volume_fields)
+        self.get_volumes: Callable = make_getter(volume_fields.values())
+
+        self.depth_price_names: Tuple[str, ...] = intern_names(depth_price_fields)
+        self.get_depth_prices: Callable = make_getter(depth_price_fields.values())
+
+        self.depth_volume_names: Tuple[str, ...] = intern_names(depth_volume_fields)
+        self.get_depth_volumes: Callable = make_getter(depth_volume_fields.values())
+
+        self.get_depth_flags: Optional[Callable] = None
+        if depth_keys:
+            self.get_depth_flags = make_getter(depth_keys)
+
+    def normalize(self, data: dict) -> Optional[dict]:
+        """
+        Get TickData fields from data, or None if data is filtered.
+        """
+        fields: dict = dict(zip(self.price_names, self.adjust_prices(self.get_prices(data))))
+        fields.update(zip(self.volume_names, self.get_volumes(data)))
+
+        for name in self.required:
+            if not fields[name]:
+                return None
+
+        if not self.get_depth_flags or any(self.get_depth_flags(data)):
+            fields.update(zip(self.depth_price_names, self.adjust_prices(self.get_depth_prices(data))))
+            fields.update(zip(self.depth_volume_names, self.get_depth_volumes(data)))
+
+        return fields
+
+    def adjust_prices(self, prices: tuple) -> Iterable[float]:
+        """"""
+        if not self.adjust:
+            return prices
+
+        return map(self.price_cache.__getitem__, prices)
+
+
+def make_getter(keys: Sequence[str]) -> Callable[[dict], tuple]:
+    """
+    Create function which gets values of keys from a dict as a tuple.
+    """
+    keys: List[str] = list(keys)
+
+    if len(keys) == 1:
+        key: str = keys[0]
+        return lambda data: (data[key],)
+    elif not keys:
+        return lambda data: ()
+
+    return itemgetter(*keys)
+
+
+def intern_names(fields: Dict[str, str]) -> Tuple[str, ...]:
+    """"""
+    return tuple(sys.intern(name) for name in fields.keys())
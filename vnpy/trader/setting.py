@@ -16,6 +16,10 @@ SETTINGS: Dict[str, Any] = {
     "log.level": CRITICAL,
     "log.console": True,
     "log.file": True,
+    "log.buffer_size": 10000,
+
+    "latency.active": False,
+    "latency.interval": 60,
 
     "email.server": "smtp.qq.com",
     "email.port": 465,
@@ -23,6 +23,7 @@ from .widget import (
     ActiveOrderMonitor,
     ConnectDialog,
     ContractManager,
+    LatencyMonitor,
     TradingWidget,
     AboutDialog,
     GlobalDialog
@@ -124,6 +125,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
         all_apps: List[BaseApp] = self.main_engine.get_all_apps()
         for app in all_apps:
+            # Lazy app added by string has no widget info
+            if not app.widget_name:
+                continue
+
             ui_module: ModuleType = import_module(app.app_module + ".ui")
             widget_class: QtWidgets.QWidget = getattr(ui_module, app.widget_name)
 
@@ -147,6 +152,14 @@ class MainWindow(QtWidgets.QMainWindow):
             True
         )
 
+        self.add_action(
+            help_menu,
+            "委托延迟",
+            get_icon_path(__file__, "contract.ico"),
+            partial(self.open_widget, LatencyMonitor, "latency"),
+            True
+        )
+
         self.add_action(
             help_menu,
             "还原窗口",
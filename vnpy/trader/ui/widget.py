@@ -22,7 +22,8 @@ from ..event import (
     EVENT_ORDER,
     EVENT_POSITION,
     EVENT_ACCOUNT,
-    EVENT_LOG
+    EVENT_LOG,
+    EVENT_LATENCY
 )
 from Pandora.trader.object import (
     OrderRequest,
@@ -212,6 +213,17 @@ class MsgCell(BaseCell):
         self.setTextAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
 
 
+class LatencyCell(BaseCell):
+    """
+    Cell used for showing latency in microseconds.
+    """
+
+    def set_content(self, content: Any, data: Any) -> None:
+        """"""
+        self.setText(f"{content:.1f}")
+        self._data = data
+
+
 class BaseMonitor(QtWidgets.QTableWidget):
     """
     Monitor data update.
@@ -582,6 +594,46 @@ class QuoteMonitor(BaseMonitor):
         self.main_engine.cancel_quote(req, quote.gateway_name)
 
 
+class LatencyMonitor(BaseMonitor):
+    """
+    Monitor for order round trip latency.
+    """
+
+    event_type: str = EVENT_LATENCY
+    data_key: str = "vt_latencyid"
+    sorting: bool = True
+
+    headers: dict = {
+        "group": {"display": "类型", "cell": BaseCell, "update": False},
+        "name": {"display": "名称", "cell": BaseCell, "update": False},
+        "hop": {"display": "环节", "cell": BaseCell, "update": False},
+        "count": {"display": "次数", "cell": BaseCell, "update": True},
+        "average": {"display": "平均(us)", "cell": LatencyCell, "update": True},
+        "p50": {"display": "P50(us)", "cell": LatencyCell, "update": True},
+        "p99": {"display": "P99(us)", "cell": LatencyCell, "update": True},
+        "max": {"display": "最大(us)", "cell": LatencyCell, "update": True},
+    }
+
+    def init_ui(self) -> None:
+        """"""
+        super().init_ui()
+
+        self.setWindowTitle("委托延迟")
+        self.resize(1000, 400)
+
+        if not SETTINGS["latency.active"]:
+            self.setToolTip("委托延迟统计未启用，请在全局配置中设置latency.active")
+
+    def register_event(self) -> None:
+        """
+        Show latency data collected before widget is opened.
+        """
+        super().register_event()
+
+        for data in self.main_engine.get_latency_data():
+            self.signal.emit(Event(EVENT_LATENCY, data))
+
+
 class ConnectDialog(QtWidgets.QDialog):
     """
     Start connection of a certain gateway.